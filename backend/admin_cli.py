@@ -0,0 +1,387 @@
+"""
+Offline Administration CLI
+Bulk operations on a database file without the HTTP server: stats, audits,
+exports, weak-user re-salting, salt rotation, hash migrations and schema
+initialization, on the same functions the API routes use
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ║  Progress streams to stderr (text or JSON lines); the result is one JSON     ║
+# ║  document on stdout or in --result, so scripts can pipe or parse it          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import concurrent.futures
+import contextlib
+import csv
+import heapq
+import json
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+
+# app prints start-up notices; keep stdout for the result document
+with contextlib.redirect_stdout(sys.stderr):
+    import app as backend
+
+from hash_migration import (MigrationRun, create_run, load_run, ensure_runs_table, normalize_filters,
+                            default_run_id, filter_sql, base_hash, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE)
+from user_shards import sum_counts
+
+EXPORT_COLUMNS = ('id', 'name', 'email', 'algorithm', 'salt', 'password_hash', 'hash_md5', 'hash_sha1',
+                  'hash_sha256', 'hash_sha512', 'security_score', 'breach_status', 'resalt_count',
+                  'last_resalt', 'created_at', 'row_version')
+EXPORT_FETCH_SIZE = 1000
+
+# Rows hashed to estimate a migration's duration on --dry-run
+ESTIMATE_SAMPLE = 20
+
+class Progress:
+    """Progress events on stderr, as text lines or JSON lines"""
+
+    def __init__(self, fmt='text', stream=None):
+        self.fmt = fmt
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def emit(self, event, message='', **fields):
+        elapsed = round(time.perf_counter() - self.started, 3)
+        if self.fmt == 'json':
+            line = json.dumps({'event': event, 'message': message, 'elapsed': elapsed, **fields}, default=str)
+        else:
+            details = ' '.join(f"{key}={value}" for key, value in fields.items())
+            line = f"[{elapsed:8.2f}s] {event}: {message} {details}".rstrip()
+        # Shards report from parallel threads; one write per line keeps lines whole
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           READ-ONLY COMMANDS                                   ║
+# ║  stats, audit and export read WAL snapshots, so they run next to a live      ║
+# ║  server without blocking its writers                                         ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def command_stats(args, progress):
+    def shard_stats(conn, index):
+        counts = {
+            'users': conn.execute('SELECT COUNT(*) FROM users').fetchone()[0],
+            'algorithms': dict(conn.execute('SELECT COALESCE(algorithm, ?), COUNT(*) FROM users GROUP BY 1',
+                                            ('UNKNOWN',)).fetchall()),
+            'breachStatus': dict(conn.execute('SELECT COALESCE(breach_status, ?), COUNT(*) FROM users GROUP BY 1',
+                                              ('UNKNOWN',)).fetchall()),
+            'resaltCandidates': sum(backend.count_resalt_candidates(conn).values())
+        }
+        # Demo users and resalt log live in the main database only
+        if index == 0:
+            counts['demoUsers'] = conn.execute('SELECT COUNT(*) FROM demo_users').fetchone()[0]
+            counts['resalts'] = conn.execute('SELECT COUNT(*) FROM resalt_log').fetchone()[0]
+        return counts
+
+    shards, snapshot = backend.shard_snapshots(shard_stats)
+    progress.emit('stats', f"{len(shards)} shard(s) read")
+    return {
+        **sum_counts(shards),
+        'hashStorage': backend.HASH_STORAGE,
+        'shards': [{'path': path, 'users': counts['users']}
+                   for path, counts in zip(backend.user_shards.paths, shards)],
+        'snapshot': snapshot
+    }
+
+def command_audit(args, progress):
+    sections = tuple(args.sections) if args.sections else backend.AUDIT_SECTIONS
+    progress.emit('audit', f"scanning {', '.join(sections)}", shards=backend.user_shards.count)
+    report, snapshot = backend.fan_out_audit(sections)
+    return {**report, 'snapshot': snapshot}
+
+def command_export(args, progress):
+    """Every user (hex hashes in both storage modes) in id order, merged across shards"""
+    conns = [backend.get_snapshot_db(path) for path in backend.user_shards.paths]
+    try:
+        def shard_rows(conn):
+            cursor = conn.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM users ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+                if not rows:
+                    return
+                yield from (tuple(row) for row in rows)
+
+        exported = 0
+        with open(args.output, 'w', newline='') as f:
+            writer = csv.writer(f) if args.format == 'csv' else None
+            if writer:
+                writer.writerow(EXPORT_COLUMNS)
+            for row in heapq.merge(*(shard_rows(conn) for conn in conns), key=lambda r: r[0]):
+                if writer:
+                    writer.writerow(row)
+                else:
+                    f.write(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + '\n')
+                exported += 1
+                if exported % args.progress_every == 0:
+                    progress.emit('export', f"{exported} users written", exported=exported)
+        snapshot = dict(conns[0].snapshot, takenAt=min(c.snapshot['takenAt'] for c in conns))
+    finally:
+        for conn in conns:
+            conn.close()
+    progress.emit('export', 'done', exported=exported)
+    return {'exported': exported, 'format': args.format, 'output': args.output, 'snapshot': snapshot}
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           WRITE COMMANDS                                       ║
+# ║  Row writes go through the row_version compare-and-swap, so they are safe   ║
+# ║  next to a live server; --dry-run only counts what would change              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def command_init(args, progress):
+    backend.DB_PATH = args.db
+    backend.USER_SHARDS = args.shards
+    backend.HASH_STORAGE = args.storage
+    with contextlib.redirect_stdout(sys.stderr):
+        backend.init_db()
+    progress.emit('init', 'database ready', shards=backend.user_shards.count, storage=backend.HASH_STORAGE)
+    return {'db': args.db, 'shards': backend.user_shards.count, 'hashStorage': backend.HASH_STORAGE,
+            'schemaVersion': backend.SCHEMA_VERSION}
+
+def command_resalt(args, progress):
+    paths = backend.user_shards.paths
+    if args.dry_run:
+        counts = backend.user_shards.map(lambda conn, index: backend.count_resalt_candidates(conn))
+        return {'dryRun': True, 'candidates': sum(sum(c.values()) for c in counts),
+                'byAlgorithm': sum_counts(counts)}
+
+    def resalt_shard(index):
+        conn = backend.get_db(paths[index])
+        try:
+            def on_chunk(resalted, conflicts, last_id):
+                progress.emit('resalt', f"shard {index}", shard=index, resalted=resalted,
+                              conflicts=conflicts, checkpoint=last_id)
+            return backend.resalt_weak_users(conn, 'admin-cli', args.chunk_size, on_chunk)
+        finally:
+            conn.close()
+
+    # Shards have separate writer locks, so they re-salt in parallel
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        results = list(pool.map(resalt_shard, range(len(paths))))
+    return {
+        'dryRun': False,
+        'candidates': sum(r['candidates'] for r in results),
+        'resalted': sum(len(r['users']) for r in results),
+        'conflicts': [user_id for r in results for user_id in r['conflicts']],
+        'users': [user for r in results for user in r['users']] if args.include_users else None,
+        'writeContention': backend.write_contention.snapshot()
+    }
+
+def command_rotate_salts(args, progress):
+    if args.dry_run:
+        users = sum(result for result in backend.user_shards.map(
+            lambda conn, index: conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]))
+        return {'dryRun': True, 'users': users}
+    progress.emit('rotate-salts', 'rotating every user salt', shards=backend.user_shards.count)
+    rotated = backend.rotate_all_salts()
+    return {'dryRun': False, 'rotated': rotated, 'writeContention': backend.write_contention.snapshot()}
+
+def migration_filters(args):
+    filters = {'algorithm': args.algorithm, 'breach_status': args.breach_status,
+               'min_score': args.min_score, 'max_score': args.max_score}
+    return normalize_filters({key: value for key, value in filters.items() if value is not None})
+
+def estimate_migration(args, target, filters, progress):
+    """Matching rows per shard and a duration estimate from hashing a small sample"""
+    where, params = filter_sql(filters, target.upper())
+    shards, sample = [], []
+    for index, path in enumerate(backend.user_shards.paths):
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        try:
+            shards.append(conn.execute(f'SELECT COUNT(*) FROM users WHERE {where}', params).fetchone()[0])
+            if len(sample) < ESTIMATE_SAMPLE:
+                sample += conn.execute(f'SELECT hash_md5, password_hash FROM users WHERE {where} LIMIT ?',
+                                       (*params, ESTIMATE_SAMPLE - len(sample))).fetchall()
+        finally:
+            conn.close()
+    per_row = None
+    if sample:
+        started = time.perf_counter()
+        for row in sample:
+            backend.hash_with_custom_salt(base_hash(row), args.salt_length, target)
+        per_row = (time.perf_counter() - started) / len(sample)
+    total = sum(shards)
+    progress.emit('migrate', 'dry run', matching=total, sampled=len(sample))
+    return {
+        'dryRun': True,
+        'matching': total,
+        'perShard': shards,
+        'secondsPerRow': round(per_row, 6) if per_row is not None else None,
+        # Hashing dominates; workers split it, the writes stay serial per shard
+        'estimatedSeconds': round(total * per_row / max(1, args.workers), 1) if per_row is not None else 0
+    }
+
+def command_migrate(args, progress):
+    target = args.to.lower()
+    if target not in backend.MIGRATION_TARGETS:
+        raise ValueError(f"--to must be one of {', '.join(backend.MIGRATION_TARGETS)}")
+    if not 2 <= args.salt_length <= 128 or not 1 <= args.chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"--salt-length must be 2-128 and --chunk-size 1-{MAX_CHUNK_SIZE}")
+    filters = migration_filters(args)
+    run_id = args.run_id or default_run_id(target, args.salt_length, filters)
+    if args.dry_run:
+        return {'runId': run_id, 'targetAlgorithm': target, 'filters': filters,
+                **estimate_migration(args, target, filters, progress)}
+
+    # Each shard keeps its own run record and checkpoint, the same records the
+    # server's /api/hash-migration/runs endpoints combine, show and resume
+    records = []
+    for index, path in enumerate(backend.user_shards.paths):
+        conn = sqlite3.connect(path, timeout=30)
+        try:
+            ensure_runs_table(conn)
+            record = load_run(conn, run_id)
+            if record is None:
+                record = create_run(conn, run_id, target, args.salt_length, args.chunk_size, filters)
+                conn.commit()
+        finally:
+            conn.close()
+        if record['state'] == 'running' and not args.force:
+            raise ValueError(f"run {run_id} is marked running on shard {index} (is a server running it?); "
+                             f"pass --force once it is not")
+        records.append(record)
+
+    current = {}
+
+    def pause_on_interrupt(signum, frame):
+        # The chunk in progress still commits with its checkpoint
+        progress.emit('migrate', 'interrupted, pausing after the current chunk')
+        if current.get('run'):
+            current['run'].pause()
+        current['interrupted'] = True
+
+    previous_handler = signal.signal(signal.SIGINT, pause_on_interrupt)
+    # Algorithms that hash in C without the GIL scale on threads (no process start-up or pickling)
+    executor = (concurrent.futures.ThreadPoolExecutor if backend.hash_algorithms.get(target).releases_gil
+                else concurrent.futures.ProcessPoolExecutor)
+    pool = executor(max_workers=args.workers) if args.workers > 1 else None
+    statuses = []
+    try:
+        for index, (path, record) in enumerate(zip(backend.user_shards.paths, records)):
+            if record['state'] == 'completed' or current.get('interrupted'):
+                statuses.append(MigrationRun(path, record, backend.hash_with_custom_salt).status())
+                continue
+            run = MigrationRun(path, record, backend.hash_with_custom_salt, backend.store_hex,
+                               backend.write_contention, pool)
+            current['run'] = run
+            progress.emit('migrate', f"shard {index} from checkpoint {record['last_id']}", shard=index)
+            statuses.append(run.run(progress_callback=lambda status, index=index: progress.emit(
+                'migrate', f"shard {index}", shard=index, converted=status['converted'],
+                failed=status['failed'], skipped=status['skipped'], total=status['total'],
+                percent=status['percent'], rowsPerSec=status['rowsPerSec'], etaSeconds=status['etaSeconds'])))
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+        if pool:
+            pool.shutdown()
+
+    states = [status['state'] for status in statuses]
+    return {
+        'success': 'failed' not in states,
+        'dryRun': False,
+        'runId': run_id,
+        'state': 'completed' if set(states) == {'completed'} else ('failed' if 'failed' in states else 'paused'),
+        'converted': sum(status['converted'] for status in statuses),
+        'failed': sum(status['failed'] for status in statuses),
+        'skipped': sum(status['skipped'] for status in statuses),
+        'workers': args.workers,
+        'shards': statuses,
+        'writeContention': backend.write_contention.snapshot()
+    }
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python admin_cli.py --db database.db stats                                   ║
+# ║  python admin_cli.py audit --sections weak breached --result audit.json       ║
+# ║  python admin_cli.py export --format jsonl --output users.jsonl               ║
+# ║  python admin_cli.py resalt --dry-run | resalt --chunk-size 1000 --workers 4 ║
+# ║  python admin_cli.py migrate --to bcrypt --algorithm MD5 --workers 8          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+COMMANDS = {
+    'init': command_init,
+    'stats': command_stats,
+    'audit': command_audit,
+    'export': command_export,
+    'resalt': command_resalt,
+    'rotate-salts': command_rotate_salts,
+    'migrate': command_migrate
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline bulk administration of a user database')
+    parser.add_argument('--db', default=backend.DB_PATH, help='Main database file (shards are found next to it)')
+    parser.add_argument('--result', help='Write the result JSON here instead of stdout')
+    parser.add_argument('--progress-format', choices=['text', 'json'], default='text',
+                        help='Progress lines on stderr as text or JSON lines')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    init = sub.add_parser('init', help='Create (or bring up to date) the schema and demo data')
+    init.add_argument('--shards', type=int, default=backend.USER_SHARDS, help='User shards for a new database')
+    init.add_argument('--storage', choices=['text', 'blob'], default=backend.HASH_STORAGE,
+                      help='Hash storage for a new database')
+
+    sub.add_parser('stats', help='User counts by shard, algorithm and breach status')
+
+    audit = sub.add_parser('audit', help='Duplicate/weak/breached/distribution audit report')
+    audit.add_argument('--sections', nargs='+', choices=backend.AUDIT_SECTIONS)
+
+    export = sub.add_parser('export', help='Stream every user to CSV or JSON lines')
+    export.add_argument('--format', choices=['csv', 'jsonl'], default='jsonl')
+    export.add_argument('--output', required=True)
+    export.add_argument('--progress-every', type=int, default=10000)
+
+    resalt = sub.add_parser('resalt', help='Re-salt weak users (as POST /api/resalt/all)')
+    resalt.add_argument('--dry-run', action='store_true', help='Only count the candidates')
+    resalt.add_argument('--chunk-size', type=int, default=1000, help='Users per commit')
+    resalt.add_argument('--workers', type=int, default=1, help='Shards re-salted in parallel')
+    resalt.add_argument('--include-users', action='store_true', help='List every re-salted user in the result')
+
+    rotate = sub.add_parser('rotate-salts', help='Rotate every user salt (as the auto-resalt thread)')
+    rotate.add_argument('--dry-run', action='store_true', help='Only count the users')
+
+    migrate = sub.add_parser('migrate', help='Checkpointed hash migration (as /api/hash-migration/runs)')
+    migrate.add_argument('--to', required=True, help=f"Target: {', '.join(backend.MIGRATION_TARGETS)}")
+    migrate.add_argument('--algorithm', nargs='+', help='Only users stored with these algorithms')
+    migrate.add_argument('--breach-status', nargs='+')
+    migrate.add_argument('--min-score', type=int)
+    migrate.add_argument('--max-score', type=int)
+    migrate.add_argument('--salt-length', type=int, default=32)
+    migrate.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    migrate.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                         help='Hashing processes (1 = hash inline)')
+    migrate.add_argument('--run-id', help='Resume/name a run (default: derived from the definition)')
+    migrate.add_argument('--dry-run', action='store_true', help='Count matching users and estimate the time')
+    migrate.add_argument('--force', action='store_true', help='Take over a run left marked running')
+    args = parser.parse_args(argv)
+
+    progress = Progress(args.progress_format)
+    try:
+        if args.command != 'init':
+            backend.attach_db(args.db)
+        result = COMMANDS[args.command](args, progress)
+    except ValueError as e:
+        progress.emit('error', str(e))
+        return 2
+
+    document = {'success': result.pop('success', True), 'command': args.command, 'db': args.db, **result}
+    if args.result:
+        with open(args.result, 'w') as f:
+            json.dump(document, f, indent=2, default=str)
+        progress.emit('done', f"result written to {args.result}")
+    else:
+        json.dump(document, sys.stdout, indent=2, default=str)
+        print()
+    return 0 if document['success'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
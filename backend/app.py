@@ -8,17 +8,56 @@ Handles user registration with Argon2 hashing and automatic salt rotation
 # ║  All required libraries for Flask API, hashing, database, and security        ║
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 import sqlite3
 import hashlib
+import json
 import secrets
 import os
 import threading
 import time
 from datetime import datetime, timedelta
-import bcrypt
-import requests
+from hash_importer import (import_stream, content_job_id, spool as spool_upload, RAW_DIGEST_LABELS,
+                           DEFAULT_BATCH_SIZE as IMPORT_BATCH_SIZE)
+from hash_migration import (MigrationRun, ShardedMigrationRun, create_run as create_migration_run, load_run as load_migration_run,
+                            list_runs as list_migration_runs, mark_interrupted as mark_migrations_interrupted,
+                            normalize_filters as normalize_migration_filters, default_run_id as default_migration_run_id,
+                            DEFAULT_CHUNK_SIZE as MIGRATION_CHUNK_SIZE, MAX_CHUNK_SIZE as MAX_MIGRATION_CHUNK,
+                            RESUMABLE_STATES as MIGRATION_RESUMABLE_STATES, base_hash as migration_base_hash)
+from response_cache import DataVersion, ResponseCache, etag_cached
+from response_encoding import ResponseCompressor, install_json_provider
+from argon2_hashing import (hash_with_salt, hash_with_salt_raw, hash_batch as argon2_hash_batch,
+                            ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM, ARGON2_HASH_LEN)
+from multi_hash import compute_digests, compute_batch, normalize_algorithms
+from hash_storage import (pack_hex, hex_row_factory, hex_sql, read_storage_mode,
+                          write_storage_mode, create_hex_views)
+from password_scoring import analyze_batch, score_password, rescore_users, NUMPY_AVAILABLE
+from crack_time import CrackTimeEstimator, normalize_algorithms as normalize_crack_algorithms
+from hash_benchmark import (run_benchmark, default_specs as default_benchmark_specs, load_results as load_hash_rates,
+                            save_results as save_hash_rates, summarize as summarize_hash_rates,
+                            apply_to_estimator, DEFAULT_CACHE_PATH as HASH_RATES_CACHE)
+from audit_report import scan as scan_audit, finish as finish_audit, SECTIONS as AUDIT_SECTIONS
+from db_snapshot import enable_wal, open_snapshot
+from row_versioning import (ensure_row_version, cas_update, update_with_retry, ContentionCounter,
+                           UPDATED as CAS_UPDATED, CONFLICT as CAS_CONFLICT)
+from user_search import (create_search_index, search_users, SEARCH_MODES, SEARCH_FIELDS,
+                         DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+from user_shards import (UserShards, allocate_id, insert_sharded, merge_sorted, read_shard_count, sum_counts,
+                         write_shard_count)
+from lazy_imports import LazyModule, available
+from hash_algorithms import default_registry
+
+# Loaded on first use: HIBP lookups (requests); bcrypt/argon2 load in hash_algorithms
+requests = LazyModule('requests')
+from wordlist_index import (get_index as get_wordlist_index, audit_database as audit_wordlist, DEFAULT_INDEX_DIR,
+                            AUDIT_TABLES as WORDLIST_AUDIT_TABLES)
+from mask_attack import MaskAttack, load_targets as load_mask_targets, ATTACK_ALGORITHMS
+from rainbow_table import RainbowTable, demo_report as rainbow_demo_report, REDUCTIONS, DEFAULT_CHAIN_LENGTH
+from demo_data_generator import generate_users as generate_synthetic_users, TABLES as SYNTHETIC_TABLES
+from password_generator import (generate as generate_passwords_bulk, build_charset, entropy_bits,
+                                MODES as GENERATOR_MODES, MIN_LENGTH as GENERATOR_MIN_LENGTH,
+                                MAX_LENGTH as GENERATOR_MAX_LENGTH, MIN_WORDS, MAX_WORDS)
 
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                           ARGON2 CONFIGURATION                                 ║
@@ -26,25 +65,29 @@ import requests
 # ║  If not available, falls back to bcrypt                                        ║
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
-# Try to import argon2, fallback to simulation if not available
-try:
-    from argon2 import PasswordHasher, Type
-    from argon2.exceptions import VerifyMismatchError
-    ARGON2_AVAILABLE = True
-    ph = PasswordHasher(
-        time_cost=2,
-        memory_cost=65536,
-        parallelism=1,
-        hash_len=32,
-        salt_len=16,
-        type=Type.ID
-    )
-except ImportError:
-    ARGON2_AVAILABLE = False
+# argon2 is located now but imported (and the PasswordHasher built) on first use;
+# fallback to bcrypt if not available
+ARGON2_AVAILABLE = available('argon2')
+
+if not ARGON2_AVAILABLE:
     print("⚠️ argon2-cffi not installed.")
     print("   Install with: pip install argon2-cffi")
 
 BCRYPT_AVAILABLE = True  # bcrypt is now installed
+BCRYPT_ROUNDS = 12
+
+# Every hash/verify/migration path dispatches through this registry (hash_algorithms.py);
+# adding an algorithm there makes it a migration target and verifiable everywhere
+hash_algorithms = default_registry(bcrypt_rounds=BCRYPT_ROUNDS)
+
+# Labels written by registration, demo data and the importer, hashed from the password
+# itself; every other label (SHA*, and migration targets in upper case) hashes
+# MD5(password) + salt
+DIRECT_HASH_LABELS = {'MD5': 'MD5', 'bcrypt': 'BCRYPT', 'Argon2': 'ARGON2ID', **RAW_DIGEST_LABELS}
+
+def password_hasher():
+    """Shared Argon2id PasswordHasher (built on the first hash or verify)"""
+    return hash_algorithms.get('ARGON2ID').hasher()
 
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                           FLASK APP INITIALIZATION                             ║
@@ -54,6 +97,12 @@ BCRYPT_AVAILABLE = True  # bcrypt is now installed
 app = Flask(__name__, static_folder='../static', static_url_path='/static')
 CORS(app)
 
+# Response encoding: orjson for jsonify (if installed) and gzip/brotli above 1 KB
+JSON_ENCODER = install_json_provider(app, enabled=os.environ.get('FAST_JSON', '1') == '1')
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+compressor = ResponseCompressor(min_size=COMPRESSION_MIN_SIZE)
+compressor.init_app(app)
+
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                           DATABASE CONFIGURATION                               ║
 # ║  SQLite database path and auto-resalt configuration                           ║
@@ -62,11 +111,61 @@ CORS(app)
 # Database path
 DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
 
+# Hash column storage: 'text' (hex) or 'blob' (raw digest bytes, half the size)
+# The mode recorded in the database wins; convert with `python hash_storage.py migrate`
+HASH_STORAGE = os.environ.get('HASH_STORAGE', 'text')
+
 # Auto-resalt configuration (in seconds)
 AUTO_RESALT_INTERVAL = 300  # 5 minutes for demo (set to 3600 for 1 hour in production)
 auto_resalt_enabled = False
 resalt_thread = None
 
+# User retention policy: 'unlimited', 'max_rows' or 'max_age'
+# Enforced by a background thread (never on the registration request path)
+RETENTION_MODE = os.environ.get('USER_RETENTION_MODE', 'unlimited')
+RETENTION_MAX_ROWS = int(os.environ.get('USER_RETENTION_MAX_ROWS', 30))
+RETENTION_MAX_AGE_DAYS = float(os.environ.get('USER_RETENTION_MAX_AGE_DAYS', 30))
+RETENTION_INTERVAL = int(os.environ.get('USER_RETENTION_INTERVAL', 60))
+RETENTION_DELETE_CHUNK = 10000
+retention_thread = None
+
+# Compare-and-swap conflicts on users.row_version, per writer (shown in /api/health)
+write_contention = ContentionCounter()
+
+# Users are split across this many SQLite files by a hash of the email (1 = database.db only)
+# The count recorded in the database wins once it has users; shards live next to DB_PATH
+USER_SHARDS = int(os.environ.get('USER_SHARDS', 1))
+user_shards = None  # UserShards, built by init_db
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           RESPONSE CACHING                                     ║
+# ║  Data version (local writes + PRAGMA data_version) drives strong ETags        ║
+# ║  for the polled dashboard endpoints; unchanged polls get 304                  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+# Every user shard file, so writes from the CLI, retention and migration threads count
+data_version = DataVersion(lambda: user_shards.paths if user_shards else DB_PATH)
+response_cache = ResponseCache(max_entries=256)
+
+# POST endpoints that only compute (never write) and must not invalidate cached responses
+READ_ONLY_POSTS = {
+    '/api/hash', '/api/hash/multi', '/api/hash/batch',
+    '/api/score', '/api/crack-time', '/api/passwords/generate', '/api/attack/mask',
+    '/api/attack/rainbow', '/api/benchmark/hash-rates'
+}
+
+@app.after_request
+def bump_data_version(response):
+    """Any non-GET API call may have written - invalidate cached responses"""
+    if (request.path.startswith('/api/') and request.method not in ('GET', 'HEAD', 'OPTIONS')
+            and request.path not in READ_ONLY_POSTS):
+        data_version.bump()
+    return response
+
+def today_key():
+    """Vary key for responses that depend on the current date"""
+    return datetime.now().strftime('%Y-%m-%d')
+
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                           CORE HASHING FUNCTIONS                               ║
 # ║  Functions for generating salts and hashing passwords with various algorithms ║
@@ -107,15 +206,20 @@ def check_password_pwned(password):
 def hash_password_bcrypt(password):
     """Hash password using bcrypt"""
     # bcrypt generates its own salt internally
-    password_bytes = password.encode('utf-8')
-    hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=12))
-    return hashed.decode('utf-8'), ''  # Return empty salt since bcrypt handles it internally
+    return hash_algorithms.get('BCRYPT').hash(password), ''  # Return empty salt since bcrypt handles it internally
 
-def hash_password_argon2(password):
-    """Hash password using Argon2id algorithm"""
+def hash_password_argon2(password, salt=None):
+    """
+    Hash password using Argon2id algorithm
+    
+    With a salt the hash is deterministic (low-level hash_secret); without one
+    Argon2 draws a random salt internally and an empty salt is returned.
+    """
     if ARGON2_AVAILABLE:
+        if salt:
+            return hash_with_salt(password, salt), salt
         # Argon2 handles salt internally
-        hash_result = ph.hash(password)
+        hash_result = password_hasher().hash(password)
         return hash_result, ''  # Return empty salt since Argon2 handles it internally
     else:
         # Fallback: Use bcrypt if Argon2 not available
@@ -124,25 +228,14 @@ def hash_password_argon2(password):
 def hash_password_md5(password):
     """Hash password using MD5 (NOT SECURE - for educational/lab purposes only)"""
     # MD5 is NOT secure for password storage, but implementing as requested
-    hash_result = hashlib.md5(password.encode('utf-8')).hexdigest()
-    return hash_result, ''  # Return empty salt
+    return hash_algorithms.get('MD5').hash(password), ''  # Return empty salt
 
 def verify_password_after_resalt(password, salt, stored_hash, original_md5):
     """
     Verify password for re-salted users
     Process: password → MD5 → MD5+salt → SHA256
     """
-    # Step 1: Hash password with MD5
-    md5_hash = hashlib.md5(password.encode('utf-8')).hexdigest()
-    
-    # Step 2: Add salt to MD5 hash
-    salted_input = md5_hash + salt
-    
-    # Step 3: Hash with SHA-256
-    final_hash = hashlib.sha256(salted_input.encode()).hexdigest()
-    
-    # Compare with stored hash
-    return final_hash == stored_hash
+    return verify_password(password, 'SHA256', stored_hash, salt)
 
 def hash_with_custom_salt(input_hash, salt_length, target_algorithm):
     """
@@ -151,97 +244,143 @@ def hash_with_custom_salt(input_hash, salt_length, target_algorithm):
     Args:
         input_hash: The input hash (e.g., MD5 hash)
         salt_length: Length of salt in bytes (8, 16, 32, 64, etc.)
-        target_algorithm: Target hash algorithm (sha1, sha256, sha512, argon2id, bcrypt)
+        target_algorithm: Target hash algorithm (any of MIGRATION_TARGETS)
     
     Returns:
         tuple: (final_hash, salt_used)
-    """
-    # Generate salt
-    salt = generate_salt(salt_length)
     
-    # Combine input hash with salt
-    salted_input = input_hash + salt
+    Raises:
+        ValueError: for algorithms not in hash_algorithms
+    """
+    algorithm = hash_algorithms.get(target_algorithm)
     
-    # Hash based on target algorithm
-    if target_algorithm.lower() == 'sha1':
-        final_hash = hashlib.sha1(salted_input.encode()).hexdigest()
-        return final_hash, salt
-    elif target_algorithm.lower() == 'sha256':
-        final_hash = hashlib.sha256(salted_input.encode()).hexdigest()
-        return final_hash, salt
-    elif target_algorithm.lower() == 'sha512':
-        final_hash = hashlib.sha512(salted_input.encode()).hexdigest()
-        return final_hash, salt
-    elif target_algorithm.lower() == 'bcrypt':
-        # For bcrypt, hash the salted input
-        password_bytes = salted_input.encode('utf-8')
-        hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=12))
-        return hashed.decode('utf-8'), salt
-    elif target_algorithm.lower() == 'argon2id' and ARGON2_AVAILABLE:
-        # For Argon2id, hash the salted input
-        hash_result = ph.hash(salted_input)
-        return hash_result, salt
-    else:
-        # Default to SHA-256
-        final_hash = hashlib.sha256(salted_input.encode()).hexdigest()
-        return final_hash, salt
-
-def verify_password(password, algorithm, password_hash):
-    """Verify password against stored hash"""
+    # Generate salt; each algorithm combines it with the input hash its own way
+    salt = generate_salt(salt_length)
+    return algorithm.hash(input_hash, salt), salt
+
+def stored_hash_scheme(label):
+    """(registry algorithm, True if it hashes the password directly) for a stored label"""
+    if label in DIRECT_HASH_LABELS:
+        return hash_algorithms.get(DIRECT_HASH_LABELS[label]), True
+    return hash_algorithms.get(label), False
+
+def verify_password(password, algorithm, password_hash, salt=''):
+    """Verify password against a stored hash, its algorithm label and salt"""
+    if algorithm not in DIRECT_HASH_LABELS and algorithm not in hash_algorithms:
+        return False    # e.g. 'Multi-Hash' rows carry no verifiable hash
     try:
-        if algorithm == 'bcrypt':
-            password_bytes = password.encode('utf-8')
-            hash_bytes = password_hash.encode('utf-8')
-            return bcrypt.checkpw(password_bytes, hash_bytes)
-        elif algorithm == 'Argon2' and ARGON2_AVAILABLE:
-            try:
-                ph.verify(password_hash, password)
-                return True
-            except VerifyMismatchError:
-                return False
-        else:
-            return False
+        hasher, direct = stored_hash_scheme(algorithm)
+        if direct:
+            return hasher.verify(password, '', password_hash)
+        # Re-salted and migrated rows: algorithm over MD5(password) + salt
+        return hasher.verify(hash_algorithms.get('MD5').hash(password), salt or '', password_hash)
     except Exception as e:
         print(f"Verification error: {e}")
         return False
 
-def get_db():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+def get_db(path=None):
+    """Get database connection (the main database unless a shard path is given)"""
+    conn = sqlite3.connect(path or DB_PATH)
+    # BLOB digests are presented as hex so API output is identical in both modes
+    conn.row_factory = hex_row_factory if HASH_STORAGE == 'blob' else sqlite3.Row
+    return conn
+
+def get_snapshot_db(path=None):
+    """
+    Read-only connection pinned to one snapshot for audits and exports
+    
+    In WAL mode the snapshot never blocks registrations, resalts or imports;
+    .snapshot records when it was taken and the data version it reflects.
+    """
+    # Version first: a write landing in between makes the snapshot newer than
+    # its label (harmless), never older
+    version = data_version.current()
+    conn = open_snapshot(path or DB_PATH, hex_row_factory if HASH_STORAGE == 'blob' else sqlite3.Row)
+    conn.snapshot['dataVersion'] = version
     return conn
 
+def shard_snapshots(fn):
+    """
+    Run fn(conn, shard_index) on a snapshot of every user shard in parallel
+    
+    Returns:
+        tuple: (results in shard order, snapshot info; with several shards the
+               oldest takenAt and the shard count)
+    """
+    results = user_shards.map(lambda conn, index: (fn(conn, index), conn.snapshot), get_snapshot_db)
+    snapshots = [snapshot for _, snapshot in results]
+    snapshot = snapshots[0]
+    if user_shards.sharded:
+        # Each shard is its own consistent snapshot; they are not one atomic cut
+        snapshot = dict(snapshot, takenAt=min(s['takenAt'] for s in snapshots), shards=len(snapshots))
+    return [result for result, _ in results], snapshot
+
+def fan_out_audit(sections):
+    """Scan every shard's users in parallel and merge the audit sections"""
+    started = time.perf_counter()
+    scans, snapshot = shard_snapshots(lambda conn, index: scan_audit(conn, sections))
+    return finish_audit(scans, started), snapshot
+
+def store_hex(value):
+    """Convert a hex digest/salt to the configured storage representation"""
+    return pack_hex(value) if HASH_STORAGE == 'blob' else value
+
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                           DATABASE INITIALIZATION                              ║
 # ║  Creates tables: users, demo_users, resalt_log                                 ║
 # ║  Also populates 30 demo users with MD5 hashes for lab demonstrations          ║
+# ║  Databases stamped with SCHEMA_VERSION skip both on later starts              ║
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
-def init_db():
-    """Initialize the database with users table"""
-    conn = get_db()
+# Stored in PRAGMA user_version once create_schema and the demo seed have run;
+# bump it whenever either changes so existing databases are brought up to date
+SCHEMA_VERSION = 1
+
+def schema_is_current(conn):
+    """True when the database was initialized by this SCHEMA_VERSION"""
+    return conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+
+USERS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        algorithm TEXT DEFAULT 'Multi-Hash',
+        salt TEXT NOT NULL,
+        password_hash TEXT NOT NULL,
+        hash_md5 TEXT,
+        hash_sha1 TEXT,
+        hash_sha256 TEXT,
+        hash_sha512 TEXT,
+        security_score INTEGER DEFAULT 0,
+        breach_status TEXT DEFAULT 'UNKNOWN',
+        resalt_count INTEGER DEFAULT 0,
+        last_resalt TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        row_version INTEGER NOT NULL DEFAULT 0
+    )
+'''
+
+def init_user_shard(path):
+    """Create the users table (and its indexes) in one extra shard file"""
+    conn = get_db(path)
+    if not schema_is_current(conn):
+        enable_wal(conn)
+        conn.execute(USERS_TABLE_SQL)
+        ensure_row_version(conn)
+        create_search_index(conn)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+    conn.close()
+
+def create_schema(conn):
+    """Tables and indexes of the main database (idempotent; caller commits)"""
     cursor = conn.cursor()
     
     # Create users table with multi-hash support
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            algorithm TEXT DEFAULT 'Multi-Hash',
-            salt TEXT NOT NULL,
-            password_hash TEXT NOT NULL,
-            hash_md5 TEXT,
-            hash_sha1 TEXT,
-            hash_sha256 TEXT,
-            hash_sha512 TEXT,
-            security_score INTEGER DEFAULT 0,
-            breach_status TEXT DEFAULT 'UNKNOWN',
-            resalt_count INTEGER DEFAULT 0,
-            last_resalt TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    cursor.execute(USERS_TABLE_SQL)
+    # Databases created before optimistic concurrency get the column added
+    ensure_row_version(conn)
     
     # Create demo data table
     cursor.execute('''
@@ -275,7 +414,17 @@ def init_db():
         )
     ''')
     
+    # Index used by the retention cascade on resalt_log
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_resalt_log_user_id ON resalt_log(user_id)')
+    
+    # Name/email full-text index and filter indexes for /api/users/search
+    if not create_search_index(conn):
+        print("⚠️  SQLite has no FTS5; /api/users/search falls back to unindexed scans")
+
+def seed_demo_users(conn):
+    """Insert the 30 demo users into an empty demo_users table (caller commits)"""
     # Check if demo data exists
+    cursor = conn.cursor()
     cursor.execute('SELECT COUNT(*) FROM demo_users')
     if cursor.fetchone()[0] == 0:
         # Insert 30 demo records with salts
@@ -319,71 +468,388 @@ def init_db():
             password = f"password{i+1}"
             password_hash = hashlib.md5(password.encode('utf-8')).hexdigest()
             created_at = base_date + timedelta(hours=i * 3)
-            demo_data.append((name, email, "MD5", "", password_hash, 0, None, created_at.strftime("%Y-%m-%d %H:%M:%S")))
+            demo_data.append((name, email, "MD5", "", store_hex(password_hash), 0, None, created_at.strftime("%Y-%m-%d %H:%M:%S")))
         
         cursor.executemany('''
             INSERT INTO demo_users (name, email, algorithm, salt, password_hash, resalt_count, last_resalt, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', demo_data)
+
+def init_db():
+    """Initialize the database with users table"""
+    global HASH_STORAGE, user_shards
+    conn = get_db()
+    
+    # WAL lets snapshot readers (audits, exports) run alongside writers
+    # (the mode is stored in the file, so later starts only read it back)
+    journal_mode = enable_wal(conn)
+    if journal_mode != 'wal':
+        print(f"⚠️  WAL unavailable (journal_mode={journal_mode}); audits will hold a shared lock while they read")
+    
+    # Fast path: a database already at SCHEMA_VERSION skips all DDL and the demo seed
+    schema_current = schema_is_current(conn)
+    if not schema_current:
+        create_schema(conn)
+    
+    cursor = conn.cursor()
+    
+    # Hash storage mode: a fresh database takes HASH_STORAGE, existing data keeps its mode
+    requested_storage = HASH_STORAGE
+    cursor.execute('SELECT EXISTS(SELECT 1 FROM users) OR EXISTS(SELECT 1 FROM demo_users)')
+    has_rows = cursor.fetchone()[0]
+    HASH_STORAGE = read_storage_mode(conn, default='text' if has_rows else requested_storage)
+    if not schema_current:
+        write_storage_mode(conn, HASH_STORAGE)
+        create_hex_views(conn)
+    if requested_storage != HASH_STORAGE:
+        print(f"⚠️ Database uses {HASH_STORAGE} hash storage (HASH_STORAGE={requested_storage} ignored)")
+        print(f"   Convert with: python hash_storage.py migrate --to {requested_storage}")
+    
+    # User shards: ids and routing depend on the count, so the recorded count wins
+    # (databases with users from before sharding are one shard)
+    cursor.execute('SELECT EXISTS(SELECT 1 FROM users)')
+    shard_count = read_shard_count(conn, default=1 if cursor.fetchone()[0] else USER_SHARDS)
+    if not schema_current:
+        write_shard_count(conn, shard_count)
+    if shard_count != USER_SHARDS:
+        print(f"⚠️ Database has {shard_count} user shard(s) (USER_SHARDS={USER_SHARDS} ignored)")
+    if user_shards is not None:
+        user_shards.close()
+    user_shards = UserShards(DB_PATH, shard_count, get_db)
+    for path in user_shards.paths[1:]:
+        init_user_shard(path)
+    
+    # Migration runs whose thread died with the previous process resume on request
+    # (every shard keeps its own run records)
+    interrupted = mark_migrations_interrupted(conn)
+    for path in user_shards.paths[1:]:
+        shard = get_db(path)
+        mark_migrations_interrupted(shard)
+        shard.commit()
+        shard.close()
+    if interrupted:
+        print(f"⚠️  {interrupted} hash migration run(s) interrupted; resume with POST /api/hash-migration/runs/<id>/resume")
+    
+    if not schema_current:
+        seed_demo_users(conn)
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
     
     conn.commit()
     conn.close()
     print("✅ Database initialized successfully!")
 
+def attach_db(path):
+    """
+    Point the app at an existing database without init_db (offline tools)
+    
+    Unlike init_db nothing is created, seeded or marked interrupted, so a
+    server running on the same file is left undisturbed.
+    
+    Raises:
+        ValueError: if the database was not initialized at SCHEMA_VERSION
+    """
+    global DB_PATH, HASH_STORAGE, user_shards
+    if not os.path.exists(path):
+        raise ValueError(f"{path} does not exist")
+    conn = sqlite3.connect(path)
+    try:
+        if not schema_is_current(conn):
+            raise ValueError(f"{path} is not at schema version {SCHEMA_VERSION}; initialize it first")
+        HASH_STORAGE = read_storage_mode(conn, default='text')
+        shard_count = read_shard_count(conn)
+    finally:
+        conn.close()
+    DB_PATH = path
+    if user_shards is not None:
+        user_shards.close()
+    user_shards = UserShards(DB_PATH, shard_count, get_db)
+
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                           AUTO-RESALT FEATURE                                  ║
 # ║  Background thread that automatically resalts all users at intervals          ║
 # ║  Demonstrates periodic salt rotation for enhanced security                    ║
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
-def resalt_all_users():
+def rotate_all_salts():
     """Resalt all users with new salt values"""
     conn = get_db()
     cursor = conn.cursor()
+    resalted_count = 0
+    
+    # Each shard is rotated and committed in turn; resalt_log lives in the main database
+    for path in user_shards.paths:
+        shard = conn if path == DB_PATH else get_db(path)
+        resalted_count += rotate_shard_salts(shard, cursor)
+        if shard is not conn:
+            shard.commit()
+            shard.close()
     
+    conn.commit()
+    conn.close()
+    
+    return resalted_count
+
+def rotate_shard_salts(conn, log_cursor):
+    """Resalt the users of one shard, logging to log_cursor (caller commits)"""
     # Get all users
-    cursor.execute('SELECT id, salt, password_hash FROM users')
-    users = cursor.fetchall()
+    users = conn.execute('SELECT id, salt, resalt_count, row_version FROM users').fetchall()
     
     resalted_count = 0
     for user in users:
-        old_salt = user['salt']
         new_salt = generate_salt(16)
         
         # Note: In a real system, you'd need the original password to rehash
         # For demo purposes, we're just updating the salt (showing the concept)
         # In production, you'd prompt users to re-enter password on next login
         
-        cursor.execute('''
-            UPDATE users 
-            SET salt = ?, 
-                resalt_count = resalt_count + 1,
-                last_resalt = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (new_salt, user['id']))
+        # Compare-and-swap: a row rewritten by another writer since it was read is re-read
+        replaced = {}
+        def rotated(row):
+            replaced['salt'] = row['salt']
+            return {
+                'salt': store_hex(new_salt),
+                'resalt_count': row['resalt_count'] + 1,
+                'last_resalt': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+            }
+        status, _ = update_with_retry(conn, user['id'], ('salt', 'resalt_count'), rotated,
+                                      write_contention, 'auto-resalt', row=user)
+        if status != CAS_UPDATED:
+            continue
         
         # Log the resalt
-        cursor.execute('''
+        log_cursor.execute('''
             INSERT INTO resalt_log (user_id, old_salt, new_salt)
             VALUES (?, ?, ?)
-        ''', (user['id'], old_salt, new_salt))
+        ''', (user['id'], replaced['salt'], new_salt))
         
         resalted_count += 1
     
-    conn.commit()
-    conn.close()
-    
     return resalted_count
 
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           WEAK-USER RE-SALTING                                 ║
+# ║  Shared by POST /api/resalt/all and `admin_cli.py resalt`: users with MD5,    ║
+# ║  missing/short salts or low scores get SHA-256(hash + new salt), keeping     ║
+# ║  the original MD5 so the password still verifies                             ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+RESALT_CANDIDATES_WHERE = '''
+    (algorithm = 'MD5'
+     OR salt IS NULL
+     OR salt = ''
+     OR LENGTH(''' + hex_sql('salt') + ''') < 16
+     OR security_score < 50)
+    AND NOT (algorithm IN (''' + ', '.join(f"'{label}'" for label in RAW_DIGEST_LABELS) + ''') AND hash_md5 IS NULL)
+'''
+
+def resalted_values(row):
+    """New columns for one weak user (row as read by resalt_weak_users)"""
+    # Preserve original MD5
+    original_md5 = row['hash_md5'] if row['hash_md5'] else row['password_hash']
+    
+    # Generate new salt
+    new_salt = secrets.token_hex(16)
+    
+    # Create SHA-256 hash from: existing_hash + salt
+    salted_hash_input = row['password_hash'] + new_salt
+    new_hash = hashlib.sha256(salted_hash_input.encode()).hexdigest()
+    
+    return {
+        'password_hash': store_hex(new_hash),
+        'salt': store_hex(new_salt),
+        'algorithm': 'SHA256',
+        'security_score': 85,
+        'breach_status': 'SECURE',
+        'hash_md5': store_hex(original_md5)
+    }
+
+def count_resalt_candidates(conn):
+    """Weak users in one shard, by algorithm"""
+    rows = conn.execute(f'SELECT algorithm, COUNT(*) FROM users WHERE {RESALT_CANDIDATES_WHERE} GROUP BY algorithm')
+    return {row[0] or 'UNKNOWN': row[1] for row in rows}
+
+def resalt_weak_users(conn, writer='resalt-all', chunk_size=None, on_chunk=None):
+    """
+    Re-salt the weak users of one shard in id order
+    
+    Args:
+        conn: connection from get_db (hex rows in either storage mode)
+        writer: name counted in write_contention
+        chunk_size: commit every this many users (None = one commit at the end)
+        on_chunk: called with (resalted so far, conflicts so far, last id) after each commit
+    
+    Returns:
+        dict: candidates, users (id, name, email) and conflicts (ids)
+    """
+    resalted_users = []
+    conflicted_users = []
+    candidates = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(f'''
+            SELECT id, name, email, password_hash, algorithm, salt, security_score, hash_md5, row_version
+            FROM users
+            WHERE id > ? AND {RESALT_CANDIDATES_WHERE}
+            ORDER BY id
+            {'LIMIT ?' if chunk_size else ''}
+        ''', (last_id, chunk_size) if chunk_size else (last_id,)).fetchall()
+        if not rows:
+            break
+        candidates += len(rows)
+        for user in rows:
+            # Update user - preserve original MD5; a conflicting write means the
+            # row is re-read and the hash recomputed from its current value
+            status, _ = update_with_retry(conn, user['id'], ('password_hash', 'hash_md5'), resalted_values,
+                                          write_contention, writer, row=user)
+            if status == CAS_CONFLICT:
+                conflicted_users.append(user['id'])
+            if status != CAS_UPDATED:
+                continue
+            resalted_users.append({'id': user['id'], 'name': user['name'], 'email': user['email']})
+        conn.commit()
+        last_id = rows[-1]['id']
+        if on_chunk:
+            on_chunk(len(resalted_users), len(conflicted_users), last_id)
+        if not chunk_size:
+            break
+    return {'candidates': candidates, 'users': resalted_users, 'conflicts': conflicted_users}
+
 def auto_resalt_worker():
     """Background worker for automatic resalting"""
     global auto_resalt_enabled
     while auto_resalt_enabled:
         time.sleep(AUTO_RESALT_INTERVAL)
         if auto_resalt_enabled:
-            count = resalt_all_users()
+            count = rotate_all_salts()
             print(f"🔄 Auto-resalt completed: {count} users resalted at {datetime.now().strftime('%H:%M:%S')}")
 
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           USER RETENTION POLICY                                ║
+# ║  Background thread that trims old users according to RETENTION_MODE          ║
+# ║  Rows are removed below an id threshold (primary-key range delete)            ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def retention_threshold(cursor):
+    """
+    Find the id below which users fall outside the retention policy
+    
+    Returns:
+        int: threshold id (users with id < threshold are expired), or None
+    """
+    if RETENTION_MODE == 'max_rows':
+        # The Nth newest id - walks the primary key index from the top
+        cursor.execute('SELECT id FROM users ORDER BY id DESC LIMIT 1 OFFSET ?',
+                       (max(RETENTION_MAX_ROWS, 1) - 1,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    
+    if RETENTION_MODE == 'max_age':
+        # Ids grow with created_at, so the scan stops at the first row still in retention;
+        # the cutoff is computed in SQL as created_at (CURRENT_TIMESTAMP) is UTC
+        cursor.execute('''
+            SELECT id FROM users
+            WHERE datetime(created_at) >= datetime('now', ?)
+            ORDER BY id
+            LIMIT 1
+        ''', (f'-{RETENTION_MAX_AGE_DAYS} days',))
+        row = cursor.fetchone()
+        if row:
+            return row[0]
+        cursor.execute('SELECT MAX(id) FROM users')
+        max_id = cursor.fetchone()[0]
+        return max_id + 1 if max_id is not None else None
+    
+    return None
+
+def sharded_retention_threshold():
+    """
+    max_rows across every shard: the Nth newest global id (each shard offers its N newest)
+    
+    Returns:
+        int: threshold id, or None while fewer than N users exist
+    """
+    limit = max(RETENTION_MAX_ROWS, 1)
+    newest = merge_sorted(user_shards.map(lambda conn, index: [row[0] for row in conn.execute(
+        'SELECT id FROM users ORDER BY id DESC LIMIT ?', (limit,))]), key=int, limit=limit, reverse=True)
+    return newest[-1] if len(newest) == limit else None
+
+def trim_shard(conn, log_conn, index, threshold=None):
+    """
+    Delete one shard's users below the retention threshold (the shard's own
+    threshold unless one is given) plus their resalt_log rows in log_conn
+    
+    Returns:
+        int: users deleted
+    """
+    cursor = conn.cursor()
+    if threshold is None:
+        threshold = retention_threshold(cursor)
+    cursor.execute('SELECT MIN(id) FROM users')
+    low = cursor.fetchone()[0]
+    if threshold is None or low is None:
+        return 0
+    
+    # Delete in primary-key ranges so each write transaction stays short
+    deleted = 0
+    while low < threshold:
+        high = min(low + RETENTION_DELETE_CHUNK, threshold)
+        # resalt_log is shared by every shard; only this shard's ids (id % N) are removed
+        log_conn.execute('DELETE FROM resalt_log WHERE user_id >= ? AND user_id < ? AND user_id % ? = ?',
+                         (low, high, user_shards.count, index))
+        cursor.execute('DELETE FROM users WHERE id >= ? AND id < ?', (low, high))
+        deleted += cursor.rowcount
+        conn.commit()
+        log_conn.commit()
+        low = high
+    return deleted
+
+def enforce_retention():
+    """Delete users (and their resalt_log rows) outside the retention policy on every shard"""
+    if RETENTION_MODE == 'unlimited':
+        return 0
+    
+    # max_age is per row, so each shard finds its own threshold; max_rows keeps the newest N overall
+    threshold = None
+    if RETENTION_MODE == 'max_rows' and user_shards.sharded:
+        threshold = sharded_retention_threshold()
+        if threshold is None:
+            return 0
+    
+    log_conn = get_db()
+    deleted = 0
+    try:
+        for index, path in enumerate(user_shards.paths):
+            conn = get_db(path) if index else log_conn
+            try:
+                deleted += trim_shard(conn, log_conn, index, threshold)
+            finally:
+                if index:
+                    conn.close()
+    finally:
+        log_conn.close()
+    
+    return deleted
+
+def retention_worker():
+    """Background worker that periodically enforces the retention policy"""
+    while RETENTION_MODE != 'unlimited':
+        try:
+            count = enforce_retention()
+            if count:
+                print(f"🧹 Retention ({RETENTION_MODE}): {count} users removed at {datetime.now().strftime('%H:%M:%S')}")
+        except Exception as e:
+            print(f"⚠️ Retention error: {str(e)}")
+        time.sleep(RETENTION_INTERVAL)
+
+def start_retention_worker():
+    """Start the retention thread if a cap is configured and it is not running"""
+    global retention_thread
+    if RETENTION_MODE == 'unlimited':
+        return
+    if retention_thread is None or not retention_thread.is_alive():
+        retention_thread = threading.Thread(target=retention_worker, daemon=True)
+        retention_thread.start()
+
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                              API ROUTES                                        ║
 # ║  RESTful endpoints for the Security Operations Center Platform                ║
@@ -431,8 +897,6 @@ def register():
         email = data.get('email', '').strip()
         password = data.get('password', '')
         algorithm = 'MD5'  # Hardcoded to MD5
-        hashes = data.get('hashes', {})
-        security_score = data.get('securityScore', 0)
         
         # Validation
         if not name or not email or not password:
@@ -441,14 +905,19 @@ def register():
                 'message': 'All fields are required'
             }), 400
         
-        # Hash password with MD5
-        password_hash, salt = hash_password_md5(password)
+        # Security score is recomputed server-side; client `securityScore` is ignored
+        security_score = score_password(password)['score']
+        
+        # Reference hashes (MD5, SHA-1, SHA-256, SHA-512) computed server-side in one pass;
+        # client-supplied `hashes` are no longer trusted
+        digests = compute_digests(password)
+        hash_md5 = digests['md5']
+        hash_sha1 = digests['sha1']
+        hash_sha256 = digests['sha256']
+        hash_sha512 = digests['sha512']
         
-        # Get hash values for reference (MD5, SHA-1, SHA-256, SHA-512)
-        hash_md5 = hashes.get('md5', '')
-        hash_sha1 = hashes.get('sha1', '')
-        hash_sha256 = hashes.get('sha256', '')
-        hash_sha512 = hashes.get('sha512', '')
+        # Password hash is the MD5 digest (no salt)
+        password_hash, salt = hash_md5, ''
         
         # Determine breach status using local list and HIBP API
         common_passwords = ['123456', 'password', '123456789', '12345678', 'qwerty', 'abc123', 
@@ -471,8 +940,13 @@ def register():
         else:
             breach_status = 'SECURE'
         
-        conn = get_db()
+        # The owning shard takes the write; other shards keep registering in parallel
+        shard = user_shards.index_for_email(email)
+        conn = get_db(user_shards.paths[shard])
         cursor = conn.cursor()
+        if user_shards.sharded:
+            # Hold the shard's write lock from the id allocation to the commit
+            cursor.execute('BEGIN IMMEDIATE')
         
         # Check if email exists
         cursor.execute('SELECT id FROM users WHERE email = ?', (email,))
@@ -483,22 +957,17 @@ def register():
                 'message': 'Email already registered'
             }), 400
         
-        # Insert new user
+        # Insert new user (NULL id = AUTOINCREMENT when unsharded)
+        new_id = allocate_id(conn, shard, user_shards.count) if user_shards.sharded else None
         cursor.execute('''
             INSERT INTO users (
-                name, email, algorithm, salt, password_hash,
+                id, name, email, algorithm, salt, password_hash,
                 hash_md5, hash_sha1, hash_sha256, hash_sha512,
                 security_score, breach_status, resalt_count
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-        ''', (name, email, algorithm, salt, password_hash, hash_md5, hash_sha1, hash_sha256, hash_sha512, security_score, breach_status))
-        
-        # Keep only last 30 users
-        cursor.execute('''
-            DELETE FROM users WHERE id NOT IN (
-                SELECT id FROM users ORDER BY id DESC LIMIT 30
-            )
-        ''')
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+        ''', (new_id, name, email, algorithm, salt, store_hex(password_hash), store_hex(hash_md5), store_hex(hash_sha1),
+              store_hex(hash_sha256), store_hex(hash_sha512), security_score, breach_status))
         
         conn.commit()
         user_id = cursor.lastrowid
@@ -543,23 +1012,22 @@ def register():
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
 @app.route('/api/users', methods=['GET'])
+@etag_cached(data_version, response_cache)
 def get_users():
     """Get all registered users (backend storage)"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        # Newest 30 of each shard, merged into the newest 30 overall
+        pages, snapshot = shard_snapshots(lambda conn, index: conn.execute('''
             SELECT id, name, email, algorithm, salt, password_hash,
                    hash_md5, hash_sha1, hash_sha256, hash_sha512,
                    security_score, breach_status, resalt_count, last_resalt, created_at 
             FROM users 
             ORDER BY id DESC 
             LIMIT 30
-        ''')
+        ''').fetchall())
         
         users = []
-        for row in cursor.fetchall():
+        for row in merge_sorted(pages, key=lambda row: row['id'], limit=30, reverse=True):
             # Truncate hash for display
             full_hash = row['password_hash']
             display_hash = full_hash[:32] + "..." if len(full_hash) > 32 else full_hash
@@ -583,12 +1051,76 @@ def get_users():
                 'createdAt': row['created_at']
             })
         
-        conn.close()
+        return jsonify({
+            'success': True,
+            'users': users,
+            'count': len(users),
+            'snapshot': snapshot
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         USER SEARCH                                            ║
+# ║  GET /api/users/search?q=jo&algorithm=MD5,SHA256&breach_status=BREACHED       ║
+# ║      &min_score=0&max_score=49&limit=25&after=<nextCursor>                    ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+@app.route('/api/users/search', methods=['GET'])
+def search_users_endpoint():
+    """Prefix/token search on name and email with filters, newest first, keyset-paginated"""
+    try:
+        args = request.args
+        mode = args.get('mode', 'prefix')
+        field = args.get('field', 'any')
+        if mode not in SEARCH_MODES or field not in SEARCH_FIELDS:
+            return jsonify({
+                'success': False,
+                'message': f"mode must be one of {', '.join(SEARCH_MODES)}; field one of {', '.join(SEARCH_FIELDS)}"
+            }), 400
+        try:
+            limit = int(args.get('limit', DEFAULT_SEARCH_LIMIT))
+            after = int(args['after']) if args.get('after') else None
+            min_score = int(args['min_score']) if args.get('min_score') else None
+            max_score = int(args['max_score']) if args.get('max_score') else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'limit, after, min_score and max_score must be integers'
+            }), 400
+        if not 1 <= limit <= MAX_SEARCH_LIMIT:
+            return jsonify({
+                'success': False,
+                'message': f'limit must be between 1 and {MAX_SEARCH_LIMIT}'
+            }), 400
+        algorithms = [a for a in args.get('algorithm', '').split(',') if a]
+        statuses = [s.upper() for s in args.get('breach_status', '').split(',') if s]
+        
+        started = time.perf_counter()
+        try:
+            # Same page on every shard; ids are global, so the newest `limit` of the union is the page
+            results = user_shards.map(lambda conn, index: search_users(
+                conn, args.get('q', '').strip(), mode, field, algorithms, statuses,
+                min_score, max_score, after, limit))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        users = merge_sorted([r['users'] for r in results], key=lambda u: u['id'], limit=limit, reverse=True)
+        more = any(r['nextCursor'] is not None for r in results) or sum(len(r['users']) for r in results) > limit
         
         return jsonify({
             'success': True,
             'users': users,
-            'count': len(users)
+            'count': len(users),
+            'nextCursor': users[-1]['id'] if more else None,
+            'match': results[0]['matchExpression'],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
         })
         
     except Exception as e:
@@ -647,6 +1179,11 @@ def get_demo_users():
 def clear_users():
     """Clear all registered users"""
     try:
+        for path in user_shards.paths[1:]:
+            shard = get_db(path)
+            shard.execute('DELETE FROM users')
+            shard.commit()
+            shard.close()
         conn = get_db()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM users')
@@ -677,7 +1214,7 @@ def clear_users():
 def trigger_resalt():
     """Manually trigger resalt for all users"""
     try:
-        count = resalt_all_users()
+        count = rotate_all_salts()
         return jsonify({
             'success': True,
             'message': f'Resalt completed! {count} users resalted.',
@@ -744,6 +1281,7 @@ def resalt_status():
     })
 
 @app.route('/api/resalt/log', methods=['GET'])
+@etag_cached(data_version, response_cache)
 def get_resalt_log():
     """Get resalt history log"""
     try:
@@ -751,20 +1289,34 @@ def get_resalt_log():
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT r.*, u.name, u.email 
-            FROM resalt_log r
-            LEFT JOIN users u ON r.user_id = u.id
-            ORDER BY r.resalted_at DESC
+            SELECT * FROM resalt_log
+            ORDER BY resalted_at DESC
             LIMIT 100
         ''')
+        rows = cursor.fetchall()
+        
+        # resalt_log lives in the main database; names come from each user's own shard
+        user_ids = sorted({row['user_id'] for row in rows})
+        
+        def shard_users(shard_conn, index):
+            ids = [user_id for user_id in user_ids if user_shards.index_for_id(user_id) == index]
+            if not ids:
+                return {}
+            return {user['id']: user for user in shard_conn.execute(
+                f"SELECT id, name, email FROM users WHERE id IN ({', '.join('?' * len(ids))})", ids)}
+        
+        users = {}
+        for found in user_shards.map(shard_users):
+            users.update(found)
         
         logs = []
-        for row in cursor.fetchall():
+        for row in rows:
+            user = users.get(row['user_id'])
             logs.append({
                 'id': row['id'],
                 'userId': row['user_id'],
-                'userName': row['name'],
-                'userEmail': row['email'],
+                'userName': user['name'] if user else None,
+                'userEmail': user['email'] if user else None,
                 'oldSalt': row['old_salt'][:8] + "..." if row['old_salt'] else None,
                 'newSalt': row['new_salt'][:8] + "..." if row['new_salt'] else None,
                 'resaltedAt': row['resalted_at']
@@ -784,35 +1336,104 @@ def get_resalt_log():
             'message': f'Server error: {str(e)}'
         }), 500
 
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         RETENTION POLICY ENDPOINTS                             ║
+# ║  GET /api/retention - Get the current user retention policy                   ║
+# ║  POST /api/retention - Update the policy (optionally enforce it now)          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def retention_policy():
+    """Current retention policy as a JSON-friendly dict"""
+    return {
+        'mode': RETENTION_MODE,
+        'maxRows': RETENTION_MAX_ROWS,
+        'maxAgeDays': RETENTION_MAX_AGE_DAYS,
+        'interval': RETENTION_INTERVAL,
+        'workerRunning': retention_thread is not None and retention_thread.is_alive()
+    }
+
+@app.route('/api/retention', methods=['GET'])
+def get_retention():
+    """Get the user retention policy"""
+    return jsonify({
+        'success': True,
+        'policy': retention_policy()
+    })
+
+@app.route('/api/retention', methods=['POST'])
+def update_retention():
+    """Update the user retention policy"""
+    global RETENTION_MODE, RETENTION_MAX_ROWS, RETENTION_MAX_AGE_DAYS, RETENTION_INTERVAL
+    
+    try:
+        data = request.get_json() or {}
+        mode = data.get('mode', RETENTION_MODE)
+        
+        if mode not in ('unlimited', 'max_rows', 'max_age'):
+            return jsonify({
+                'success': False,
+                'message': 'mode must be unlimited, max_rows or max_age'
+            }), 400
+        
+        RETENTION_MODE = mode
+        RETENTION_MAX_ROWS = int(data.get('maxRows', RETENTION_MAX_ROWS))
+        RETENTION_MAX_AGE_DAYS = float(data.get('maxAgeDays', RETENTION_MAX_AGE_DAYS))
+        RETENTION_INTERVAL = int(data.get('interval', RETENTION_INTERVAL))
+        start_retention_worker()
+        
+        deleted = enforce_retention() if data.get('runNow') else 0
+        
+        return jsonify({
+            'success': True,
+            'message': f'Retention policy set to {RETENTION_MODE}',
+            'policy': retention_policy(),
+            'deleted': deleted
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error: {str(e)}'
+        }), 500
+
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                         STATISTICS ENDPOINT                                    ║
 # ║  GET /api/stats - Get dashboard statistics and counts                         ║
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
 @app.route('/api/stats', methods=['GET'])
+@etag_cached(data_version, response_cache, vary=today_key)
 def get_stats():
     """Get dashboard statistics"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Get total users
-        cursor.execute('SELECT COUNT(*) FROM users')
-        total_backend = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM demo_users')
-        total_demo = cursor.fetchone()[0]
-        
-        # Get today's registrations
         today = datetime.now().strftime('%Y-%m-%d')
-        cursor.execute('SELECT COUNT(*) FROM users WHERE DATE(created_at) = ?', (today,))
-        today_regs = cursor.fetchone()[0]
         
-        # Get total resalts
-        cursor.execute('SELECT COUNT(*) FROM resalt_log')
-        total_resalts = cursor.fetchone()[0]
+        def shard_counts(conn, index):
+            cursor = conn.cursor()
+            
+            # Get total users
+            cursor.execute('SELECT COUNT(*) FROM users')
+            counts = {'users': cursor.fetchone()[0]}
+            
+            # Get today's registrations
+            cursor.execute('SELECT COUNT(*) FROM users WHERE DATE(created_at) = ?', (today,))
+            counts['today'] = cursor.fetchone()[0]
+            
+            # Demo users and resalt log live in the main database only
+            if index == 0:
+                cursor.execute('SELECT COUNT(*) FROM demo_users')
+                counts['demo'] = cursor.fetchone()[0]
+                
+                # Get total resalts
+                cursor.execute('SELECT COUNT(*) FROM resalt_log')
+                counts['resalts'] = cursor.fetchone()[0]
+            return counts
         
-        conn.close()
+        counts, snapshot = shard_snapshots(shard_counts)
+        total_backend = sum(c['users'] for c in counts)
+        today_regs = sum(c['today'] for c in counts)
+        total_demo = counts[0]['demo']
+        total_resalts = counts[0]['resalts']
         
         return jsonify({
             'success': True,
@@ -823,7 +1444,8 @@ def get_stats():
                 'totalResalts': total_resalts,
                 'autoResaltEnabled': auto_resalt_enabled,
                 'resaltInterval': AUTO_RESALT_INTERVAL
-            }
+            },
+            'snapshot': snapshot
         })
         
     except Exception as e:
@@ -854,7 +1476,21 @@ def hash_password():
         
         # Use custom salt or generate one
         salt = custom_salt if custom_salt else generate_salt(16)
-        password_hash, _ = hash_password_argon2(password, salt)
+        output_format = data.get('format', 'encoded')
+        
+        if ARGON2_AVAILABLE:
+            try:
+                if output_format == 'raw':
+                    password_hash = hash_with_salt_raw(password, salt)
+                else:
+                    password_hash = hash_with_salt(password, salt)
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 400
+        else:
+            password_hash = hashlib.sha256((salt + password).encode('utf-8')).hexdigest()
         
         return jsonify({
             'success': True,
@@ -862,6 +1498,13 @@ def hash_password():
                 'password': password,
                 'salt': salt,
                 'algorithm': 'Argon2id' if ARGON2_AVAILABLE else 'SHA-256 (fallback)',
+                'format': output_format if ARGON2_AVAILABLE else 'hex',
+                'parameters': {
+                    'timeCost': ARGON2_TIME_COST,
+                    'memoryCost': ARGON2_MEMORY_COST,
+                    'parallelism': ARGON2_PARALLELISM,
+                    'hashLength': ARGON2_HASH_LEN
+                },
                 'hash': password_hash,
                 'hashLength': len(password_hash)
             }
@@ -874,40 +1517,188 @@ def hash_password():
         }), 500
 
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
-# ║                         DEMO DATA ENDPOINT                                     ║
-# ║  POST /api/demo/populate - Populate database with realistic demo data        ║
-# ║  Creates users with various security profiles for lab demonstrations          ║
-# ║  Includes: duplicate passwords, weak passwords, breached passwords           ║
+# ║                         BATCH ARGON2 ENDPOINT                                  ║
+# ║  POST /api/hash/batch - Argon2id for many passwords (process pool)            ║
+# ║  Concurrency is capped by ARGON2_MEMORY_BUDGET_MB / memory_cost              ║
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
-@app.route('/api/demo/populate', methods=['POST'])
-def populate_demo_data():
-    """Populate database with realistic demo data for live demonstration"""
+MAX_ARGON2_BATCH = 1000
+
+@app.route('/api/hash/batch', methods=['POST'])
+def hash_password_batch():
+    """Hash many passwords with Argon2id (per-item or shared salt)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
+        data = request.get_json() or {}
+        items = data.get('items')
+        shared_salt = data.get('salt', '')
         
-        # Clear existing users first
-        cursor.execute("DELETE FROM users")
+        # Accept [{password, salt}] or a plain list of passwords
+        if items is None:
+            items = [{'password': p} for p in data.get('passwords', [])]
         
-        # Realistic demo users with varied security profiles
-        demo_users = [
-            # SCENARIO 1: Duplicate Passwords (Same password, different users)
-            {
-                'name': 'Sarah Johnson',
-                'email': 'sarah.j@techcorp.com',
-                'password': 'Welcome2024!',
-                'security_score': 65,
-                'breach_status': 'SECURE'
-            },
-            {
-                'name': 'Michael Chen',
-                'email': 'mchen@techcorp.com', 
-                'password': 'Welcome2024!',  # Same as Sarah
-                'security_score': 65,
-                'breach_status': 'SECURE'
-            },
-            {
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'message': 'items (or passwords) must be a non-empty list'
+            }), 400
+        
+        if len(items) > MAX_ARGON2_BATCH:
+            return jsonify({
+                'success': False,
+                'message': f'At most {MAX_ARGON2_BATCH} passwords per request'
+            }), 400
+        
+        if not ARGON2_AVAILABLE:
+            return jsonify({
+                'success': False,
+                'message': 'argon2-cffi is not installed'
+            }), 503
+        
+        pairs = []
+        for item in items:
+            password = item.get('password', '') if isinstance(item, dict) else ''
+            if not password:
+                return jsonify({
+                    'success': False,
+                    'message': 'Every item needs a password'
+                }), 400
+            salt = item.get('salt') or shared_salt or generate_salt(16)
+            pairs.append((password, salt))
+        
+        start = time.perf_counter()
+        try:
+            hashes, workers = argon2_hash_batch(pairs)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        elapsed = time.perf_counter() - start
+        
+        return jsonify({
+            'success': True,
+            'algorithm': 'Argon2id',
+            'results': [{'salt': salt, 'hash': h} for (_, salt), h in zip(pairs, hashes)],
+            'count': len(hashes),
+            'workers': workers,
+            'elapsedMs': round(elapsed * 1000, 1),
+            'hashesPerSec': round(len(hashes) / elapsed, 1) if elapsed else None
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         MULTI-HASH ENDPOINT                                    ║
+# ║  POST /api/hash/multi - MD5/SHA-1/SHA-256/SHA-512 (and more) for many inputs  ║
+# ║  Each input is encoded once and fed to all digests in a single pass           ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+MAX_MULTI_HASH_INPUTS = 10000
+MAX_MULTI_HASH_BYTES = 16 * 1024 * 1024
+
+@app.route('/api/hash/multi', methods=['POST'])
+def multi_hash():
+    """Hash a list of inputs with several algorithms"""
+    try:
+        data = request.get_json() or {}
+        
+        inputs = data.get('inputs')
+        if inputs is None:
+            inputs = [data.get('input', '')]
+        salt = data.get('salt', '')
+        
+        if not isinstance(inputs, list) or not inputs:
+            return jsonify({
+                'success': False,
+                'message': 'inputs must be a non-empty list'
+            }), 400
+        
+        if len(inputs) > MAX_MULTI_HASH_INPUTS:
+            return jsonify({
+                'success': False,
+                'message': f'At most {MAX_MULTI_HASH_INPUTS} inputs per request'
+            }), 400
+        
+        try:
+            algorithms = normalize_algorithms(data.get('algorithms'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        # Salt (if any) is appended like the multi-hash generator page does
+        encoded = [(str(item) + salt).encode('utf-8') for item in inputs]
+        if sum(len(item) for item in encoded) > MAX_MULTI_HASH_BYTES:
+            return jsonify({
+                'success': False,
+                'message': 'Batch too large'
+            }), 413
+        
+        start = time.perf_counter()
+        results = compute_batch(encoded, algorithms)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        return jsonify({
+            'success': True,
+            'algorithms': list(algorithms),
+            'salt': salt,
+            'results': results,
+            'count': len(results),
+            'elapsedMs': round(elapsed_ms, 3)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         DEMO DATA ENDPOINT                                     ║
+# ║  POST /api/demo/populate - Populate database with realistic demo data        ║
+# ║  Creates users with various security profiles for lab demonstrations          ║
+# ║  Includes: duplicate passwords, weak passwords, breached passwords           ║
+# ║  With `count`: N synthetic users from a scenario mix (capacity testing)      ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+MAX_SYNTHETIC_USERS = 200000    # per request; use demo_data_generator.py for millions
+
+@app.route('/api/demo/populate', methods=['POST'])
+def populate_demo_data():
+    """Populate database with realistic demo data for live demonstration"""
+    try:
+        data = request.get_json(silent=True) or {}
+        if data.get('count') is not None:
+            return populate_synthetic_users(data)
+        
+        # Clear existing users first (every shard; each clear commits with its shard's inserts)
+        shard_conns = [sqlite3.connect(path) for path in user_shards.paths]
+        for shard_conn in shard_conns:
+            shard_conn.execute("DELETE FROM users")
+        
+        # Realistic demo users with varied security profiles
+        demo_users = [
+            # SCENARIO 1: Duplicate Passwords (Same password, different users)
+            {
+                'name': 'Sarah Johnson',
+                'email': 'sarah.j@techcorp.com',
+                'password': 'Welcome2024!',
+                'security_score': 65,
+                'breach_status': 'SECURE'
+            },
+            {
+                'name': 'Michael Chen',
+                'email': 'mchen@techcorp.com', 
+                'password': 'Welcome2024!',  # Same as Sarah
+                'security_score': 65,
+                'breach_status': 'SECURE'
+            },
+            {
                 'name': 'David Martinez',
                 'email': 'dmartinez@startup.io',
                 'password': 'Company123',
@@ -1052,35 +1843,42 @@ def populate_demo_data():
             }
         ]
         
-        # Insert demo users
+        # Insert demo users into their owning shards
+        rows = []
         for user in demo_users:
             # Generate salt
             salt = generate_salt(16)
             
-            # Hash password with Argon2
-            password_hash, algorithm = hash_password_argon2(user['password'], salt)
+            # Hash password with Argon2 (deterministic for the stored salt)
+            password_hash, _ = hash_password_argon2(user['password'], salt)
+            algorithm = 'Argon2' if ARGON2_AVAILABLE else 'bcrypt'
             
-            # Generate multi-hashes for demonstration
-            hash_md5 = hashlib.md5(user['password'].encode()).hexdigest()
-            hash_sha1 = hashlib.sha1(user['password'].encode()).hexdigest()
-            hash_sha256 = hashlib.sha256(user['password'].encode()).hexdigest()
-            hash_sha512 = hashlib.sha512(user['password'].encode()).hexdigest()
+            # Generate multi-hashes for demonstration (password encoded once)
+            digests = compute_digests(user['password'])
+            hash_md5 = digests['md5']
+            hash_sha1 = digests['sha1']
+            hash_sha256 = digests['sha256']
+            hash_sha512 = digests['sha512']
             
-            cursor.execute('''
-                INSERT INTO users (
-                    name, email, algorithm, salt, password_hash,
-                    hash_md5, hash_sha1, hash_sha256, hash_sha512,
-                    security_score, breach_status, resalt_count, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                user['name'], user['email'], algorithm, salt, password_hash,
-                hash_md5, hash_sha1, hash_sha256, hash_sha512,
+            rows.append((
+                user['name'], user['email'], algorithm, store_hex(salt), store_hex(password_hash),
+                store_hex(hash_md5), store_hex(hash_sha1), store_hex(hash_sha256), store_hex(hash_sha512),
                 user['security_score'], user['breach_status'],
                 0, datetime.now().isoformat()
             ))
         
-        conn.commit()
-        conn.close()
+        try:
+            insert_sharded(shard_conns, '''
+                INSERT INTO users (
+                    id, name, email, algorithm, salt, password_hash,
+                    hash_md5, hash_sha1, hash_sha256, hash_sha512,
+                    security_score, breach_status, resalt_count, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            shard_conns[0].commit()
+        finally:
+            for shard_conn in shard_conns:
+                shard_conn.close()
         
         return jsonify({
             'success': True,
@@ -1100,19 +1898,72 @@ def populate_demo_data():
             'message': f'Error populating demo data: {str(e)}'
         }), 500
 
+def populate_synthetic_users(data):
+    """Generate `count` users from a scenario mix (see demo_data_generator.py)"""
+    try:
+        count = int(data['count'])
+        workers = int(data['workers']) if data.get('workers') else None
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'message': 'count and workers must be integers'
+        }), 400
+    
+    if not 1 <= count <= MAX_SYNTHETIC_USERS:
+        return jsonify({
+            'success': False,
+            'message': f'count must be between 1 and {MAX_SYNTHETIC_USERS:,}'
+        }), 400
+    table = data.get('table', 'users')
+    if table not in SYNTHETIC_TABLES:
+        return jsonify({
+            'success': False,
+            'message': f"table must be one of {', '.join(SYNTHETIC_TABLES)}"
+        }), 400
+    
+    # users rows go to their owning shard; demo_users lives in the main database
+    shard_conns = [sqlite3.connect(path) for path in user_shards.paths]
+    try:
+        result = generate_synthetic_users(
+            shard_conns[0], count, data.get('scenario'), table,
+            cheap=bool(data.get('cheap', False)), workers=workers, clear=bool(data.get('clear', False)),
+            shard_conns=shard_conns
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    finally:
+        for conn in shard_conns:
+            conn.close()
+    
+    return jsonify({
+        'success': True,
+        'message': f"Generated {result['inserted']:,} users ({result['rowsPerSec']:,} rows/sec)",
+        'stats': result
+    })
+
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                         SECURITY AUDIT FEATURES                                ║
 # ║  Endpoints for auditing password security in the database                     ║
 # ║  GET /api/audit/duplicate-passwords - Find duplicate password hashes         ║
 # ║  GET /api/audit/weak-passwords - Find users with security score < 50         ║
 # ║  GET /api/audit/breached-passwords - Find users with breached passwords      ║
+# ║  GET /api/audit/report - All of the above in one scan of users               ║
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
 @app.route('/api/audit/duplicate-passwords', methods=['GET'])
+@etag_cached(data_version, response_cache)
 def find_duplicate_passwords():
     """Find users with duplicate password hashes"""
     try:
-        conn = get_db()
+        if user_shards.sharded:
+            # Groups can span shards, so shards are scanned and merged like /api/audit/report
+            report, snapshot = fan_out_audit(('duplicates',))
+            return jsonify({'success': True, **report['sections']['duplicates'], 'snapshot': snapshot})
+        
+        conn = get_snapshot_db()
         cursor = conn.cursor()
         
         # Find duplicate password hashes
@@ -1138,7 +1989,8 @@ def find_duplicate_passwords():
             'success': True,
             'duplicates': duplicates,
             'total_groups': len(duplicates),
-            'total_affected': sum(d['count'] for d in duplicates)
+            'total_affected': sum(d['count'] for d in duplicates),
+            'snapshot': conn.snapshot
         })
         
     except Exception as e:
@@ -1148,10 +2000,15 @@ def find_duplicate_passwords():
         }), 500
 
 @app.route('/api/audit/weak-passwords', methods=['GET'])
+@etag_cached(data_version, response_cache)
 def scan_weak_passwords():
     """Find users with weak passwords (security score < 50)"""
     try:
-        conn = get_db()
+        if user_shards.sharded:
+            report, snapshot = fan_out_audit(('weak',))
+            return jsonify({'success': True, **report['sections']['weak'], 'snapshot': snapshot})
+        
+        conn = get_snapshot_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -1176,7 +2033,8 @@ def scan_weak_passwords():
         return jsonify({
             'success': True,
             'weak_passwords': weak_users,
-            'total_weak': len(weak_users)
+            'total_weak': len(weak_users),
+            'snapshot': conn.snapshot
         })
         
     except Exception as e:
@@ -1186,10 +2044,15 @@ def scan_weak_passwords():
         }), 500
 
 @app.route('/api/audit/breached-passwords', methods=['GET'])
+@etag_cached(data_version, response_cache)
 def check_breached_passwords():
     """Find users with breached passwords"""
     try:
-        conn = get_db()
+        if user_shards.sharded:
+            report, snapshot = fan_out_audit(('breached',))
+            return jsonify({'success': True, **report['sections']['breached'], 'snapshot': snapshot})
+        
+        conn = get_snapshot_db()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -1213,7 +2076,8 @@ def check_breached_passwords():
         return jsonify({
             'success': True,
             'breached_passwords': breached_users,
-            'total_breached': len(breached_users)
+            'total_breached': len(breached_users),
+            'snapshot': conn.snapshot
         })
         
     except Exception as e:
@@ -1223,10 +2087,15 @@ def check_breached_passwords():
         }), 500
 
 @app.route('/api/audit/hash-distribution', methods=['GET'])
+@etag_cached(data_version, response_cache)
 def analyze_hash_distribution():
     """Analyze distribution of hash algorithms and security scores"""
     try:
-        conn = get_db()
+        if user_shards.sharded:
+            report, snapshot = fan_out_audit(('distribution',))
+            return jsonify({'success': True, **report['sections']['distribution'], 'snapshot': snapshot})
+        
+        conn = get_snapshot_db()
         cursor = conn.cursor()
         
         # Get algorithm distribution
@@ -1261,7 +2130,88 @@ def analyze_hash_distribution():
             'success': True,
             'total_users': total,
             'algorithms': algorithms,
-            'security_distribution': security_dist
+            'security_distribution': security_dist,
+            'snapshot': conn.snapshot
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/audit/report', methods=['GET'])
+@etag_cached(data_version, response_cache)
+def audit_report():
+    """Duplicate, weak, breached and distribution audits from a single pass over users"""
+    try:
+        requested = request.args.get('sections')
+        sections = tuple(s.strip() for s in requested.split(',') if s.strip()) if requested else AUDIT_SECTIONS
+        unknown = [s for s in sections if s not in AUDIT_SECTIONS]
+        if unknown or not sections:
+            return jsonify({
+                'success': False,
+                'message': f"sections must be a comma-separated subset of {', '.join(AUDIT_SECTIONS)}"
+            }), 400
+        
+        # One scan per shard, in parallel; accumulators merge into one report
+        report, snapshot = fan_out_audit(sections)
+        
+        return jsonify({
+            'success': True,
+            **report,
+            'data_version': snapshot['dataVersion'],
+            'generated_at': datetime.now().isoformat(),
+            'snapshot': snapshot
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# Dictionary audit: stored unsalted digests vs the prebuilt wordlist index
+# (python wordlist_index.py build <wordlist>); cached per data version and index build
+WORDLIST_INDEX_DIR = DEFAULT_INDEX_DIR
+
+def wordlist_index_key():
+    """Vary key for responses that depend on the current wordlist index build"""
+    index = get_wordlist_index(WORDLIST_INDEX_DIR)
+    return index.stamp if index else None
+
+@app.route('/api/audit/dictionary', methods=['GET'])
+@etag_cached(data_version, response_cache, vary=wordlist_index_key)
+def audit_dictionary():
+    """Find users whose unsalted MD5/SHA-1/SHA-256 digest is in the wordlist"""
+    try:
+        index = get_wordlist_index(WORDLIST_INDEX_DIR)
+        if index is None:
+            return jsonify({
+                'success': False,
+                'message': 'Wordlist index not built (run: python wordlist_index.py build <wordlist>)'
+            }), 404
+        
+        reveal = request.args.get('reveal') == 'true'
+        started = time.perf_counter()
+        # demo_users lives in the main database only
+        results, snapshot = shard_snapshots(lambda conn, shard: audit_wordlist(
+            conn, index, reveal=reveal, tables=('users',) if shard else WORDLIST_AUDIT_TABLES))
+        matches = merge_sorted([r['matches'] for r in results], key=lambda m: (m['table'], m['id']))
+        
+        return jsonify({
+            'success': True,
+            'matches': matches,
+            'total_cracked': len(matches),
+            'rows_scanned': sum(r['rowsScanned'] for r in results),
+            'digests_checked': sum(r['digestsChecked'] for r in results),
+            'index': {
+                'words': index.meta['words'],
+                'builtAt': index.meta['builtAt'],
+                'source': os.path.basename(index.meta['source'])
+            },
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+            'snapshot': snapshot
         })
         
     except Exception as e:
@@ -1282,17 +2232,16 @@ def analyze_hash_distribution():
 def get_users_for_resalt():
     """Get all users showing their current salt status and security"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        pages = user_shards.map(lambda conn, index: conn.execute('''
             SELECT id, name, email, algorithm, salt, security_score, breach_status, created_at
             FROM users
             ORDER BY security_score ASC, created_at DESC
-        ''')
+        ''').fetchall())
         
         users = []
-        for row in cursor.fetchall():
+        # Same order as each shard's query: lowest score first, newest first within a score
+        for row in merge_sorted(pages, key=lambda row: (-(row['security_score'] or 0), row['created_at'] or ''),
+                                reverse=True):
             # Determine if user needs re-salting
             needs_resalt = (
                 row['algorithm'] == 'MD5' or 
@@ -1313,8 +2262,6 @@ def get_users_for_resalt():
                 'created_at': row['created_at']
             })
         
-        conn.close()
-        
         # Count users needing re-salt
         needs_resalt_count = sum(1 for u in users if u['needs_resalt'])
         
@@ -1336,11 +2283,11 @@ def get_users_for_resalt():
 def resalt_single_user(user_id):
     """Re-salt a single user's password with SHA-256 + salt (preserving original MD5)"""
     try:
-        conn = get_db()
+        conn = user_shards.connect_for_id(user_id)
         cursor = conn.cursor()
         
         # Get user's current data
-        cursor.execute('SELECT name, email, password_hash, algorithm, hash_md5 FROM users WHERE id = ?', (user_id,))
+        cursor.execute('SELECT name, email, password_hash, algorithm, hash_md5, row_version FROM users WHERE id = ?', (user_id,))
         user = cursor.fetchone()
         
         if not user:
@@ -1348,6 +2295,12 @@ def resalt_single_user(user_id):
                 'success': False,
                 'message': 'User not found'
             }), 404
+        if migration_base_hash(user) is None:
+            conn.close()
+            return jsonify({
+                'success': False,
+                'message': f'{user["algorithm"]} digest was imported without an MD5 to re-salt'
+            }), 400
         
         # For MD5 users, preserve the original hash in hash_md5 if not already there
         original_md5 = user['hash_md5'] if user['hash_md5'] else user['password_hash']
@@ -1366,20 +2319,26 @@ def resalt_single_user(user_id):
         new_score = 85  # SHA-256 with salt
         
         # Update user - keep original MD5 in hash_md5 column for verification
-        cursor.execute('''
-            UPDATE users 
-            SET password_hash = ?,
-                salt = ?,
-                algorithm = 'SHA256',
-                security_score = ?,
-                breach_status = 'SECURE',
-                hash_md5 = ?
-            WHERE id = ?
-        ''', (new_hash, new_salt, new_score, original_md5, user_id))
-        
+        # Compare-and-swap on row_version: the hash above was derived from the row as read
+        updated = cas_update(conn, user_id, user['row_version'], {
+            'password_hash': store_hex(new_hash),
+            'salt': store_hex(new_salt),
+            'algorithm': 'SHA256',
+            'security_score': new_score,
+            'breach_status': 'SECURE',
+            'hash_md5': store_hex(original_md5)
+        })
         conn.commit()
         conn.close()
         
+        if not updated:
+            write_contention.record('resalt-user', conflicts=1)
+            return jsonify({
+                'success': False,
+                'message': f'User {user["name"]} was modified by another writer; retry the resalt'
+            }), 409
+        write_contention.record('resalt-user', updated=1)
+        
         return jsonify({
             'success': True,
             'message': f'User {user["name"]} re-salted successfully (password unchanged)',
@@ -1404,23 +2363,10 @@ def resalt_single_user(user_id):
 def resalt_all_users():
     """Re-salt all users with weak/unsalted passwords using SHA-256 (preserving passwords)"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        # Get all users that need re-salting
-        cursor.execute('''
-            SELECT id, name, email, password_hash, algorithm, salt, security_score, hash_md5
-            FROM users
-            WHERE algorithm = 'MD5' 
-               OR salt IS NULL 
-               OR salt = '' 
-               OR LENGTH(salt) < 16
-               OR security_score < 50
-        ''')
-        
-        users_to_resalt = cursor.fetchall()
+        # Every shard in parallel, one commit per shard
+        results = user_shards.map(lambda conn, index: resalt_weak_users(conn, 'resalt-all'))
         
-        if not users_to_resalt:
+        if not any(result['candidates'] for result in results):
             return jsonify({
                 'success': True,
                 'message': 'No users need re-salting',
@@ -1428,49 +2374,16 @@ def resalt_all_users():
                 'users': []
             })
         
-        resalted_users = []
-        
-        for user in users_to_resalt:
-            # Preserve original MD5
-            original_md5 = user['hash_md5'] if user['hash_md5'] else user['password_hash']
-            
-            # Use existing password hash
-            existing_hash = user['password_hash']
-            
-            # Generate new salt
-            new_salt = secrets.token_hex(16)
-            
-            # Create SHA-256 hash from: existing_hash + salt
-            salted_hash_input = existing_hash + new_salt
-            new_hash = hashlib.sha256(salted_hash_input.encode()).hexdigest()
-            
-            # Update user - preserve original MD5
-            cursor.execute('''
-                UPDATE users
-                SET password_hash = ?,
-                    salt = ?,
-                    algorithm = 'SHA256',
-                    security_score = 85,
-                    breach_status = 'SECURE',
-                    hash_md5 = ?
-                WHERE id = ?
-            ''', (new_hash, new_salt, original_md5, user['id']))
-            
-            resalted_users.append({
-                'id': user['id'],
-                'name': user['name'],
-                'email': user['email'],
-                'note': 'Password unchanged - hash security upgraded'
-            })
-        
-        conn.commit()
-        conn.close()
+        resalted_users = [dict(user, note='Password unchanged - hash security upgraded')
+                          for result in results for user in result['users']]
+        conflicted_users = [user_id for result in results for user_id in result['conflicts']]
         
         return jsonify({
             'success': True,
             'message': f'Successfully re-salted {len(resalted_users)} users (passwords unchanged)',
             'count': len(resalted_users),
-            'users': resalted_users
+            'users': resalted_users,
+            'conflicts': conflicted_users
         })
         
     except Exception as e:
@@ -1536,6 +2449,68 @@ def resalt_all_users():
             'message': f'Server error: {str(e)}'
         }), 500
 
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         HASH ALGORITHM REGISTRY                                ║
+# ║  GET /api/hash-algorithms - Algorithms, cost parameters, migration targets    ║
+# ║  POST /api/users/verify - Check a user's password against the stored hash     ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+@app.route('/api/hash-algorithms', methods=['GET'])
+def list_hash_algorithms():
+    """Registered algorithms with their cost metadata"""
+    return jsonify({
+        'success': True,
+        'algorithms': hash_algorithms.describe(),
+        'migrationTargets': list(MIGRATION_TARGETS),
+        'directLabels': DIRECT_HASH_LABELS
+    })
+
+@app.route('/api/users/verify', methods=['POST'])
+def verify_user_password():
+    """Verify an email/password pair in any stored scheme and report whether it needs a rehash"""
+    try:
+        data = request.get_json() or {}
+        email = (data.get('email') or '').strip()
+        password = data.get('password') or ''
+        
+        if not email or not password:
+            return jsonify({
+                'success': False,
+                'message': 'Email and password are required'
+            }), 400
+        
+        conn = user_shards.connect_for_email(email)
+        try:
+            user = conn.execute('SELECT id, algorithm, salt, password_hash FROM users WHERE email = ?',
+                                (email,)).fetchone()
+        finally:
+            conn.close()
+        if not user:
+            return jsonify({
+                'success': False,
+                'message': 'User not found'
+            }), 404
+        
+        verified = verify_password(password, user['algorithm'], user['password_hash'], user['salt'])
+        needs_rehash = None
+        if verified:
+            hasher, _ = stored_hash_scheme(user['algorithm'])
+            needs_rehash = hasher.needs_rehash(user['password_hash'])
+        
+        return jsonify({
+            'success': True,
+            'verified': verified,
+            'userId': user['id'],
+            'algorithm': user['algorithm'],
+            'needsRehash': needs_rehash
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
 # ==================== HASH MIGRATION ====================
 
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
@@ -1543,26 +2518,23 @@ def resalt_all_users():
 # ║  Convert user password hashes from one algorithm to another                   ║
 # ║  GET /api/hash-migration/users - Get users with their current hash algorithms ║
 # ║  POST /api/hash-migration/convert - Convert hash to new algorithm + salt      ║
-# ║  Supports: SHA-1, SHA-256, SHA-512, bcrypt, Argon2id                          ║
+# ║  Supports every hash_algorithms migration target (GET /api/hash-algorithms)  ║
 # ╚═══════════════════════════════════════════════════════════════════════════════╝
 
 @app.route('/api/hash-migration/users', methods=['GET'])
 def get_users_for_migration():
     """Get all users with their current hash algorithms"""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        pages, snapshot = shard_snapshots(lambda conn, index: conn.execute('''
             SELECT id, name, email, algorithm, password_hash, 
                    hash_md5, hash_sha1, hash_sha256, hash_sha512,
                    created_at
             FROM users
             ORDER BY id DESC
-        ''')
+        ''').fetchall())
         
         users = []
-        for row in cursor.fetchall():
+        for row in merge_sorted(pages, key=lambda row: row['id'], reverse=True):
             users.append({
                 'id': row['id'],
                 'name': row['name'],
@@ -1576,11 +2548,10 @@ def get_users_for_migration():
                 'createdAt': row['created_at']
             })
         
-        conn.close()
-        
         return jsonify({
             'success': True,
-            'users': users
+            'users': users,
+            'snapshot': snapshot
         })
     except Exception as e:
         print(f"Error fetching users: {e}")
@@ -1603,13 +2574,18 @@ def convert_hash():
                 'success': False,
                 'message': 'User ID and target algorithm are required'
             }), 400
-        
-        conn = get_db()
+        if target_algorithm.lower() not in MIGRATION_TARGETS:
+            return jsonify({
+                'success': False,
+                'message': f"targetAlgorithm must be one of {', '.join(MIGRATION_TARGETS)}"
+            }), 400
+        
+        conn = user_shards.connect_for_id(user_id)
         cursor = conn.cursor()
         
         # Get current user data
         cursor.execute('''
-            SELECT id, name, email, algorithm, password_hash, hash_md5
+            SELECT id, name, email, algorithm, password_hash, hash_md5, row_version
             FROM users WHERE id = ?
         ''', (user_id,))
         
@@ -1626,21 +2602,34 @@ def convert_hash():
         current_hash = user['password_hash']
         
         # Use MD5 hash as the base for migration
-        base_hash = user['hash_md5'] if user['hash_md5'] else current_hash
+        base_hash = migration_base_hash(user)
+        if base_hash is None:
+            conn.close()
+            return jsonify({
+                'success': False,
+                'message': f'{current_algorithm} digest was imported without an MD5 to migrate from'
+            }), 400
         
         # Convert to target algorithm with custom salt
         new_hash, new_salt = hash_with_custom_salt(base_hash, salt_length, target_algorithm)
         
-        # Update user record
-        cursor.execute('''
-            UPDATE users 
-            SET algorithm = ?, password_hash = ?, salt = ?
-            WHERE id = ?
-        ''', (target_algorithm.upper(), new_hash, new_salt, user_id))
-        
+        # Update user record (compare-and-swap on the row_version read above)
+        updated = cas_update(conn, user_id, user['row_version'], {
+            'algorithm': target_algorithm.upper(),
+            'password_hash': store_hex(new_hash),
+            'salt': store_hex(new_salt)
+        })
         conn.commit()
         conn.close()
         
+        if not updated:
+            write_contention.record('migration-convert', conflicts=1)
+            return jsonify({
+                'success': False,
+                'message': f'User {user["name"]} was modified by another writer; retry the conversion'
+            }), 409
+        write_contention.record('migration-convert', updated=1)
+        
         return jsonify({
             'success': True,
             'message': f'Successfully migrated {user["name"]} from {current_algorithm} to {target_algorithm.upper()}',
@@ -1673,37 +2662,55 @@ def batch_convert_hash():
                 'success': False,
                 'message': 'User IDs and target algorithm are required'
             }), 400
+        if target_algorithm.lower() not in MIGRATION_TARGETS:
+            return jsonify({
+                'success': False,
+                'message': f"targetAlgorithm must be one of {', '.join(MIGRATION_TARGETS)}"
+            }), 400
         
-        conn = get_db()
-        cursor = conn.cursor()
+        # One connection per shard touched, committed together at the end
+        shard_conns = {}
         
         converted_users = []
         failed_users = []
         
+        def converted_values(user):
+            # Get base hash (MD5)
+            base_hash = user['hash_md5'] if user['hash_md5'] else user['password_hash']
+            
+            # Convert to target algorithm
+            new_hash, new_salt = hash_with_custom_salt(base_hash, salt_length, target_algorithm)
+            return {
+                'algorithm': target_algorithm.upper(),
+                'password_hash': store_hex(new_hash),
+                'salt': store_hex(new_salt)
+            }
+        
         for user_id in user_ids:
             try:
-                cursor.execute('''
-                    SELECT id, name, email, algorithm, password_hash, hash_md5
-                    FROM users WHERE id = ?
-                ''', (user_id,))
+                shard = user_shards.index_for_id(user_id)
+                if shard not in shard_conns:
+                    shard_conns[shard] = get_db(user_shards.paths[shard])
+                conn = shard_conns[shard]
                 
-                user = cursor.fetchone()
+                user = conn.execute('''
+                    SELECT id, name, email, algorithm, password_hash, hash_md5, row_version
+                    FROM users WHERE id = ?
+                ''', (user_id,)).fetchone()
                 if not user:
                     failed_users.append({'userId': user_id, 'reason': 'User not found'})
                     continue
+                if migration_base_hash(user) is None:
+                    failed_users.append({'userId': user_id, 'reason': 'Imported digest has no MD5 to migrate from'})
+                    continue
                 
-                # Get base hash (MD5)
-                base_hash = user['hash_md5'] if user['hash_md5'] else user['password_hash']
-                
-                # Convert to target algorithm
-                new_hash, new_salt = hash_with_custom_salt(base_hash, salt_length, target_algorithm)
-                
-                # Update user record
-                cursor.execute('''
-                    UPDATE users 
-                    SET algorithm = ?, password_hash = ?, salt = ?
-                    WHERE id = ?
-                ''', (target_algorithm.upper(), new_hash, new_salt, user_id))
+                # Update user record; conflicts re-read the row and convert its current hash
+                status, _ = update_with_retry(conn, user_id, ('password_hash', 'hash_md5'), converted_values,
+                                              write_contention, 'migration-batch', row=user)
+                if status != CAS_UPDATED:
+                    failed_users.append({'userId': user_id, 'reason': 'Concurrent updates (retries exhausted)'
+                                         if status == CAS_CONFLICT else 'User not found'})
+                    continue
                 
                 converted_users.append({
                     'userId': user_id,
@@ -1714,8 +2721,9 @@ def batch_convert_hash():
             except Exception as e:
                 failed_users.append({'userId': user_id, 'reason': str(e)})
         
-        conn.commit()
-        conn.close()
+        for conn in shard_conns.values():
+            conn.commit()
+            conn.close()
         
         return jsonify({
             'success': True,
@@ -1730,6 +2738,830 @@ def batch_convert_hash():
             'message': str(e)
         }), 500
 
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         CHECKPOINTED MIGRATION RUNS                            ║
+# ║  POST /api/hash-migration/runs - Start (or resume) a filter-defined run       ║
+# ║  GET /api/hash-migration/runs[/<id>] - Progress, rows/s and ETA               ║
+# ║  POST /api/hash-migration/runs/<id>/pause|resume                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+MIGRATION_TARGETS = hash_algorithms.migration_targets()
+
+migration_runs = {}
+migration_run_lock = threading.Lock()
+
+def load_migration_run_shards(run_id, definition=None):
+    """
+    The run as a ShardedMigrationRun over every user shard holding its record
+    
+    With `definition` (the stored shard 0 record) shards missing the run get it
+    created first, so one run id covers every shard as `admin_cli.py migrate` does.
+    
+    Returns:
+        ShardedMigrationRun, or None if no shard has the run
+    """
+    runs = []
+    for path in user_shards.paths:
+        conn = get_db(path)
+        try:
+            record = load_migration_run(conn, run_id)
+            if record is None and definition:
+                record = create_migration_run(conn, run_id, definition['target_algorithm'],
+                                              definition['salt_length'], definition['chunk_size'],
+                                              definition['filters'])
+                conn.commit()
+        finally:
+            conn.close()
+        if record:
+            runs.append(MigrationRun(path, record, hash_with_custom_salt, store_hex, write_contention))
+    return ShardedMigrationRun(runs) if runs else None
+
+def start_migration_run(run):
+    """
+    Run a stored migration (ShardedMigrationRun) in a background thread from its checkpoints
+    
+    Returns:
+        tuple: (the run, None) or (None, error message) if another run is active
+    """
+    with migration_run_lock:
+        active = [r for r in migration_runs.values() if r.state == 'running']
+        if active:
+            return None, f"Migration run {active[0].record['run_id']} is already running"
+        # Marked running before the thread starts so a second request sees it
+        run.state = 'running'
+        migration_runs[run.record['run_id']] = run
+    threading.Thread(target=run.run, daemon=True).start()
+    return run, None
+
+def migration_run_status(run_id):
+    """Live status of a run in this process, else its stored checkpoints (None if unknown)"""
+    if run_id in migration_runs:
+        return migration_runs[run_id].status()
+    run = load_migration_run_shards(run_id)
+    return run.status() if run else None
+
+@app.route('/api/hash-migration/runs', methods=['POST'])
+def start_hash_migration_run():
+    """Start a run over every user matching `filter`; re-posting the same definition resumes it"""
+    try:
+        data = request.get_json() or {}
+        target_algorithm = (data.get('targetAlgorithm') or '').lower()
+        try:
+            salt_length = int(data.get('saltLength', 32))
+            chunk_size = int(data.get('chunkSize', MIGRATION_CHUNK_SIZE))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'saltLength and chunkSize must be integers'
+            }), 400
+        try:
+            filters = normalize_migration_filters(data.get('filter'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if target_algorithm not in MIGRATION_TARGETS:
+            return jsonify({
+                'success': False,
+                'message': f"targetAlgorithm must be one of {', '.join(MIGRATION_TARGETS)}"
+            }), 400
+        if not 2 <= salt_length <= 128 or not 1 <= chunk_size <= MAX_MIGRATION_CHUNK:
+            return jsonify({
+                'success': False,
+                'message': f'saltLength must be 2-128 and chunkSize 1-{MAX_MIGRATION_CHUNK}'
+            }), 400
+        
+        run_id = data.get('runId') or default_migration_run_id(target_algorithm, salt_length, filters)
+        conn = get_db()
+        try:
+            record = load_migration_run(conn, run_id)
+            if record is None:
+                record = create_migration_run(conn, run_id, target_algorithm, salt_length, chunk_size, filters)
+                conn.commit()
+        finally:
+            conn.close()
+        run = load_migration_run_shards(run_id, record)
+        
+        # Replaying a finished or running definition is a no-op
+        live = migration_runs.get(run_id)
+        if run.state == 'completed' or (live and live.state == 'running'):
+            return jsonify({
+                'success': True,
+                'message': f"Migration run {run_id} is already {live.state if live else 'completed'}",
+                'run': migration_run_status(run_id)
+            })
+        
+        run, error = start_migration_run(run)
+        if error:
+            return jsonify({
+                'success': False,
+                'message': error
+            }), 409
+        
+        return jsonify({
+            'success': True,
+            'message': f"Migration run {run_id} started from checkpoint {record['last_id']}",
+            'run': run.status()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/hash-migration/runs', methods=['GET'])
+def list_hash_migration_runs():
+    """Recent migration runs with their checkpoints"""
+    try:
+        conn = get_db()
+        try:
+            run_ids = [record['run_id'] for record in list_migration_runs(conn)]
+        finally:
+            conn.close()
+        return jsonify({
+            'success': True,
+            'runs': [migration_run_status(run_id) for run_id in run_ids]
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/hash-migration/runs/<run_id>', methods=['GET'])
+def hash_migration_run_status(run_id):
+    """Progress of one migration run"""
+    status = migration_run_status(run_id)
+    if not status:
+        return jsonify({
+            'success': False,
+            'message': 'Migration run not found'
+        }), 404
+    return jsonify({
+        'success': True,
+        'run': status
+    })
+
+@app.route('/api/hash-migration/runs/<run_id>/pause', methods=['POST'])
+def pause_hash_migration_run(run_id):
+    """Stop a running migration after its current chunk commits"""
+    run = migration_runs.get(run_id)
+    if not run or run.state != 'running':
+        return jsonify({
+            'success': False,
+            'message': 'Migration run is not running'
+        }), 404
+    run.pause()
+    return jsonify({
+        'success': True,
+        'message': 'Pause requested; the run stops after the current chunk',
+        'run': run.status()
+    })
+
+@app.route('/api/hash-migration/runs/<run_id>/resume', methods=['POST'])
+def resume_hash_migration_run(run_id):
+    """Continue a paused, interrupted or failed run from its checkpoint"""
+    try:
+        conn = get_db()
+        try:
+            record = load_migration_run(conn, run_id)
+        finally:
+            conn.close()
+        if not record:
+            return jsonify({
+                'success': False,
+                'message': 'Migration run not found'
+            }), 404
+        run = load_migration_run_shards(run_id, record)
+        live = migration_runs.get(run_id)
+        if (live and live.state == 'running') or run.state not in MIGRATION_RESUMABLE_STATES:
+            return jsonify({
+                'success': False,
+                'message': f"Migration run is {live.state if live else run.state}"
+            }), 409
+        
+        run, error = start_migration_run(run)
+        if error:
+            return jsonify({
+                'success': False,
+                'message': error
+            }), 409
+        
+        return jsonify({
+            'success': True,
+            'message': f"Migration run {run_id} resumed from checkpoint {record['last_id']}",
+            'run': run.status()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         LEGACY HASH IMPORT ENDPOINT                            ║
+# ║  POST /api/import/hashes - Stream a user:hash or CSV dump into users          ║
+# ║  Algorithm is detected per row; batches are checkpointed for resume           ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+@app.route('/api/import/hashes', methods=['POST'])
+def import_hashes():
+    """Import a legacy hash dump (multipart `file` or raw request body)"""
+    try:
+        upload = request.files.get('file')
+        if upload:
+            stream = upload.stream
+            source = upload.filename or 'upload'
+        else:
+            stream = request.stream
+            source = 'request-body'
+        
+        # Re-uploading the same dump with the same jobId resumes from the checkpoint;
+        # without one the id is a digest of the content (read twice, so a raw body is spooled)
+        job_id = request.form.get('jobId') or request.args.get('jobId')
+        if not job_id:
+            if not stream.seekable():
+                stream = spool_upload(stream)
+            job_id = content_job_id(stream)
+        try:
+            batch_size = int(request.form.get('batchSize') or request.args.get('batchSize') or IMPORT_BATCH_SIZE)
+        except (TypeError, ValueError):
+            batch_size = 0
+        if batch_size < 1:
+            return jsonify({
+                'success': False,
+                'message': 'batchSize must be a positive integer'
+            }), 400
+        fmt = request.form.get('format') or request.args.get('format') or 'auto'
+        restart = (request.form.get('restart') or request.args.get('restart')) == 'true'
+        
+        if fmt not in ('auto', 'colon', 'csv'):
+            return jsonify({
+                'success': False,
+                'message': 'format must be auto, colon or csv'
+            }), 400
+        
+        # Rows go to their owning shard; the checkpoint lives in shard 0
+        shard_conns = [get_db(path) for path in user_shards.paths]
+        try:
+            result = import_stream(shard_conns[0], stream, job_id, source, batch_size, fmt,
+                                   not restart, encode=store_hex, shard_conns=shard_conns)
+        finally:
+            for conn in shard_conns:
+                conn.close()
+        
+        return jsonify({
+            'success': True,
+            'message': f"Imported {result['rows_imported']:,} users ({result['rows_skipped']:,} skipped)",
+            'import': {
+                'jobId': job_id,
+                'linesRead': result['lines_read'],
+                'rowsImported': result['rows_imported'],
+                'rowsSkipped': result['rows_skipped'],
+                'resumed': result.get('resumed', False),
+                'completed': result.get('completed', False),
+                'elapsed': result.get('elapsed')
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Import failed: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         PASSWORD SCORING ENDPOINTS                             ║
+# ║  POST /api/score - Server-side score/entropy for a batch of passwords         ║
+# ║  POST /api/score/rescore - Recompute stored scores from plaintext candidates  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+MAX_SCORE_BATCH = 10000
+
+@app.route('/api/score', methods=['POST'])
+def score_passwords():
+    """Score passwords with the same rules as the browser strength meter"""
+    try:
+        data = request.get_json() or {}
+        passwords = data.get('passwords')
+        if passwords is None and 'password' in data:
+            passwords = [data['password']]
+        
+        if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+            return jsonify({
+                'success': False,
+                'message': 'passwords must be a list of strings'
+            }), 400
+        if len(passwords) > MAX_SCORE_BATCH:
+            return jsonify({
+                'success': False,
+                'message': f'At most {MAX_SCORE_BATCH} passwords per request'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'engine': 'numpy' if NUMPY_AVAILABLE else 'python',
+            'results': analyze_batch(passwords)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/score/rescore', methods=['POST'])
+def rescore_stored_users():
+    """Recompute security_score for users whose password is in the candidate list"""
+    try:
+        data = request.get_json() or {}
+        candidates = data.get('passwords')
+        dry_run = bool(data.get('dryRun', False))
+        
+        if not isinstance(candidates, list) or not all(isinstance(p, str) for p in candidates):
+            return jsonify({
+                'success': False,
+                'message': 'passwords must be a list of strings'
+            }), 400
+        
+        stats = sum_counts(user_shards.map(lambda conn, index: rescore_users(conn, candidates, dry_run=dry_run)))
+        
+        return jsonify({
+            'success': True,
+            'message': f"Rescored {stats['changed']:,} of {stats['matched']:,} matched users",
+            'dryRun': dry_run,
+            'rescore': stats
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         CRACK-TIME ESTIMATION ENDPOINTS                        ║
+# ║  GET /api/crack-time/rates - Guesses/sec per algorithm at current parameters  ║
+# ║  POST /api/crack-time - Estimates for passwords or (length, charset) shapes   ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+# Rate table follows the hashing parameters actually in use
+crack_estimator = CrackTimeEstimator(
+    bcrypt_rounds=BCRYPT_ROUNDS,
+    argon2_memory_cost=ARGON2_MEMORY_COST,
+    argon2_time_cost=ARGON2_TIME_COST,
+    argon2_parallelism=ARGON2_PARALLELISM
+)
+
+@app.route('/api/crack-time/rates', methods=['GET'])
+def crack_time_rates():
+    """Rate table used for crack-time estimates"""
+    return jsonify({
+        'success': True,
+        'rates': crack_estimator.rate_table(),
+        'memo': crack_estimator.stats()
+    })
+
+@app.route('/api/crack-time', methods=['POST'])
+def estimate_crack_time():
+    """Brute-force crack-time estimates for a batch of passwords or password shapes"""
+    try:
+        data = request.get_json() or {}
+        passwords = data.get('passwords')
+        shapes = data.get('shapes')
+        
+        try:
+            algorithms = normalize_crack_algorithms(data.get('algorithms'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        if passwords is not None:
+            if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+                return jsonify({
+                    'success': False,
+                    'message': 'passwords must be a list of strings'
+                }), 400
+            items = passwords
+        elif shapes is not None:
+            # Shapes let audit reports estimate without plaintext: [{length, charsetSize}]
+            if not isinstance(shapes, list):
+                return jsonify({
+                    'success': False,
+                    'message': 'shapes must be a list of {length, charsetSize}'
+                }), 400
+            try:
+                items = [(int(shape['length']), int(shape['charsetSize'])) for shape in shapes]
+            except (KeyError, TypeError, ValueError):
+                return jsonify({
+                    'success': False,
+                    'message': 'shapes must be a list of {length, charsetSize}'
+                }), 400
+            if any(length < 0 or charset_size < 1 for length, charset_size in items):
+                return jsonify({
+                    'success': False,
+                    'message': 'shape length must be >= 0 and charsetSize >= 1'
+                }), 400
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'passwords or shapes is required'
+            }), 400
+        
+        if len(items) > MAX_SCORE_BATCH:
+            return jsonify({
+                'success': False,
+                'message': f'At most {MAX_SCORE_BATCH} items per request'
+            }), 400
+        
+        if passwords is not None:
+            results = crack_estimator.estimate_batch(items, algorithms)
+        else:
+            results = crack_estimator.estimate_shapes(items, algorithms)
+        
+        return jsonify({
+            'success': True,
+            'algorithms': list(algorithms),
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         MASK ATTACK SIMULATOR                                  ║
+# ║  POST /api/attack/mask - Start a bounded mask attack on demo_users MD5        ║
+# ║  GET /api/attack/mask/<id> - Live H/s, progress and cracked passwords         ║
+# ║  POST /api/attack/mask/<id>/cancel - Stop a running attack                    ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+MAX_ATTACK_BUDGET = 120     # seconds
+MAX_ATTACK_HISTORY = 20
+
+mask_attacks = {}
+mask_attack_lock = threading.Lock()
+
+@app.route('/api/attack/mask', methods=['POST'])
+def start_mask_attack():
+    """Start a mask attack in the background (one at a time)"""
+    try:
+        data = request.get_json() or {}
+        mask = data.get('mask', '')
+        algorithm = data.get('algorithm', 'md5')
+        try:
+            budget = float(data.get('timeBudget', 30))
+            workers = int(data['workers']) if data.get('workers') else None
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'timeBudget and workers must be numbers'
+            }), 400
+        
+        if not 0 < budget <= MAX_ATTACK_BUDGET:
+            return jsonify({
+                'success': False,
+                'message': f'timeBudget must be between 0 and {MAX_ATTACK_BUDGET} seconds'
+            }), 400
+        if algorithm not in ATTACK_ALGORITHMS:
+            return jsonify({
+                'success': False,
+                'message': f"algorithm must be one of {', '.join(ATTACK_ALGORITHMS)}"
+            }), 400
+        
+        conn = get_db()
+        try:
+            targets = load_mask_targets(conn)
+        finally:
+            conn.close()
+        
+        try:
+            attack = MaskAttack(mask, targets, algorithm, budget, workers)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        with mask_attack_lock:
+            if any(a.state in ('pending', 'running') for a in mask_attacks.values()):
+                return jsonify({
+                    'success': False,
+                    'message': 'Another attack is already running'
+                }), 409
+            attack_id = secrets.token_hex(6)
+            mask_attacks[attack_id] = attack
+            # Forget the oldest finished runs
+            for old_id in list(mask_attacks)[:-MAX_ATTACK_HISTORY]:
+                del mask_attacks[old_id]
+        
+        threading.Thread(target=attack.run, daemon=True).start()
+        
+        return jsonify({
+            'success': True,
+            'message': f'Mask attack started ({attack.keyspace:,} candidates, {len(targets)} targets)',
+            'attackId': attack_id,
+            'attack': attack.status()
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+@app.route('/api/attack/mask/<attack_id>', methods=['GET'])
+def mask_attack_status(attack_id):
+    """Progress of a mask attack"""
+    attack = mask_attacks.get(attack_id)
+    if not attack:
+        return jsonify({
+            'success': False,
+            'message': 'Attack not found'
+        }), 404
+    return jsonify({
+        'success': True,
+        'attackId': attack_id,
+        'attack': attack.status()
+    })
+
+@app.route('/api/attack/mask/<attack_id>/cancel', methods=['POST'])
+def cancel_mask_attack(attack_id):
+    """Cancel a running mask attack"""
+    attack = mask_attacks.get(attack_id)
+    if not attack:
+        return jsonify({
+            'success': False,
+            'message': 'Attack not found'
+        }), 404
+    attack.cancel()
+    return jsonify({
+        'success': True,
+        'message': 'Cancellation requested',
+        'attackId': attack_id
+    })
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         RAINBOW TABLE DEMO                                     ║
+# ║  POST /api/attack/rainbow - Build a small table, report success on the        ║
+# ║  unsalted demo_users hashes before and after resalting                        ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+MAX_RAINBOW_STEPS = 2000000     # chains × chain length per request (~5 s on one core)
+
+@app.route('/api/attack/rainbow', methods=['POST'])
+def rainbow_demo():
+    """Generate a bounded rainbow table and run it against demo_users"""
+    try:
+        data = request.get_json() or {}
+        mask = data.get('mask', 'password?d?d')
+        charset = data.get('charset') or None
+        reduction = data.get('reduction', 'modulo')
+        try:
+            chains = int(data.get('chains', 1000))
+            chain_length = int(data.get('chainLength', DEFAULT_CHAIN_LENGTH))
+            workers = int(data['workers']) if data.get('workers') else None
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'chains, chainLength and workers must be integers'
+            }), 400
+        
+        if chains < 1 or chain_length < 1 or chains * chain_length > MAX_RAINBOW_STEPS:
+            return jsonify({
+                'success': False,
+                'message': f'chains × chainLength must be between 1 and {MAX_RAINBOW_STEPS:,}'
+            }), 400
+        if reduction not in REDUCTIONS:
+            return jsonify({
+                'success': False,
+                'message': f"reduction must be one of {', '.join(REDUCTIONS)}"
+            }), 400
+        
+        try:
+            table = RainbowTable.generate(mask, chains, chain_length, reduction, charset, workers)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 400
+        
+        conn = get_db()
+        try:
+            targets = load_mask_targets(conn)
+        finally:
+            conn.close()
+        
+        report = rainbow_demo_report(table, targets)
+        return jsonify({
+            'success': True,
+            'message': (f"Cracked {report['before']['cracked']}/{report['before']['targets']} unsalted, "
+                        f"{report['after']['cracked']}/{report['after']['targets']} after resalting"),
+            **report
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         BULK PASSWORD GENERATION                               ║
+# ║  GET/POST /api/passwords/generate - CSPRNG passwords streamed as NDJSON/text  ║
+# ║  Modes: random (charset), pronounceable, passphrase                           ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+MAX_GENERATE_COUNT = 100000
+
+@app.route('/api/passwords/generate', methods=['GET', 'POST'])
+def generate_passwords():
+    """Generate many passwords (JSON body, or query string for download links)"""
+    try:
+        options = request.get_json(silent=True) or request.args
+        
+        def flag(name, default):
+            value = options.get(name, default)
+            if isinstance(value, str):
+                return value.lower() in ('1', 'true', 'yes', 'on')
+            return bool(value)
+        
+        try:
+            count = int(options.get('count', 1))
+            length = int(options.get('length', 16))
+            words = int(options.get('words', 5))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'count, length and words must be integers'
+            }), 400
+        mode = options.get('mode', 'random')
+        output = options.get('format', 'ndjson')
+        separator = str(options.get('separator', '-'))[:3]
+        numbers = flag('numbers', True)
+        symbols = flag('symbols', True)
+        
+        if not 1 <= count <= MAX_GENERATE_COUNT:
+            return jsonify({
+                'success': False,
+                'message': f'count must be between 1 and {MAX_GENERATE_COUNT}'
+            }), 400
+        if mode not in GENERATOR_MODES:
+            return jsonify({
+                'success': False,
+                'message': f"mode must be one of {', '.join(GENERATOR_MODES)}"
+            }), 400
+        if not GENERATOR_MIN_LENGTH <= length <= GENERATOR_MAX_LENGTH:
+            return jsonify({
+                'success': False,
+                'message': f'length must be between {GENERATOR_MIN_LENGTH} and {GENERATOR_MAX_LENGTH}'
+            }), 400
+        if not MIN_WORDS <= words <= MAX_WORDS:
+            return jsonify({
+                'success': False,
+                'message': f'words must be between {MIN_WORDS} and {MAX_WORDS}'
+            }), 400
+        if output not in ('ndjson', 'text'):
+            return jsonify({
+                'success': False,
+                'message': 'format must be ndjson or text'
+            }), 400
+        
+        charset = ''
+        if mode == 'random':
+            try:
+                charset = build_charset(
+                    uppercase=flag('uppercase', True),
+                    lowercase=flag('lowercase', True),
+                    numbers=numbers,
+                    symbols=symbols,
+                    exclude_similar=flag('excludeSimilar', False),
+                    exclude_ambiguous=flag('excludeAmbiguous', False)
+                )
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'message': str(e)
+                }), 400
+        
+        chunks = generate_passwords_bulk(count, mode, length, charset, numbers, symbols,
+                                         words, separator, flag('capitalize', False))
+        
+        # One write per chunk of passwords, not per line
+        def stream():
+            for chunk in chunks:
+                if output == 'ndjson':
+                    yield ''.join(json.dumps({'password': p}) + '\n' for p in chunk)
+                else:
+                    yield '\n'.join(chunk) + '\n'
+        
+        response = Response(
+            stream_with_context(stream()),
+            mimetype='application/x-ndjson' if output == 'ndjson' else 'text/plain'
+        )
+        response.headers['X-Password-Count'] = str(count)
+        response.headers['X-Password-Entropy'] = f"{entropy_bits(mode, length, charset, numbers, symbols, words):.1f}"
+        response.headers['Cache-Control'] = 'no-store'
+        if output == 'text':
+            response.headers['Content-Disposition'] = 'attachment; filename="passwords.txt"'
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                         HOST HASHING BENCHMARK                                 ║
+# ║  GET /api/benchmark/hash-rates - Last measured hashes/sec on this host        ║
+# ║  POST /api/benchmark/hash-rates - Re-measure, cache and feed crack estimates  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+MAX_BENCHMARK_DURATION = 2.0    # seconds per measurement
+
+# Cached results from a previous run calibrate crack-time estimates at start-up
+hash_rates_report = load_hash_rates(HASH_RATES_CACHE)
+apply_to_estimator(crack_estimator, hash_rates_report)
+hash_benchmark_lock = threading.Lock()
+
+@app.route('/api/benchmark/hash-rates', methods=['GET'])
+def get_hash_rates():
+    """Cached host benchmark (null until one has been run)"""
+    return jsonify({
+        'success': True,
+        'benchmark': hash_rates_report
+    })
+
+@app.route('/api/benchmark/hash-rates', methods=['POST'])
+def measure_hash_rates():
+    """Run the host benchmark, cache it and apply it to the crack-time estimator"""
+    global hash_rates_report
+    try:
+        data = request.get_json(silent=True) or {}
+        try:
+            duration = float(data.get('duration', 0.5))
+            workers = int(data['workers']) if data.get('workers') else None
+            specs = default_benchmark_specs(
+                [int(r) for r in data.get('bcryptRounds', [10, BCRYPT_ROUNDS])],
+                [int(m) for m in data.get('argon2MemoryCosts', [19456, ARGON2_MEMORY_COST])]
+            )
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'duration, workers, bcryptRounds and argon2MemoryCosts must be numbers'
+            }), 400
+        
+        if not 0 < duration <= MAX_BENCHMARK_DURATION:
+            return jsonify({
+                'success': False,
+                'message': f'duration must be between 0 and {MAX_BENCHMARK_DURATION} seconds'
+            }), 400
+        if any(not 4 <= spec[1]['rounds'] <= 16 for spec in specs if spec[0] == 'bcrypt'):
+            return jsonify({
+                'success': False,
+                'message': 'bcryptRounds must be between 4 and 16'
+            }), 400
+        if any(not 8 <= spec[1]['memoryCost'] <= 262144 for spec in specs if spec[0] == 'Argon2'):
+            return jsonify({
+                'success': False,
+                'message': 'argon2MemoryCosts must be between 8 and 262144 KiB'
+            }), 400
+        
+        if not hash_benchmark_lock.acquire(blocking=False):
+            return jsonify({
+                'success': False,
+                'message': 'A benchmark is already running'
+            }), 409
+        try:
+            report = run_benchmark(specs, duration, workers)
+            save_hash_rates(report, HASH_RATES_CACHE)
+            hash_rates_report = report
+            updated = apply_to_estimator(crack_estimator, report)
+        finally:
+            hash_benchmark_lock.release()
+        
+        return jsonify({
+            'success': True,
+            'message': f"Measured {len(report['results'])} hash configurations",
+            'benchmark': report,
+            'estimatorUpdated': updated
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Server error: {str(e)}'
+        }), 500
+
 # ╔═══════════════════════════════════════════════════════════════════════════════╗
 # ║                         HEALTH CHECK ENDPOINT                                  ║
 # ║  GET /api/health - Verify backend is running and check algorithm status       ║
@@ -1743,6 +3575,12 @@ def health_check():
         'status': 'online',
         'message': 'Backend is running',
         'algorithm': 'Argon2id' if ARGON2_AVAILABLE else 'SHA-256',
+        'jsonEncoder': JSON_ENCODER,
+        'dataVersion': data_version.current(),
+        'responseCache': response_cache.stats(),
+        'hashRates': summarize_hash_rates(hash_rates_report),
+        'writeContention': write_contention.snapshot(),
+        'userShards': user_shards.count,
         'timestamp': datetime.now().isoformat()
     })
 
@@ -1758,8 +3596,10 @@ if __name__ == '__main__':
     print(f"🔒 Hashing Algorithm: {'Argon2id' if ARGON2_AVAILABLE else 'SHA-256 (fallback)'}")
     print(f"🧂 Salt Length: 16 bytes (32 hex chars)")
     print(f"🔄 Auto-Resalt Interval: {AUTO_RESALT_INTERVAL} seconds")
+    print(f"🧹 User Retention: {RETENTION_MODE}")
     print("=" * 50)
     init_db()
+    start_retention_worker()
     print("🚀 Starting server on http://localhost:5000")
     print("=" * 50)
     app.run(debug=True, host='0.0.0.0', port=5000)
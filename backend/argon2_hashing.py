@@ -0,0 +1,112 @@
+"""
+Argon2id Hashing with Caller-Provided Salts
+Built on argon2-cffi's low-level hash_secret API (PasswordHasher.hash always
+draws its own random salt) plus a process-pool batch variant under a memory budget
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import concurrent.futures
+import os
+
+from lazy_imports import LazyModule, available
+
+# argon2-cffi is loaded on the first hash
+ARGON2_AVAILABLE = available('argon2')
+low_level = LazyModule('argon2.low_level')
+
+# Parameters shared with the PasswordHasher in app.py
+ARGON2_TIME_COST = 2
+ARGON2_MEMORY_COST = 65536      # KiB (64 MB)
+ARGON2_PARALLELISM = 1
+ARGON2_HASH_LEN = 32
+ARGON2_SALT_LEN = 16
+ARGON2_MIN_SALT_LEN = 8         # libargon2 rejects shorter salts
+
+# Total memory the batch pool may use for concurrent hashes
+ARGON2_MEMORY_BUDGET_MB = int(os.environ.get('ARGON2_MEMORY_BUDGET_MB', 512))
+
+_pool = None
+_pool_workers = 0
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SINGLE HASH                                          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def salt_bytes(salt):
+    """Salt as bytes (str salts are used as their UTF-8 bytes); raises ValueError"""
+    raw = salt.encode('utf-8') if isinstance(salt, str) else bytes(salt)
+    if len(raw) < ARGON2_MIN_SALT_LEN:
+        raise ValueError(f"Salt must be at least {ARGON2_MIN_SALT_LEN} bytes")
+    return raw
+
+def hash_with_salt(password, salt, time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST,
+                   parallelism=ARGON2_PARALLELISM, hash_len=ARGON2_HASH_LEN):
+    """
+    Deterministic Argon2id hash of password with the given salt
+
+    Returns:
+        str: PHC-encoded hash ($argon2id$v=19$m=...,t=...,p=...$salt$hash),
+             verifiable with PasswordHasher.verify
+    """
+    encoded = low_level.hash_secret(
+        password.encode('utf-8'), salt_bytes(salt),
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism,
+        hash_len=hash_len, type=low_level.Type.ID
+    )
+    return encoded.decode('ascii')
+
+def hash_with_salt_raw(password, salt, time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST,
+                       parallelism=ARGON2_PARALLELISM, hash_len=ARGON2_HASH_LEN):
+    """Deterministic Argon2id raw digest (hex) of password with the given salt"""
+    raw = low_level.hash_secret_raw(
+        password.encode('utf-8'), salt_bytes(salt),
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism,
+        hash_len=hash_len, type=low_level.Type.ID
+    )
+    return raw.hex()
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           BATCH HASHING                                        ║
+# ║  Argon2 is memory-hard: workers = memory budget / memory_cost (≤ CPU count)   ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def budget_workers(memory_cost=ARGON2_MEMORY_COST, parallelism=ARGON2_PARALLELISM,
+                   budget_mb=ARGON2_MEMORY_BUDGET_MB):
+    """How many hashes may run at once without exceeding the memory budget"""
+    per_hash_kib = memory_cost * max(parallelism, 1)
+    by_memory = (budget_mb * 1024) // per_hash_kib
+    return max(1, min(os.cpu_count() or 1, by_memory))
+
+def get_pool(workers):
+    """Process pool sized for the budget (recreated if the size changes)"""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+def _hash_job(job):
+    """Worker entry point: job = (password, salt, time_cost, memory_cost, parallelism, hash_len)"""
+    password, salt, time_cost, memory_cost, parallelism, hash_len = job
+    return hash_with_salt(password, salt, time_cost, memory_cost, parallelism, hash_len)
+
+def hash_batch(items, time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST,
+               parallelism=ARGON2_PARALLELISM, hash_len=ARGON2_HASH_LEN,
+               budget_mb=ARGON2_MEMORY_BUDGET_MB):
+    """
+    Hash many (password, salt) pairs, returning encoded hashes in input order
+
+    Salts are validated up front so a bad item fails the batch before any work starts.
+    """
+    for _, salt in items:
+        salt_bytes(salt)
+    jobs = [(password, salt, time_cost, memory_cost, parallelism, hash_len) for password, salt in items]
+    workers = budget_workers(memory_cost, parallelism, budget_mb)
+    if workers < 2 or len(jobs) < 2:
+        return [_hash_job(job) for job in jobs], 1
+    return list(get_pool(workers).map(_hash_job, jobs)), workers
@@ -0,0 +1,227 @@
+"""
+Consolidated Security Audit
+Duplicate, weak, breached and hash-distribution audits computed in one
+streaming pass over users, with per-section timings
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import time
+
+from hash_storage import unpack_hex
+
+# Rows fetched per cursor.fetchmany call; sections are timed per batch, not per row
+REPORT_FETCH_SIZE = 5000
+
+SECTIONS = ('duplicates', 'weak', 'breached', 'distribution')
+
+# Same thresholds and labels as the individual /api/audit/* endpoints
+WEAK_SCORE = 50
+SECURITY_LEVELS = ((70, 'Secure (70-100)'), (50, 'Medium (50-69)'))
+WEAK_LEVEL = 'Weak (0-49)'
+
+REPORT_SQL = '''
+    SELECT id, name, email, algorithm, password_hash, security_score, breach_status
+    FROM users
+'''
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SECTION ACCUMULATORS                                 ║
+# ║  Each takes a batch of (id, name, email, algorithm, hash, score, status)     ║
+# ║  rows, merge() folds in another shard's accumulator, and finish() shapes    ║
+# ║  the result like its dedicated endpoint                                      ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class DuplicateSection:
+    """Groups of users sharing a password_hash (GROUP BY password_hash HAVING count > 1)"""
+
+    def __init__(self):
+        self.groups = {}
+
+    def update(self, rows):
+        # Rows are kept as-is; labels are only formatted for actual duplicates
+        groups = self.groups
+        for row in rows:
+            group = groups.get(row[4])
+            if group is None:
+                groups[row[4]] = [row]
+            else:
+                group.append(row)
+
+    def merge(self, other):
+        for password_hash, rows in other.groups.items():
+            self.groups.setdefault(password_hash, []).extend(rows)
+
+    def finish(self):
+        duplicates = [{
+            'hash': unpack_hex(password_hash)[:32] + '...',
+            'count': len(rows),
+            'users': [f"{row[1]} ({row[2]})" for row in rows]
+        } for password_hash, rows in self.groups.items() if len(rows) > 1]
+        duplicates.sort(key=lambda group: -group['count'])
+        return {
+            'duplicates': duplicates,
+            'total_groups': len(duplicates),
+            'total_affected': sum(group['count'] for group in duplicates)
+        }
+
+class WeakSection:
+    """Users with security_score < 50, weakest first"""
+
+    def __init__(self):
+        self.users = []
+
+    def update(self, rows):
+        self.users.extend({
+            'id': row[0],
+            'name': row[1],
+            'email': row[2],
+            'score': row[5],
+            'status': row[6]
+        } for row in rows if row[5] is not None and row[5] < WEAK_SCORE)
+
+    def merge(self, other):
+        self.users.extend(other.users)
+
+    def finish(self):
+        self.users.sort(key=lambda user: user['score'])
+        return {'weak_passwords': self.users, 'total_weak': len(self.users)}
+
+class BreachedSection:
+    """Users with breach_status BREACHED, by name"""
+
+    def __init__(self):
+        self.users = []
+
+    def update(self, rows):
+        self.users.extend({
+            'id': row[0],
+            'name': row[1],
+            'email': row[2],
+            'score': row[5]
+        } for row in rows if row[6] == 'BREACHED')
+
+    def merge(self, other):
+        self.users.extend(other.users)
+
+    def finish(self):
+        self.users.sort(key=lambda user: user['name'])
+        return {'breached_passwords': self.users, 'total_breached': len(self.users)}
+
+class DistributionSection:
+    """Algorithm counts, security-level counts and the total"""
+
+    def __init__(self):
+        self.algorithms = {}
+        self.levels = {}
+        self.total = 0
+
+    def update(self, rows):
+        algorithms, levels = self.algorithms, self.levels
+        for row in rows:
+            algorithms[row[3]] = algorithms.get(row[3], 0) + 1
+            score = row[5]
+            level = WEAK_LEVEL
+            if score is not None:
+                for threshold, label in SECURITY_LEVELS:
+                    if score >= threshold:
+                        level = label
+                        break
+            levels[level] = levels.get(level, 0) + 1
+        self.total += len(rows)
+
+    def merge(self, other):
+        for name, count in other.algorithms.items():
+            self.algorithms[name] = self.algorithms.get(name, 0) + count
+        for level, count in other.levels.items():
+            self.levels[level] = self.levels.get(level, 0) + count
+        self.total += other.total
+
+    def finish(self):
+        return {
+            'total_users': self.total,
+            'algorithms': self.algorithms,
+            'security_distribution': self.levels
+        }
+
+SECTION_CLASSES = {
+    'duplicates': DuplicateSection,
+    'weak': WeakSection,
+    'breached': BreachedSection,
+    'distribution': DistributionSection,
+}
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SINGLE-PASS REPORT                                   ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def scan(conn, sections=SECTIONS, fetch_size=REPORT_FETCH_SIZE):
+    """
+    Feed every users row of one database (or shard) to the section accumulators
+
+    Returns:
+        dict: accumulators (unfinished), rows_scanned and timings in seconds
+    """
+    accumulators = {name: SECTION_CLASSES[name]() for name in sections}
+    timings = dict.fromkeys(('scan',) + tuple(sections), 0.0)
+    rows_scanned = 0
+
+    # Plain tuples: the connection's Row factory would dominate the scan
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(REPORT_SQL)
+    while True:
+        fetch_started = time.perf_counter()
+        rows = cursor.fetchmany(fetch_size)
+        timings['scan'] += time.perf_counter() - fetch_started
+        if not rows:
+            break
+        rows_scanned += len(rows)
+        for name, accumulator in accumulators.items():
+            section_started = time.perf_counter()
+            accumulator.update(rows)
+            timings[name] += time.perf_counter() - section_started
+    return {'accumulators': accumulators, 'rows_scanned': rows_scanned, 'timings': timings}
+
+def finish(scans, started):
+    """
+    Merge per-shard scans and shape the report
+
+    Section and scan timings add up the work of every shard (shards are
+    scanned in parallel, so they can exceed `total`, which is wall time).
+    """
+    first, rest = scans[0], scans[1:]
+    accumulators, timings = first['accumulators'], dict(first['timings'])
+    for other in rest:
+        for name, accumulator in accumulators.items():
+            merge_started = time.perf_counter()
+            accumulator.merge(other['accumulators'][name])
+            timings[name] += time.perf_counter() - merge_started
+        for name, seconds in other['timings'].items():
+            timings[name] += seconds
+
+    results = {}
+    for name, accumulator in accumulators.items():
+        section_started = time.perf_counter()
+        results[name] = accumulator.finish()
+        timings[name] += time.perf_counter() - section_started
+
+    timings['total'] = time.perf_counter() - started
+    return {
+        'sections': results,
+        'rows_scanned': sum(s['rows_scanned'] for s in scans),
+        'timings_ms': {name: round(seconds * 1000, 2) for name, seconds in timings.items()}
+    }
+
+def build_report(conn, sections=SECTIONS, fetch_size=REPORT_FETCH_SIZE):
+    """
+    Run the requested audit sections over one scan of users
+
+    Returns:
+        dict: sections (each shaped like its /api/audit/* response), rows
+              scanned and timings in ms (scan = fetching rows from SQLite)
+    """
+    started = time.perf_counter()
+    return finish([scan(conn, sections, fetch_size)], started)
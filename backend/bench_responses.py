@@ -0,0 +1,94 @@
+"""
+Response Encoding Benchmark
+Bytes on the wire and serialization CPU for /api/hash-migration/users,
+comparing json vs orjson and identity vs gzip/brotli
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import app as backend
+from response_encoding import install_json_provider, BROTLI_AVAILABLE, ORJSON_AVAILABLE
+
+def seed_users(db_path, count):
+    """Insert `count` users carrying full MD5/SHA-1/SHA-256/SHA-512 hex"""
+    conn = sqlite3.connect(db_path)
+    rows = []
+    for i in range(count):
+        password = f"bench-password-{i}".encode()
+        md5 = hashlib.md5(password).hexdigest()
+        rows.append((
+            f"Bench User {i}", f"bench{i}@example.com", 'MD5', '', md5,
+            md5, hashlib.sha1(password).hexdigest(),
+            hashlib.sha256(password).hexdigest(), hashlib.sha512(password).hexdigest(),
+            50, 'SECURE'
+        ))
+    conn.executemany('''
+        INSERT INTO users (
+            name, email, algorithm, salt, password_hash,
+            hash_md5, hash_sha1, hash_sha256, hash_sha512,
+            security_score, breach_status
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+def cpu_ms(func, repeat):
+    """CPU milliseconds per call of func()"""
+    start = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    return (time.process_time() - start) * 1000 / repeat, result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark JSON serialization and response compression')
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    backend.DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    backend.init_db()
+    seed_users(backend.DB_PATH, args.users)
+    path = '/api/hash-migration/users'
+
+    # Payload as the endpoint builds it (query + dict construction are not measured below)
+    with backend.app.test_request_context(path):
+        payload = backend.get_users_for_migration().get_json()
+
+    encoders = ['json'] + (['orjson'] if ORJSON_AVAILABLE else [])
+    encodings = ['identity', 'gzip'] + (['br'] if BROTLI_AVAILABLE else [])
+
+    print(f"📊 {path} with {args.users:,} users ({args.repeat} runs each)")
+    print(f"{'encoder':<8} {'encoding':<9} {'bytes':>12} {'serialize ms':>13} {'compress ms':>12} {'total ms':>9}")
+    baseline = None
+    for encoder in encoders:
+        install_json_provider(backend.app, enabled=(encoder == 'orjson'))
+        serialize_ms, body = cpu_ms(lambda: backend.app.json.response(payload).get_data(), args.repeat)
+        for encoding in encodings:
+            if encoding == 'identity':
+                compress_ms, wire = 0.0, body
+            else:
+                compress_ms, wire = cpu_ms(lambda: backend.compressor.compress(body, encoding), args.repeat)
+            total = serialize_ms + compress_ms
+            if baseline is None:
+                baseline = (len(wire), total)
+            print(f"{encoder:<8} {encoding:<9} {len(wire):>12,} {serialize_ms:>13.1f} {compress_ms:>12.1f} {total:>9.1f}"
+                  f"   ({len(wire) / baseline[0]:.0%} bytes)")
+
+    # End to end through Flask (query + serialization + compression)
+    client = backend.app.test_client()
+    for encoder in encoders:
+        install_json_provider(backend.app, enabled=(encoder == 'orjson'))
+        for encoding in encodings:
+            request_ms, response = cpu_ms(
+                lambda: client.get(path, headers={'Accept-Encoding': encoding}), args.repeat)
+            print(f"🌐 {encoder:<8} {encoding:<9} {len(response.get_data()):>12,} bytes {request_ms:>8.1f} ms/request")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Cold-Start Benchmark
+Import time of app.py (python -X importtime, in fresh interpreters) broken
+down by module, plus init_db on a new database vs the SCHEMA_VERSION fast path
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded on first use; importing any of them at start-up is a regression
+DEFERRED_MODULES = ('numpy', 'requests', 'bcrypt', 'argon2', 'multiprocessing')
+
+IMPORT_PROBE = '''
+import sys, time
+started = time.perf_counter()
+import {module}
+print((time.perf_counter() - started) * 1000)
+print(','.join(sorted(name for name in sys.modules if '.' not in name)))
+'''
+
+def stale_bytecode(directory=BACKEND_DIR):
+    """Backend modules whose __pycache__ entry is missing or older than the source"""
+    stale = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.py'):
+            continue
+        source = os.path.join(directory, name)
+        cached = importlib.util.cache_from_source(source)
+        if not os.path.exists(cached) or os.path.getmtime(cached) < os.path.getmtime(source):
+            stale.append(name)
+    return stale
+
+def parse_importtime(stderr):
+    """-X importtime lines → [(depth, name, self_us, cumulative_us)]"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return entries
+
+def measure_import(module, env=None):
+    """
+    Import `module` once in a fresh interpreter
+
+    Returns:
+        dict: wallMs, the importtime entries and the top-level modules loaded
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_PROBE.format(module=module)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    wall, loaded = result.stdout.strip().splitlines()[-2:]
+    return {
+        'wallMs': float(wall),
+        'entries': parse_importtime(result.stderr),
+        'loaded': set(loaded.split(','))
+    }
+
+def import_report(module, runs, top):
+    """Median wall time over `runs` cold imports and the costliest direct imports"""
+    samples = [measure_import(module) for _ in range(runs)]
+    cumulative = {}
+    for sample in samples:
+        # importtime prints children before their parent: depth-1 entries followed
+        # by `module` itself are its direct imports (others belong to site etc.)
+        children = []
+        for depth, name, _, cumulative_us in sample['entries']:
+            if depth == 1:
+                children.append((name, cumulative_us))
+            elif depth == 0:
+                if name == module:
+                    for child, us in children:
+                        cumulative.setdefault(child, []).append(us)
+                children = []
+    heaviest = sorted(((statistics.median(v) / 1000, name) for name, v in cumulative.items()), reverse=True)
+    return {
+        'module': module,
+        'runs': runs,
+        'medianMs': round(statistics.median(s['wallMs'] for s in samples), 1),
+        'minMs': round(min(s['wallMs'] for s in samples), 1),
+        'modules': {name: round(ms, 2) for ms, name in heaviest[:top]},
+        'deferredLoaded': sorted(m for m in DEFERRED_MODULES if m in samples[-1]['loaded'])
+    }
+
+def init_report(repeat):
+    """init_db on a fresh database, then on the same (current) database again"""
+    sys.path.insert(0, BACKEND_DIR)
+    import app as backend
+    fresh, current = [], []
+    for _ in range(repeat):
+        backend.DB_PATH = os.path.join(tempfile.mkdtemp(), 'startup.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            backend.init_db()
+            fresh.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            backend.init_db()
+            current.append((time.perf_counter() - started) * 1000)
+    return {'freshMs': round(statistics.median(fresh), 2), 'currentMs': round(statistics.median(current), 2)}
+
+def print_report(report, baseline=None):
+    def delta(value, old):
+        return f" ({value - old:+.1f})" if old is not None else ''
+
+    imports = report['imports']
+    old_imports = baseline['imports'] if baseline else {}
+    print(f"⏱️  import {imports['module']}: median {imports['medianMs']} ms"
+          f"{delta(imports['medianMs'], old_imports.get('medianMs'))}, "
+          f"min {imports['minMs']} ms over {imports['runs']} cold runs")
+    for name, ms in imports['modules'].items():
+        print(f"   {name:<28} {ms:>8.2f} ms{delta(ms, old_imports.get('modules', {}).get(name))}")
+    if imports['deferredLoaded']:
+        print(f"⚠️  Loaded at import time: {', '.join(imports['deferredLoaded'])}")
+    else:
+        print(f"✅ Deferred until first use: {', '.join(DEFERRED_MODULES)}")
+    if 'init' in report:
+        init = report['init']
+        old_init = baseline.get('init', {}) if baseline else {}
+        print(f"🗄️  init_db: new database {init['freshMs']} ms{delta(init['freshMs'], old_init.get('freshMs'))}, "
+              f"current schema {init['currentMs']} ms{delta(init['currentMs'], old_init.get('currentMs'))}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold-start import time and init_db')
+    parser.add_argument('--module', default='app', help='Module to import (run from backend/)')
+    parser.add_argument('--runs', type=int, default=7, help='Cold interpreter starts to take the median of')
+    parser.add_argument('--top', type=int, default=15, help='Direct imports to list')
+    parser.add_argument('--skip-init', action='store_true', help='Only measure the import')
+    parser.add_argument('--save', help='Write the report as JSON (e.g. to track it over time)')
+    parser.add_argument('--compare', help='JSON report to print deltas against')
+    args = parser.parse_args(argv)
+
+    stale = stale_bytecode()
+    if stale:
+        # Every cold start recompiles these (e.g. with PYTHONDONTWRITEBYTECODE set)
+        print(f"⚠️  No current bytecode for {len(stale)} module(s): {', '.join(stale[:8])}"
+              f"{' …' if len(stale) > 8 else ''}; run `python -m compileall .` for production numbers")
+
+    report = {'imports': import_report(args.module, args.runs, args.top)}
+    if not args.skip_init:
+        report['init'] = init_report(repeat=3)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
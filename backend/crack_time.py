@@ -0,0 +1,193 @@
+"""
+Crack-Time Estimation Engine
+Brute-force time estimates from per-algorithm, per-parameter rate tables,
+batched over many passwords and memoized on (length, charset, algorithm)
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import math
+import threading
+
+from argon2_hashing import ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+from password_scoring import analyze_batch
+
+# bcrypt work factor when none is given (app.py passes its BCRYPT_ROUNDS)
+DEFAULT_BCRYPT_ROUNDS = 12
+
+# Single high-end GPU (RTX 4090 class). Fast digests are quoted directly; the
+# adaptive algorithms are quoted at a reference setting and scaled from there.
+FAST_HASH_RATES = {
+    'MD5': 200_000_000_000,
+    'SHA1': 100_000_000_000,
+    'SHA256': 22_000_000_000,
+    'SHA512': 7_500_000_000,
+}
+BCRYPT_REFERENCE = {'rounds': 10, 'rate': 20_000}                  # cost doubles per round
+ARGON2_REFERENCE = {'memory_cost': 65536, 'time_cost': 2, 'rate': 1_000}   # ∝ 1 / (memory × passes)
+
+ALGORITHMS = ('MD5', 'SHA1', 'SHA256', 'SHA512', 'bcrypt', 'Argon2')
+DEFAULT_ALGORITHMS = ('MD5', 'SHA1', 'bcrypt', 'Argon2')
+ALGORITHM_ALIASES = {
+    'md5': 'MD5', 'sha1': 'SHA1', 'sha-1': 'SHA1', 'sha256': 'SHA256', 'sha-256': 'SHA256',
+    'sha512': 'SHA512', 'sha-512': 'SHA512', 'bcrypt': 'bcrypt',
+    'argon2': 'Argon2', 'argon2id': 'Argon2',
+}
+
+SECONDS_PER_YEAR = 31_536_000
+
+# Largest log10(seconds) still reported as a plain number (JSON has no infinity)
+MAX_LOG10_SECONDS = 300
+
+# Memo entries kept before the memo is reset (shapes repeat heavily in practice)
+MEMO_MAX_ENTRIES = 4096
+
+def normalize_algorithms(algorithms):
+    """Map algorithm names to their canonical labels (raises ValueError)"""
+    if not algorithms:
+        return DEFAULT_ALGORITHMS
+    names = []
+    for name in algorithms:
+        label = ALGORITHM_ALIASES.get(str(name).lower())
+        if not label:
+            raise ValueError(f"Unsupported algorithm: {name}")
+        if label not in names:
+            names.append(label)
+    return tuple(names)
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           FORMATTING                                           ║
+# ║  Same thresholds as formatTime/getSecurityLevel in js/password-strength.js   ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def format_duration(seconds):
+    """Human readable crack time"""
+    if seconds is None:
+        return 'Longer than the age of the universe'
+    if seconds < 1:
+        return 'Instant'
+    if seconds < 60:
+        return f"{seconds:.2f} seconds"
+    if seconds < 3600:
+        return f"{seconds / 60:.2f} minutes"
+    if seconds < 86400:
+        return f"{seconds / 3600:.2f} hours"
+    if seconds < SECONDS_PER_YEAR:
+        return f"{seconds / 86400:.2f} days"
+    if seconds < SECONDS_PER_YEAR * 100:
+        return f"{seconds / SECONDS_PER_YEAR:.2f} years"
+    centuries = seconds / (SECONDS_PER_YEAR * 100)
+    return f"{centuries:.2f} centuries" if centuries < 1e6 else f"{centuries:.2e} centuries"
+
+def security_level(seconds):
+    """instant / fast / moderate / secure"""
+    if seconds is not None and seconds < 60:
+        return 'instant'
+    if seconds is not None and seconds < 86400:
+        return 'fast'
+    if seconds is not None and seconds < SECONDS_PER_YEAR:
+        return 'moderate'
+    return 'secure'
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           ESTIMATOR                                            ║
+# ║  Average case: half the keyspace (charset ^ length) at the algorithm's rate  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class CrackTimeEstimator:
+    """Rate table for the configured hash parameters plus a memo of estimates"""
+
+    def __init__(self, bcrypt_rounds=DEFAULT_BCRYPT_ROUNDS, argon2_memory_cost=ARGON2_MEMORY_COST,
+                 argon2_time_cost=ARGON2_TIME_COST, argon2_parallelism=ARGON2_PARALLELISM):
+        self.params = {
+            'bcrypt': {'rounds': bcrypt_rounds},
+            'Argon2': {'memoryCost': argon2_memory_cost, 'timeCost': argon2_time_cost,
+                       'parallelism': argon2_parallelism},
+        }
+        self.rates = dict(FAST_HASH_RATES)
+        self.rates['bcrypt'] = BCRYPT_REFERENCE['rate'] * 2.0 ** (BCRYPT_REFERENCE['rounds'] - bcrypt_rounds)
+        self.rates['Argon2'] = (ARGON2_REFERENCE['rate'] * ARGON2_REFERENCE['memory_cost'] * ARGON2_REFERENCE['time_cost']
+                                / (argon2_memory_cost * argon2_time_cost))
+        self.sources = {name: 'reference' for name in self.rates}
+        self._memo = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def set_rate(self, algorithm, rate, source='measured'):
+        """Override one algorithm's guesses/sec (drops memoized estimates)"""
+        label = normalize_algorithms([algorithm])[0]
+        with self._lock:
+            self.rates[label] = float(rate)
+            self.sources[label] = source
+            self._memo.clear()
+
+    def rate_table(self):
+        """Rates and parameters for every algorithm"""
+        return [{
+            'algorithm': name,
+            'hashesPerSec': self.rates[name],
+            'source': self.sources[name],
+            'params': self.params.get(name, {})
+        } for name in ALGORITHMS]
+
+    def estimate(self, length, charset_size, algorithm):
+        """
+        Crack-time estimate for a password shape
+
+        Returns:
+            dict: hashesPerSec, seconds (None if astronomically large), log10Seconds,
+                  readableTime, securityLevel
+
+        Raises:
+            ValueError: for a negative length or charset size
+        """
+        if length < 0 or charset_size < 0:
+            raise ValueError(f'invalid password shape: length {length}, charset size {charset_size}')
+        key = (length, charset_size, algorithm)
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+            rate = self.rates[algorithm]
+
+        # Work in log10 so 100-character passwords don't overflow a float
+        log10_seconds = length * math.log10(charset_size or 1) - math.log10(rate) - math.log10(2)
+        seconds = 10 ** log10_seconds if log10_seconds <= MAX_LOG10_SECONDS else None
+        result = {
+            'hashesPerSec': rate,
+            'seconds': seconds,
+            'log10Seconds': round(log10_seconds, 3),
+            'readableTime': format_duration(seconds),
+            'securityLevel': security_level(seconds)
+        }
+        with self._lock:
+            if len(self._memo) >= MEMO_MAX_ENTRIES:
+                self._memo.clear()
+            self._memo[key] = result
+        return result
+
+    def estimate_shapes(self, shapes, algorithms=DEFAULT_ALGORITHMS):
+        """Estimates for (length, charset_size) pairs (e.g. from audit data without plaintext)"""
+        return [{
+            'length': length,
+            'charsetSize': charset_size,
+            'estimates': {name: self.estimate(length, charset_size, name) for name in algorithms}
+        } for length, charset_size in shapes]
+
+    def estimate_batch(self, passwords, algorithms=DEFAULT_ALGORITHMS):
+        """Estimates for many passwords (length/charset from the vectorized scorer)"""
+        results = []
+        for analysis in analyze_batch(passwords):
+            estimates = {name: self.estimate(analysis['length'], analysis['charsetSize'], name)
+                         for name in algorithms}
+            results.append(dict(analysis, estimates=estimates))
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._memo), 'hits': self.hits, 'misses': self.misses}
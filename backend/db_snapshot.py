@@ -0,0 +1,60 @@
+"""
+Snapshot Reads
+Read-only connections that hold one read transaction for their lifetime, so
+audits and exports see a single consistent snapshot; in WAL mode that read
+never blocks (or is blocked by) concurrent writers
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import os
+import sqlite3
+from datetime import datetime
+from urllib.parse import quote
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           JOURNAL MODE                                         ║
+# ║  WAL is persistent: set once on the database file, every later connection    ║
+# ║  (in any process) uses it                                                    ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def enable_wal(conn):
+    """Switch the database to WAL; returns the resulting journal mode"""
+    return conn.execute('PRAGMA journal_mode=WAL').fetchone()[0].lower()
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SNAPSHOT CONNECTIONS                                 ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class SnapshotConnection(sqlite3.Connection):
+    """sqlite3 connection carrying the description of its read snapshot"""
+    snapshot = None
+
+def open_snapshot(db_path, row_factory=None):
+    """
+    Open a read-only connection pinned to the current database state
+
+    The read transaction starts immediately (BEGIN plus a first read, which is
+    when SQLite fixes the snapshot) and lasts until close(). Every query on
+    the connection sees that state, whatever is committed meanwhile.
+
+    Returns:
+        SnapshotConnection: with .snapshot = {takenAt, isolation, journalMode}
+    """
+    uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, factory=SnapshotConnection, isolation_level=None)
+    if row_factory is not None:
+        conn.row_factory = row_factory
+    journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0].lower()
+    conn.execute('BEGIN')
+    conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+    conn.snapshot = {
+        'takenAt': datetime.now().isoformat(timespec='milliseconds'),
+        # Outside WAL the read transaction still gives one consistent view, but
+        # holds a SHARED lock that makes writers wait until it ends
+        'isolation': 'wal-read-transaction' if journal_mode == 'wal' else 'shared-lock-read-transaction',
+        'journalMode': journal_mode
+    }
+    return conn
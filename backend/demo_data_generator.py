@@ -0,0 +1,357 @@
+"""
+Synthetic Demo Data Generator
+Generates N users (up to millions) from a scenario mix - duplicate and breached
+ratios, algorithm mix, password-strength mix - hashing across a process pool
+and inserting with chunked executemany
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import random
+import secrets
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from argon2_hashing import ARGON2_AVAILABLE, ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+from hash_storage import pack_hex, read_storage_mode
+from lazy_imports import LazyModule
+from multi_hash import compute_digests
+from password_generator import build_charset, LOWERCASE
+from password_scoring import score_batch, breach_status_for
+from user_shards import insert_sharded, read_shard_count, shard_paths
+
+if ARGON2_AVAILABLE:
+    from argon2_hashing import hash_with_salt
+
+bcrypt = LazyModule('bcrypt')
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+
+# Rows per worker job and per executemany/commit
+GENERATE_CHUNK = 5000
+MAX_WORKERS = os.cpu_count() or 1
+
+TABLES = ('users', 'demo_users')
+ALGORITHMS = ('Argon2', 'bcrypt', 'MD5', 'SHA256')
+SCORE_BANDS = ('weak', 'medium', 'strong')
+
+DEFAULT_SCENARIO = {
+    'duplicateRatio': 0.15,         # share of rows reusing an earlier row's password
+    'breachedRatio': 0.10,          # share of rows using a well-known breached password
+    'algorithms': {'Argon2': 0.5, 'bcrypt': 0.3, 'MD5': 0.1, 'SHA256': 0.1},
+    'scores': {'weak': 0.3, 'medium': 0.4, 'strong': 0.3}
+}
+
+# Production parameters, and cheap ones for capacity tests (hashes stay verifiable:
+# bcrypt and PHC strings carry their own parameters)
+HASH_PARAMS = {
+    'full': {'bcryptRounds': 12, 'argon2TimeCost': ARGON2_TIME_COST, 'argon2MemoryCost': ARGON2_MEMORY_COST},
+    'cheap': {'bcryptRounds': 4, 'argon2TimeCost': 1, 'argon2MemoryCost': 64}
+}
+
+COMMON_PASSWORDS = (
+    'password', '123456', '123456789', 'qwerty', 'password123', '12345678', '111111',
+    'abc123', 'iloveyou', 'admin', 'welcome', 'monkey', 'letmein', 'dragon', 'football',
+    'sunshine', 'princess', 'qwerty123', 'baseball', 'master', 'shadow', '654321'
+)
+FIRST_NAMES = (
+    'Sarah', 'Michael', 'David', 'Emily', 'John', 'Lisa', 'Robert', 'Jennifer', 'Alex',
+    'Jessica', 'Christopher', 'Amanda', 'William', 'Sophia', 'Daniel', 'Olivia', 'James',
+    'Emma', 'Noah', 'Isabella', 'Lucas', 'Mia', 'Henry', 'Ava', 'Owen', 'Zoe'
+)
+LAST_NAMES = (
+    'Johnson', 'Chen', 'Martinez', 'Rodriguez', 'Smith', 'Anderson', 'Taylor', 'Wilson',
+    'Turner', 'Brown', 'Lee', 'Foster', 'Harris', 'Kim', 'Thompson', 'Davis', 'Garcia',
+    'Moore', 'Walker', 'Hall', 'Young', 'King', 'Wright', 'Scott', 'Adams', 'Nelson'
+)
+WORDS = ('welcome', 'summer', 'winter', 'spring', 'company', 'dragon', 'monkey', 'sunshine',
+         'soccer', 'guitar', 'coffee', 'tiger', 'rocket', 'purple', 'silver', 'thunder')
+STRONG_CHARSET = build_charset()
+
+def normalize_scenario(overrides=None):
+    """
+    Merge scenario overrides into DEFAULT_SCENARIO
+
+    Mixes are relative weights (normalised here). Raises ValueError on bad input.
+    """
+    scenario = json.loads(json.dumps(DEFAULT_SCENARIO))
+    for key, value in (overrides or {}).items():
+        if key not in scenario:
+            raise ValueError(f"Unknown scenario key: {key}")
+        scenario[key] = value
+    for key in ('duplicateRatio', 'breachedRatio'):
+        scenario[key] = float(scenario[key])
+        if not 0 <= scenario[key] <= 1:
+            raise ValueError(f"{key} must be between 0 and 1")
+    for key, allowed in (('algorithms', ALGORITHMS), ('scores', SCORE_BANDS)):
+        mix = {name: float(weight) for name, weight in dict(scenario[key]).items()}
+        unknown = set(mix) - set(allowed)
+        if unknown:
+            raise ValueError(f"{key} must only use {', '.join(allowed)} (got {', '.join(sorted(unknown))})")
+        if any(weight < 0 for weight in mix.values()) or sum(mix.values()) <= 0:
+            raise ValueError(f"{key} weights must be non-negative and not all zero")
+        total = sum(mix.values())
+        scenario[key] = {name: weight / total for name, weight in mix.items() if weight > 0}
+    return scenario
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           ROW GENERATION (WORKER)                              ║
+# ║  Each job builds and hashes `count` rows from its own seed, so jobs are      ║
+# ║  independent and reproducible; rows come back ready for executemany          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+_worker = {}
+
+def _init_worker(scenario, params, blob):
+    """Pool initializer: scenario and hash parameters shipped once per process (blob → pack_hex digests)"""
+    _worker['scenario'] = scenario
+    _worker['params'] = params
+    _worker['encode'] = pack_hex if blob else (lambda value: value)
+
+def _password_for_band(rng, band):
+    """Plaintext shaped to land in a score band"""
+    # Random parts keep unintended repeats rare next to duplicateRatio
+    if band == 'weak':
+        return ''.join(rng.choices(LOWERCASE, k=rng.randrange(4, 6))) + str(rng.randrange(100))       # ~30-35
+    if band == 'medium':
+        return rng.choice(WORDS) + str(rng.randrange(1000, 10000)) + rng.choice(LOWERCASE)          # ~55-65
+    return ''.join(rng.choices(STRONG_CHARSET, k=rng.randrange(14, 21)))                          # 80+
+
+def _hash_row(password, algorithm, params):
+    """(algorithm label, salt, password_hash, resalt_count) as the app stores them"""
+    if algorithm == 'Argon2' and not ARGON2_AVAILABLE:
+        algorithm = 'bcrypt'    # same fallback as hash_password_argon2
+    if algorithm == 'Argon2':
+        salt = secrets.token_hex(8)
+        return algorithm, salt, hash_with_salt(password, salt, time_cost=params['argon2TimeCost'],
+                                               memory_cost=params['argon2MemoryCost']), 0
+    if algorithm == 'bcrypt':
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=params['bcryptRounds']))
+        return algorithm, secrets.token_hex(8), hashed.decode('utf-8'), 0
+    md5_hex = hashlib.md5(password.encode('utf-8')).hexdigest()
+    if algorithm == 'MD5':
+        return algorithm, '', md5_hex, 0
+    # SHA256 rows look like resalted users: sha256(md5_hex + salt)
+    salt = secrets.token_hex(16)
+    return algorithm, salt, hashlib.sha256((md5_hex + salt).encode()).hexdigest(), 1
+
+def _generate_job(job):
+    """Worker entry point: job = (first_row, count, seed, run_tag)"""
+    first, count, seed, tag = job
+    scenario, params, encode = _worker['scenario'], _worker['params'], _worker['encode']
+    rng = random.Random(seed)
+    algorithms, algorithm_weights = zip(*scenario['algorithms'].items())
+    bands, band_weights = zip(*scenario['scores'].items())
+
+    passwords, breached, chosen = [], [], []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < scenario['breachedRatio']:
+            passwords.append(rng.choice(COMMON_PASSWORDS))
+            breached.append(True)
+        elif passwords and roll < scenario['breachedRatio'] + scenario['duplicateRatio']:
+            passwords.append(passwords[rng.randrange(len(passwords))])
+            breached.append(False)
+        else:
+            passwords.append(_password_for_band(rng, rng.choices(bands, band_weights)[0]))
+            breached.append(False)
+        chosen.append(rng.choices(algorithms, algorithm_weights)[0])
+
+    rows = []
+    scores = score_batch(passwords)
+    for i, password in enumerate(passwords):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        algorithm, salt, password_hash, resalt_count = _hash_row(password, chosen[i], params)
+        digests = compute_digests(password)
+        status = 'BREACHED' if breached[i] else breach_status_for(scores[i])
+        rows.append((
+            f"{first_name} {last_name}",
+            f"{first_name}.{last_name}.{tag}{first + i}@loadtest.local".lower(),
+            algorithm, encode(salt), encode(password_hash),
+            encode(digests['md5']), encode(digests['sha1']), encode(digests['sha256']), encode(digests['sha512']),
+            scores[i], status, resalt_count
+        ))
+    return rows
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           BULK INSERT                                          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+INSERT_SQL = '''
+    INSERT OR IGNORE INTO {table} (
+        name, email, algorithm, salt, password_hash,
+        hash_md5, hash_sha1, hash_sha256, hash_sha512,
+        security_score, breach_status, resalt_count
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Sharded users tables: ids are allocated per shard (see user_shards.insert_sharded)
+INSERT_WITH_ID_SQL = '''
+    INSERT OR IGNORE INTO users (
+        id, name, email, algorithm, salt, password_hash,
+        hash_md5, hash_sha1, hash_sha256, hash_sha512,
+        security_score, breach_status, resalt_count
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+def generate_users(conn, count, scenario=None, table='users', cheap=False, workers=None,
+                   chunk=GENERATE_CHUNK, seed=None, clear=False, progress_callback=None,
+                   shard_conns=None):
+    """
+    Generate and insert `count` synthetic users
+
+    Args:
+        conn: sqlite3 connection (schema from init_db)
+        scenario: overrides for DEFAULT_SCENARIO
+        table: users or demo_users
+        cheap: use HASH_PARAMS['cheap'] instead of production hash costs
+        workers: processes (defaults to every core; 1 runs inline)
+        clear: delete the table's rows first
+        shard_conns: one connection per user shard (shard_conns[0] being conn);
+                     users rows are routed to their owning shard
+
+    Returns:
+        dict: counts, timings and rows/sec
+    """
+    if table not in TABLES:
+        raise ValueError(f"table must be one of {', '.join(TABLES)}")
+    if count < 1:
+        raise ValueError('count must be positive')
+    scenario = normalize_scenario(scenario)
+    params = HASH_PARAMS['cheap' if cheap else 'full']
+    workers = max(1, min(workers or MAX_WORKERS, MAX_WORKERS))
+    blob = read_storage_mode(conn, default='text') == 'blob'
+    seed = secrets.randbits(32) if seed is None else seed
+    tag = f"{seed:x}-"
+    jobs = iter([(first, min(chunk, count - first), seed + first, tag) for first in range(0, count, chunk)])
+    sql = INSERT_SQL.format(table=table)
+    sharded = table == 'users' and shard_conns is not None and len(shard_conns) > 1
+    targets = shard_conns if sharded else [conn]
+
+    if clear:
+        for target in targets:
+            target.execute(f"DELETE FROM {table}")
+            target.commit()
+
+    started = time.perf_counter()
+    stats = {'rows': 0, 'inserted': 0, 'insertSeconds': 0.0}
+
+    def insert(rows):
+        insert_started = time.perf_counter()
+        if sharded:
+            stats['inserted'] += insert_sharded(shard_conns, INSERT_WITH_ID_SQL, rows)
+        else:
+            cursor = conn.executemany(sql, rows)
+            # rowcount, unlike total_changes, ignores rows written by the FTS triggers
+            stats['inserted'] += max(cursor.rowcount, 0)
+        conn.commit()
+        stats['insertSeconds'] += time.perf_counter() - insert_started
+        stats['rows'] += len(rows)
+        if progress_callback:
+            elapsed = time.perf_counter() - started
+            progress_callback({'rows': stats['rows'], 'total': count,
+                               'rowsPerSec': round(stats['rows'] / elapsed) if elapsed else 0})
+
+    if workers == 1:
+        _init_worker(scenario, params, blob)
+        for job in jobs:
+            insert(_generate_job(job))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(scenario, params, blob)) as pool:
+            # Two jobs per worker in flight; inserts happen here while workers hash
+            pending = {}
+            next_index = 0
+            done_rows = {}
+            insert_index = 0
+            for job in jobs:
+                pending[pool.submit(_generate_job, job)] = next_index
+                next_index += 1
+                if len(pending) >= workers * 2:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        done_rows[pending.pop(future)] = future.result()
+                    while insert_index in done_rows:
+                        insert(done_rows.pop(insert_index))
+                        insert_index += 1
+            for future in list(pending):
+                done_rows[pending.pop(future)] = future.result()
+            while insert_index in done_rows:
+                insert(done_rows.pop(insert_index))
+                insert_index += 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        'table': table,
+        'requested': count,
+        'rows': stats['rows'],
+        'inserted': stats['inserted'],
+        'seconds': round(elapsed, 3),
+        'insertSeconds': round(stats['insertSeconds'], 3),
+        'rowsPerSec': round(stats['rows'] / elapsed) if elapsed else 0,
+        'workers': workers,
+        'hashParams': 'cheap' if cheap else 'full',
+        'seed': seed,
+        'scenario': scenario
+    }
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python demo_data_generator.py 1000000 --cheap [--scenario mix.json]          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic users for capacity testing')
+    parser.add_argument('count', type=int, help='Rows to generate')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database path')
+    parser.add_argument('--table', choices=TABLES, default='users')
+    parser.add_argument('--scenario', default=None,
+                        help='JSON object or path to a JSON file overriding the default scenario')
+    parser.add_argument('--cheap', action='store_true', help='Cheap bcrypt/Argon2 parameters')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk', type=int, default=GENERATE_CHUNK, help='Rows per job and per commit')
+    parser.add_argument('--seed', type=int, default=None, help='Reproducible passwords and mix')
+    parser.add_argument('--clear', action='store_true', help='Delete existing rows in the table first')
+    args = parser.parse_args(argv)
+
+    scenario = None
+    if args.scenario:
+        if os.path.exists(args.scenario):
+            with open(args.scenario, encoding='utf-8') as handle:
+                scenario = json.load(handle)
+        else:
+            scenario = json.loads(args.scenario)
+
+    conn = sqlite3.connect(args.db)
+    # Users go to their owning shard (database.shard<i>.db next to --db)
+    shard_conns = [conn] + [sqlite3.connect(path, timeout=30)
+                            for path in shard_paths(args.db, read_shard_count(conn))[1:]]
+    try:
+        def report(progress):
+            print(f"\r📦 {progress['rows']:,}/{progress['total']:,} rows | {progress['rowsPerSec']:,} rows/s",
+                  end='', file=sys.stderr)
+
+        result = generate_users(conn, args.count, scenario, args.table, args.cheap, args.workers,
+                                args.chunk, args.seed, args.clear, report, shard_conns)
+    finally:
+        for shard_conn in shard_conns:
+            shard_conn.close()
+    print(file=sys.stderr)
+    print(f"✅ {result['inserted']:,} rows into {result['table']} in {result['seconds']}s "
+          f"({result['rowsPerSec']:,} rows/s, {result['workers']} worker(s), {result['hashParams']} hashing; "
+          f"insert {result['insertSeconds']}s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""
+Hash Algorithm Registry
+One object per password-hash algorithm (hash, verify, needs-rehash, cost
+metadata and a benchmark hook) so migrations, verification and benchmarks
+dispatch by name instead of repeating if/elif chains
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import hashlib
+import hmac
+
+from argon2_hashing import (ARGON2_AVAILABLE, ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM,
+                            ARGON2_HASH_LEN, ARGON2_SALT_LEN, low_level)
+from lazy_imports import LazyModule
+
+argon2 = LazyModule('argon2')
+bcrypt = LazyModule('bcrypt')
+
+DEFAULT_BCRYPT_ROUNDS = 12
+
+# OWASP Password Storage Cheat Sheet: PBKDF2-HMAC-SHA256 with 600,000 iterations,
+# scrypt with N=2^15, r=8, p=3 (32 MiB per hash)
+PBKDF2_HASH = 'sha256'
+PBKDF2_ITERATIONS = 600_000
+SCRYPT_N = 2 ** 15
+SCRYPT_R = 8
+SCRYPT_P = 3
+SCRYPT_DKLEN = 32
+
+# hashlib.scrypt needs OpenSSL 1.1+
+SCRYPT_AVAILABLE = hasattr(hashlib, 'scrypt')
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           ALGORITHMS                                           ║
+# ║  hash(secret, salt) → stored string; each algorithm decides how the salt is  ║
+# ║  used (appended for digests/bcrypt/Argon2id as stored rows always have been, ║
+# ║  passed natively to PBKDF2 and scrypt). verify mirrors hash                  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class HashAlgorithm:
+    """Base class; subclasses set name, cost and implement hash/verify"""
+
+    name = None
+    aliases = ()
+    # Fast digests are unsuitable for passwords: every stored one needs a rehash
+    recommended = True
+    # C implementation that drops the GIL while hashing (threads scale across cores)
+    releases_gil = False
+    # Usable as a hash-migration target
+    migration_target = True
+
+    def __init__(self, **cost):
+        self.cost = cost
+
+    def hash(self, secret, salt=''):
+        raise NotImplementedError
+
+    def verify(self, secret, salt, stored):
+        return hmac.compare_digest(self.hash(secret, salt), stored)
+
+    def needs_rehash(self, stored):
+        """True when `stored` was made with weaker parameters than self.cost"""
+        return not self.recommended
+
+    def memory_kib(self):
+        """Approximate memory one hash needs"""
+        return 0
+
+    def benchmark_function(self, password, salt, params=None):
+        """
+        Zero-argument callable hashing `password` (bytes) once, for hash_benchmark
+
+        params override the cost (same keys as the benchmark specs); the fastest
+        direct call is used so measured rates match what an attacker gets.
+        """
+        raise NotImplementedError
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'aliases': list(self.aliases),
+            'cost': dict(self.cost),
+            'memoryKiB': self.memory_kib(),
+            'recommended': self.recommended,
+            'releasesGil': self.releases_gil,
+            'migrationTarget': self.migration_target
+        }
+
+class DigestAlgorithm(HashAlgorithm):
+    """Unkeyed digest of secret + salt (MD5, SHA-1, SHA-256, SHA-512)"""
+
+    recommended = False
+
+    def __init__(self, name, migration_target=True):
+        super().__init__(iterations=1)
+        self.name = name
+        self.migration_target = migration_target
+        self._constructor = getattr(hashlib, name.lower())
+
+    def hash(self, secret, salt=''):
+        return self._constructor((secret + salt).encode()).hexdigest()
+
+    def benchmark_function(self, password, salt, params=None):
+        constructor = self._constructor
+        return lambda: constructor(password).digest()
+
+class BcryptAlgorithm(HashAlgorithm):
+    """bcrypt over secret + salt (bcrypt also embeds its own random salt)"""
+
+    name = 'BCRYPT'
+    releases_gil = True
+
+    def __init__(self, rounds=DEFAULT_BCRYPT_ROUNDS):
+        super().__init__(rounds=rounds)
+
+    def hash(self, secret, salt=''):
+        hashed = bcrypt.hashpw((secret + salt).encode('utf-8'), bcrypt.gensalt(rounds=self.cost['rounds']))
+        return hashed.decode('utf-8')
+
+    def verify(self, secret, salt, stored):
+        try:
+            return bcrypt.checkpw((secret + salt).encode('utf-8'), stored.encode('utf-8'))
+        except ValueError:      # not a bcrypt hash
+            return False
+
+    def needs_rehash(self, stored):
+        # $2b$<rounds>$<salt+hash>
+        parts = stored.split('$')
+        return len(parts) < 4 or not parts[2].isdigit() or int(parts[2]) < self.cost['rounds']
+
+    def benchmark_function(self, password, salt, params=None):
+        salt = bcrypt.gensalt(rounds=(params or self.cost)['rounds'])
+        return lambda: bcrypt.hashpw(password, salt)
+
+class Argon2Algorithm(HashAlgorithm):
+    """Argon2id (PHC string with its own random salt) over secret + salt"""
+
+    name = 'ARGON2ID'
+    aliases = ('ARGON2',)
+    releases_gil = True
+
+    def __init__(self, time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST,
+                 parallelism=ARGON2_PARALLELISM, hash_len=ARGON2_HASH_LEN, salt_len=ARGON2_SALT_LEN):
+        super().__init__(timeCost=time_cost, memoryCost=memory_cost, parallelism=parallelism,
+                         hashLen=hash_len, saltLen=salt_len)
+        self._hasher = None
+
+    def hasher(self):
+        """PasswordHasher with this cost (built on first use)"""
+        if self._hasher is None:
+            self._hasher = argon2.PasswordHasher(
+                time_cost=self.cost['timeCost'],
+                memory_cost=self.cost['memoryCost'],
+                parallelism=self.cost['parallelism'],
+                hash_len=self.cost['hashLen'],
+                salt_len=self.cost['saltLen'],
+                type=argon2.Type.ID
+            )
+        return self._hasher
+
+    def hash(self, secret, salt=''):
+        return self.hasher().hash(secret + salt)
+
+    def verify(self, secret, salt, stored):
+        try:
+            return self.hasher().verify(stored, secret + salt)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+            return False
+
+    def needs_rehash(self, stored):
+        return self.hasher().check_needs_rehash(stored)
+
+    def memory_kib(self):
+        return self.cost['memoryCost']
+
+    def benchmark_function(self, password, salt, params=None):
+        params = {**self.cost, **(params or {})}
+        return lambda: low_level.hash_secret_raw(password, salt, time_cost=params['timeCost'],
+                                                 memory_cost=params['memoryCost'],
+                                                 parallelism=params['parallelism'],
+                                                 hash_len=32, type=low_level.Type.ID)
+
+class Pbkdf2Algorithm(HashAlgorithm):
+    """PBKDF2-HMAC (hashlib, OpenSSL); stored as pbkdf2_<hash>$<iterations>$<hex>"""
+
+    name = 'PBKDF2'
+    aliases = ('PBKDF2-SHA256',)
+    releases_gil = True
+
+    def __init__(self, hash_name=PBKDF2_HASH, iterations=PBKDF2_ITERATIONS):
+        super().__init__(hash=hash_name, iterations=iterations)
+
+    @staticmethod
+    def _derive(hash_name, secret, salt, iterations):
+        return hashlib.pbkdf2_hmac(hash_name, secret.encode('utf-8'), salt.encode('utf-8'), iterations).hex()
+
+    def hash(self, secret, salt=''):
+        iterations = self.cost['iterations']
+        return f"pbkdf2_{self.cost['hash']}${iterations}${self._derive(self.cost['hash'], secret, salt, iterations)}"
+
+    def _parse(self, stored):
+        prefix, iterations, digest = stored.split('$')
+        if not prefix.startswith('pbkdf2_') or not iterations.isdigit():
+            raise ValueError('not a PBKDF2 hash')
+        return prefix[len('pbkdf2_'):], int(iterations), digest
+
+    def verify(self, secret, salt, stored):
+        # The stored iteration count wins, so older hashes still verify after a cost increase
+        try:
+            hash_name, iterations, digest = self._parse(stored)
+        except ValueError:
+            return False
+        return hmac.compare_digest(self._derive(hash_name, secret, salt, iterations), digest)
+
+    def needs_rehash(self, stored):
+        try:
+            hash_name, iterations, _ = self._parse(stored)
+        except ValueError:
+            return True
+        return hash_name != self.cost['hash'] or iterations < self.cost['iterations']
+
+    def benchmark_function(self, password, salt, params=None):
+        params = {**self.cost, **(params or {})}
+        return lambda: hashlib.pbkdf2_hmac(params['hash'], password, salt, params['iterations'])
+
+class ScryptAlgorithm(HashAlgorithm):
+    """scrypt (hashlib, OpenSSL); stored as scrypt$<n>$<r>$<p>$<hex>"""
+
+    name = 'SCRYPT'
+    releases_gil = True
+
+    def __init__(self, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=SCRYPT_DKLEN):
+        super().__init__(n=n, r=r, p=p, dklen=dklen)
+
+    @staticmethod
+    def _derive(secret, salt, n, r, p, dklen):
+        # OpenSSL refuses anything above maxmem (default 32 MiB): allow exactly what N, r, p need
+        maxmem = 128 * r * (n + p + 2) + 1024 * 1024
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=dklen)
+
+    def hash(self, secret, salt=''):
+        n, r, p, dklen = (self.cost[key] for key in ('n', 'r', 'p', 'dklen'))
+        digest = self._derive(secret.encode('utf-8'), salt.encode('utf-8'), n, r, p, dklen).hex()
+        return f"scrypt${n}${r}${p}${digest}"
+
+    @staticmethod
+    def _parse(stored):
+        prefix, *params, digest = stored.split('$')
+        if prefix != 'scrypt' or len(params) != 3 or not all(value.isdigit() for value in params):
+            raise ValueError('not a scrypt hash')
+        return (*(int(value) for value in params), digest)
+
+    def verify(self, secret, salt, stored):
+        try:
+            n, r, p, digest = self._parse(stored)
+        except ValueError:
+            return False
+        derived = self._derive(secret.encode('utf-8'), salt.encode('utf-8'), n, r, p, len(digest) // 2)
+        return hmac.compare_digest(derived.hex(), digest)
+
+    def needs_rehash(self, stored):
+        try:
+            n, r, p, _ = self._parse(stored)
+        except ValueError:
+            return True
+        return n < self.cost['n'] or r < self.cost['r'] or p < self.cost['p']
+
+    def memory_kib(self):
+        return 128 * self.cost['r'] * self.cost['n'] // 1024
+
+    def benchmark_function(self, password, salt, params=None):
+        params = {**self.cost, **(params or {})}
+        return lambda: self._derive(password, salt, params['n'], params['r'], params['p'], params['dklen'])
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           REGISTRY                                             ║
+# ║  Names are the labels migrations store (target.upper()); lookups ignore     ║
+# ║  case and accept aliases (e.g. 'argon2' → ARGON2ID)                           ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class HashRegistry:
+    """Algorithms by name"""
+
+    def __init__(self, algorithms=()):
+        self._algorithms = {}
+        self._aliases = {}
+        for algorithm in algorithms:
+            self.register(algorithm)
+
+    def register(self, algorithm):
+        """Add (or replace) an algorithm under its name and aliases"""
+        self._algorithms[algorithm.name] = algorithm
+        for alias in (algorithm.name, *algorithm.aliases):
+            self._aliases[alias.upper()] = algorithm.name
+        return algorithm
+
+    def __contains__(self, name):
+        return str(name).upper() in self._aliases
+
+    def get(self, name):
+        """
+        Algorithm by name or alias
+
+        Raises:
+            ValueError: for unknown (or not installed) algorithms
+        """
+        key = self._aliases.get(str(name).upper())
+        if key is None:
+            raise ValueError(f"Unknown hash algorithm: {name} (use {', '.join(self.names())})")
+        return self._algorithms[key]
+
+    def names(self):
+        return tuple(self._algorithms)
+
+    def migration_targets(self):
+        """Lowercase names accepted as targetAlgorithm by the migration endpoints"""
+        return tuple(name.lower() for name, algorithm in self._algorithms.items() if algorithm.migration_target)
+
+    def describe(self):
+        return [algorithm.describe() for algorithm in self._algorithms.values()]
+
+def default_registry(bcrypt_rounds=DEFAULT_BCRYPT_ROUNDS, pbkdf2_iterations=PBKDF2_ITERATIONS,
+                     scrypt_n=SCRYPT_N):
+    """Every algorithm installed here (Argon2id needs argon2-cffi, scrypt OpenSSL 1.1+)"""
+    registry = HashRegistry([DigestAlgorithm('MD5', migration_target=False), DigestAlgorithm('SHA1'),
+                             DigestAlgorithm('SHA256'), DigestAlgorithm('SHA512'),
+                             BcryptAlgorithm(rounds=bcrypt_rounds)])
+    if ARGON2_AVAILABLE:
+        registry.register(Argon2Algorithm())
+    registry.register(Pbkdf2Algorithm(iterations=pbkdf2_iterations))
+    if SCRYPT_AVAILABLE:
+        registry.register(ScryptAlgorithm(n=scrypt_n))
+    return registry
@@ -0,0 +1,243 @@
+"""
+Host Hashing Benchmark
+Measures hashes/sec on this machine for the fast digests, PBKDF2, scrypt, bcrypt
+and Argon2id (single-core and all-core) and caches the results as JSON so the
+crack-time estimator and /api/health can report measured numbers
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import concurrent.futures
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+from argon2_hashing import ARGON2_AVAILABLE, ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+from hash_algorithms import default_registry, SCRYPT_AVAILABLE, SCRYPT_N, SCRYPT_R, SCRYPT_P
+
+# Each spec is timed through its registry algorithm's benchmark hook
+ALGORITHMS = default_registry()
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    'HASH_RATES_PATH', os.path.join(os.path.dirname(__file__), 'hash_rates.json'))
+
+FAST_ALGORITHMS = ('MD5', 'SHA1', 'SHA256', 'SHA512')
+PBKDF2_ITERATIONS = 100_000
+BCRYPT_ROUNDS = (10, 12)
+ARGON2_MEMORY_COSTS = (19456, 65536)      # KiB: OWASP minimum and this app's setting
+SCRYPT_COSTS = (SCRYPT_N,)
+
+# Seconds spent on each measurement (per mode)
+DEFAULT_DURATION = 0.5
+MAX_WORKERS = os.cpu_count() or 1
+
+# Fast digests are called in batches so the clock is not read per hash
+FAST_BATCH = 2000
+
+SAMPLE_PASSWORD = b'correct horse 42'
+SAMPLE_SALT = b'benchmark-salt-16'
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           MEASUREMENT                                          ║
+# ║  A spec is (algorithm, params); each worker times the same spec for the      ║
+# ║  same duration and the all-core rate is the sum of the workers' rates        ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def default_specs(bcrypt_rounds=BCRYPT_ROUNDS, argon2_memory_costs=ARGON2_MEMORY_COSTS,
+                  pbkdf2_iterations=PBKDF2_ITERATIONS, scrypt_costs=SCRYPT_COSTS):
+    """Every (algorithm, params) pair measured by default"""
+    specs = [(name, {}) for name in FAST_ALGORITHMS]
+    specs.append(('PBKDF2', {'hash': 'sha256', 'iterations': pbkdf2_iterations}))
+    if SCRYPT_AVAILABLE:
+        specs.extend(('scrypt', {'n': n, 'r': SCRYPT_R, 'p': SCRYPT_P}) for n in sorted(set(scrypt_costs)))
+    specs.extend(('bcrypt', {'rounds': rounds}) for rounds in sorted(set(bcrypt_rounds)))
+    if ARGON2_AVAILABLE:
+        specs.extend(('Argon2', {'memoryCost': memory, 'timeCost': ARGON2_TIME_COST,
+                                 'parallelism': ARGON2_PARALLELISM})
+                     for memory in sorted(set(argon2_memory_costs)))
+    return specs
+
+def _hash_function(algorithm, params):
+    """Callable hashing SAMPLE_PASSWORD once with the spec's parameters"""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+    return ALGORITHMS.get(algorithm).benchmark_function(SAMPLE_PASSWORD, SAMPLE_SALT, params)
+
+def measure(spec, duration=DEFAULT_DURATION):
+    """Hashes/sec for one spec on the calling core (at least one hash is always timed)"""
+    algorithm, params = spec
+    fn = _hash_function(algorithm, params)
+    batch = FAST_BATCH if algorithm in FAST_ALGORITHMS else 1
+    fn()    # warm up (allocations, bcrypt salt parsing)
+    count = 0
+    started = time.perf_counter()
+    deadline = started + duration
+    while True:
+        for _ in range(batch):
+            fn()
+        count += batch
+        now = time.perf_counter()
+        if now >= deadline:
+            return count / (now - started)
+
+def _measure_job(job):
+    """Worker entry point: job = (spec, duration)"""
+    return measure(*job)
+
+def run_benchmark(specs=None, duration=DEFAULT_DURATION, workers=None, progress_callback=None):
+    """
+    Measure every spec single-core, then on all cores at once
+
+    Args:
+        specs: (algorithm, params) pairs (default_specs() when omitted)
+        duration: seconds per measurement and mode
+        workers: processes for the all-core pass (defaults to every core)
+
+    Returns:
+        dict: host details and one result per spec
+    """
+    specs = specs or default_specs()
+    workers = max(1, min(workers or MAX_WORKERS, MAX_WORKERS))
+    results = []
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for spec in specs:
+            single = measure(spec, duration)
+            if pool:
+                all_core = sum(pool.map(_measure_job, [(spec, duration)] * workers))
+            else:
+                all_core = single
+            result = {
+                'algorithm': spec[0],
+                'params': spec[1],
+                'singleCore': round(single, 2),
+                'allCore': round(all_core, 2)
+            }
+            results.append(result)
+            if progress_callback:
+                progress_callback(result)
+    finally:
+        if pool:
+            pool.shutdown()
+    return {
+        'measuredAt': datetime.now().isoformat(),
+        'host': {
+            'cpuCount': MAX_WORKERS,
+            'workers': workers,
+            'platform': platform.platform(),
+            'python': platform.python_version()
+        },
+        'duration': duration,
+        'results': results
+    }
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           CACHE                                                ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def save_results(report, path=DEFAULT_CACHE_PATH):
+    """Write the report atomically"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    os.replace(tmp, path)
+
+def load_results(path=DEFAULT_CACHE_PATH):
+    """Cached report, or None when no benchmark has been run (or the file is unreadable)"""
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+def summarize(report):
+    """Compact view for /api/health: all-core rate per algorithm and parameter set"""
+    if not report:
+        return None
+    rates = {}
+    for result in report['results']:
+        label = result['algorithm']
+        params = result['params']
+        if 'rounds' in params:
+            label += f"-{params['rounds']}"
+        elif 'memoryCost' in params:
+            label += f"-m{params['memoryCost']}"
+        elif 'n' in params:
+            label += f"-n{params['n']}"
+        rates[label] = result['allCore']
+    return {'measuredAt': report['measuredAt'], 'cpuCount': report['host']['cpuCount'], 'hashesPerSec': rates}
+
+def apply_to_estimator(estimator, report):
+    """
+    Feed measured all-core rates into a CrackTimeEstimator
+
+    bcrypt and Argon2 use the measurement closest to the estimator's own
+    parameters, scaled by 2^Δrounds or by memory × passes (as the reference
+    rates are). Returns the algorithms that were updated.
+    """
+    if not report:
+        return []
+    updated = []
+    by_algorithm = {}
+    for result in report['results']:
+        by_algorithm.setdefault(result['algorithm'], []).append(result)
+    source = f"measured ({report['host']['workers']} cores, {report['measuredAt'][:10]})"
+    for name in FAST_ALGORITHMS:
+        if name in by_algorithm:
+            estimator.set_rate(name, by_algorithm[name][0]['allCore'], source)
+            updated.append(name)
+    if 'bcrypt' in by_algorithm:
+        rounds = estimator.params['bcrypt']['rounds']
+        best = min(by_algorithm['bcrypt'], key=lambda r: abs(r['params']['rounds'] - rounds))
+        estimator.set_rate('bcrypt', best['allCore'] * 2.0 ** (best['params']['rounds'] - rounds), source)
+        updated.append('bcrypt')
+    if 'Argon2' in by_algorithm:
+        params = estimator.params['Argon2']
+        best = min(by_algorithm['Argon2'], key=lambda r: abs(r['params']['memoryCost'] - params['memoryCost']))
+        scale = (best['params']['memoryCost'] * best['params']['timeCost']
+                 / (params['memoryCost'] * params['timeCost']))
+        estimator.set_rate('Argon2', best['allCore'] * scale, source)
+        updated.append('Argon2')
+    return updated
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python hash_benchmark.py [--duration 0.5] [--workers N]                      ║
+# ║                           [--bcrypt-rounds 10 12] [--argon2-memory 19456]      ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure hashes/sec on this host')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='Seconds per measurement')
+    parser.add_argument('--workers', type=int, default=None, help='Processes for the all-core pass')
+    parser.add_argument('--bcrypt-rounds', type=int, nargs='+', default=list(BCRYPT_ROUNDS))
+    parser.add_argument('--argon2-memory', type=int, nargs='+', default=list(ARGON2_MEMORY_COSTS),
+                        help='Argon2id memory costs in KiB')
+    parser.add_argument('--pbkdf2-iterations', type=int, default=PBKDF2_ITERATIONS)
+    parser.add_argument('--scrypt-n', type=int, nargs='+', default=list(SCRYPT_COSTS), help='scrypt CPU/memory costs')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='Where to store the results')
+    parser.add_argument('--no-save', action='store_true', help='Print only')
+    args = parser.parse_args(argv)
+
+    specs = default_specs(args.bcrypt_rounds, args.argon2_memory, args.pbkdf2_iterations, args.scrypt_n)
+    print(f"⏱️  {len(specs)} measurements × {args.duration}s, {args.workers or MAX_WORKERS} core(s) for all-core")
+    print(f"{'algorithm':<10} {'params':<34} {'single-core H/s':>16} {'all-core H/s':>16}")
+
+    def report_line(result):
+        params = ', '.join(f"{k}={v}" for k, v in result['params'].items())
+        print(f"{result['algorithm']:<10} {params:<34} {result['singleCore']:>16,.1f} {result['allCore']:>16,.1f}")
+
+    report = run_benchmark(specs, args.duration, args.workers, report_line)
+    if not args.no_save:
+        save_results(report, args.cache)
+        print(f"✅ Saved to {args.cache}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,436 @@
+"""
+Streaming Importer for Legacy Hash Dumps
+Loads `user:hash` and CSV dumps (MD5, SHA-1, SHA-256, SHA-512, bcrypt, Argon2)
+into the users table in batched transactions with resumable checkpoints
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & DEPENDENCIES                               ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import csv
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+from hash_storage import pack_hex, read_storage_mode
+from password_scoring import score_batch, breach_status_for
+from user_shards import insert_sharded, read_shard_count, shard_paths
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+DEFAULT_BATCH_SIZE = 5000
+IMPORT_EMAIL_DOMAIN = 'import.local'
+SPOOL_MAX_MEMORY = 8 << 20     # one-pass uploads larger than this are spooled to disk
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           ALGORITHM DETECTION                                  ║
+# ║  Hash format → algorithm label used in the users.algorithm column             ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+HEX_RE = re.compile(r'^[0-9a-fA-F]+$')
+
+# Hex digest length → (algorithm label, users column holding the raw digest)
+HEX_DIGEST_TYPES = {
+    32: ('MD5', 'hash_md5'),
+    40: ('Raw-SHA1', 'hash_sha1'),
+    64: ('Raw-SHA256', 'hash_sha256'),
+    128: ('Raw-SHA512', 'hash_sha512'),
+}
+
+# Unsalted SHA digests taken verbatim from a dump → registry algorithm. Unlike the
+# SHA* labels of resalted rows they hash the password itself, and with no MD5
+# stored there is nothing to migrate from
+RAW_DIGEST_LABELS = {'Raw-SHA1': 'SHA1', 'Raw-SHA256': 'SHA256', 'Raw-SHA512': 'SHA512'}
+
+def detect_algorithm(hash_value):
+    """
+    Detect the hash algorithm from its format
+
+    Returns:
+        tuple: (algorithm, digest_column) or (None, None) if unrecognised
+    """
+    if hash_value.startswith(('$2a$', '$2b$', '$2y$')) and len(hash_value) == 60:
+        return 'bcrypt', None
+    if hash_value.startswith('$argon2'):
+        return 'Argon2', None
+    if HEX_RE.match(hash_value) and len(hash_value) in HEX_DIGEST_TYPES:
+        return HEX_DIGEST_TYPES[len(hash_value)]
+    return None, None
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           DUMP PARSING                                         ║
+# ║  Line-by-line parsing of `user:hash` and CSV rows                             ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+CSV_HASH_FIELDS = ('hash', 'password_hash', 'passwordhash', 'pass_hash')
+CSV_USER_FIELDS = ('email', 'user', 'username', 'login', 'name')
+CSV_PLAINTEXT_FIELDS = ('password', 'plaintext', 'cracked')
+
+def parse_colon_line(line):
+    """Parse a `user:hash` or cracked `user:hash:password` line"""
+    # bcrypt/argon2 hashes contain `$` but never `:`, so the first two colons
+    # are separators and anything after them is the (optional) plaintext
+    if ':' not in line:
+        return None
+    parts = line.split(':', 2)
+    record = {'user': parts[0].strip(), 'hash': parts[1].strip()}
+    if len(parts) == 3:
+        record['password'] = parts[2]
+    return record
+
+def parse_csv_line(line, header):
+    """Parse a single CSV line using the header mapping (or positional columns)"""
+    fields = next(csv.reader([line]))
+    if header:
+        record = {header[i]: value.strip() for i, value in enumerate(fields) if i < len(header)}
+        hash_value = next((record[f] for f in CSV_HASH_FIELDS if record.get(f)), '')
+        user = next((record[f] for f in CSV_USER_FIELDS if record.get(f)), '')
+        password = next((record[f] for f in CSV_PLAINTEXT_FIELDS if record.get(f)), None)
+        return {
+            'user': user,
+            'hash': hash_value,
+            'name': record.get('name', ''),
+            'email': record.get('email', ''),
+            'password': password
+        }
+    if len(fields) < 2:
+        return None
+    return {'user': fields[0].strip(), 'hash': fields[-1].strip()}
+
+def read_csv_header(line):
+    """Return the lower-cased header fields if the line looks like a CSV header"""
+    fields = [f.strip().lower() for f in next(csv.reader([line]))]
+    if any(f in CSV_HASH_FIELDS for f in fields):
+        return fields
+    return None
+
+def record_to_row(record):
+    """
+    Map a parsed dump record to a users row
+
+    Returns:
+        tuple: row for INSERT plus the plaintext (or None) as a trailing field,
+               or None if the hash format is not recognised
+    """
+    hash_value = record.get('hash', '')
+    algorithm, digest_column = detect_algorithm(hash_value)
+    if not algorithm:
+        return None
+    if digest_column:
+        hash_value = hash_value.lower()
+
+    user = record.get('user', '')
+    email = record.get('email') or (user if '@' in user else '')
+    if not email:
+        if not user:
+            return None
+        email = f"{user}@{IMPORT_EMAIL_DOMAIN}"
+    name = record.get('name') or user.split('@')[0] or email.split('@')[0]
+
+    digests = {'hash_md5': None, 'hash_sha1': None, 'hash_sha256': None, 'hash_sha512': None}
+    if digest_column:
+        digests[digest_column] = hash_value
+
+    return (
+        name, email, algorithm, '', hash_value,
+        digests['hash_md5'], digests['hash_sha1'], digests['hash_sha256'], digests['hash_sha512'],
+        record.get('password') or None
+    )
+
+def iter_dump_rows(stream, start_offset=0, fmt='auto'):
+    """
+    Stream rows out of a binary dump, one line at a time
+
+    Yields:
+        tuple: (byte_offset_after_line, row_or_None)
+    """
+    offset = 0
+    header = None
+    is_csv = fmt == 'csv'
+
+    # The first line decides the format (and may be a CSV header)
+    first = stream.readline()
+    if not first:
+        return
+    offset += len(first)
+    first_text = first.decode('utf-8', errors='replace').strip()
+    if fmt == 'auto':
+        is_csv = ',' in first_text and ':' not in first_text.split(',')[0]
+    if is_csv:
+        header = read_csv_header(first_text)
+
+    # Skip to the checkpoint when resuming
+    if start_offset > offset:
+        if stream.seekable():
+            stream.seek(start_offset)
+        else:
+            remaining = start_offset - offset
+            while remaining > 0:
+                chunk = stream.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+        offset = start_offset
+    elif start_offset == 0 and not header:
+        yield offset, _parse_line(first_text, is_csv, None)
+
+    for raw in iter(stream.readline, b''):
+        offset += len(raw)
+        text = raw.decode('utf-8', errors='replace').strip()
+        if not text or text.startswith('#'):
+            yield offset, None
+            continue
+        yield offset, _parse_line(text, is_csv, header)
+
+def _parse_line(text, is_csv, header):
+    """Parse one text line to a users row (None when skipped)"""
+    if not text or text.startswith('#'):
+        return None
+    record = parse_csv_line(text, header) if is_csv else parse_colon_line(text)
+    return record_to_row(record) if record else None
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           CHECKPOINT STORAGE                                   ║
+# ║  import_checkpoints is committed in the same transaction as each batch       ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def ensure_checkpoint_table(conn):
+    """Create the import checkpoint table if needed"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            job_id TEXT PRIMARY KEY,
+            source TEXT,
+            byte_offset INTEGER DEFAULT 0,
+            lines_read INTEGER DEFAULT 0,
+            rows_imported INTEGER DEFAULT 0,
+            rows_skipped INTEGER DEFAULT 0,
+            completed INTEGER DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+def load_checkpoint(conn, job_id):
+    """Return the stored checkpoint for a job (or None)"""
+    row = conn.execute('''
+        SELECT byte_offset, lines_read, rows_imported, rows_skipped, completed
+        FROM import_checkpoints WHERE job_id = ?
+    ''', (job_id,)).fetchone()
+    if not row:
+        return None
+    return {
+        'byte_offset': row[0],
+        'lines_read': row[1],
+        'rows_imported': row[2],
+        'rows_skipped': row[3],
+        'completed': bool(row[4])
+    }
+
+def save_checkpoint(conn, job_id, source, progress, completed=False):
+    """Upsert the checkpoint (caller commits)"""
+    conn.execute('''
+        INSERT INTO import_checkpoints
+            (job_id, source, byte_offset, lines_read, rows_imported, rows_skipped, completed, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(job_id) DO UPDATE SET
+            byte_offset = excluded.byte_offset,
+            lines_read = excluded.lines_read,
+            rows_imported = excluded.rows_imported,
+            rows_skipped = excluded.rows_skipped,
+            completed = excluded.completed,
+            updated_at = CURRENT_TIMESTAMP
+    ''', (job_id, source, progress['byte_offset'], progress['lines_read'],
+          progress['rows_imported'], progress['rows_skipped'], int(completed)))
+
+def content_job_id(stream):
+    """
+    Derive a stable job id from a dump's content
+
+    Keyed on the bytes rather than name and size, so a different dump of the same
+    size never resumes (or is skipped as) another's job. The stream must be
+    seekable (see spool) and is rewound afterwards.
+    """
+    digest = hashlib.sha1()
+    for chunk in iter(lambda: stream.read(1 << 20), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()[:16]
+
+def spool(stream):
+    """Seekable copy of a one-pass stream (e.g. a raw request body)"""
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    shutil.copyfileobj(stream, spooled, 1 << 20)
+    spooled.seek(0)
+    return spooled
+
+def default_job_id(path):
+    """Derive a stable job id from the dump file's content"""
+    with open(path, 'rb') as stream:
+        return content_job_id(stream)
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           BATCHED IMPORT                                       ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+INSERT_SQL = '''
+    INSERT OR IGNORE INTO users (
+        name, email, algorithm, salt, password_hash,
+        hash_md5, hash_sha1, hash_sha256, hash_sha512,
+        security_score, breach_status, resalt_count
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+'''
+
+# Sharded databases: ids are allocated per shard (see user_shards.allocate_id)
+INSERT_WITH_ID_SQL = '''
+    INSERT OR IGNORE INTO users (
+        id, name, email, algorithm, salt, password_hash,
+        hash_md5, hash_sha1, hash_sha256, hash_sha512,
+        security_score, breach_status, resalt_count
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+'''
+
+def score_rows(rows):
+    """
+    Replace each row's trailing plaintext with (security_score, breach_status)
+
+    Plaintexts from cracked dumps are scored in one vectorized batch and then
+    dropped; rows without one keep score 0 / UNKNOWN.
+    """
+    plaintexts = [row[9] for row in rows if row[9] is not None]
+    scores = iter(score_batch(plaintexts))
+    scored = []
+    for row in rows:
+        if row[9] is None:
+            scored.append(row[:9] + (0, 'UNKNOWN'))
+        else:
+            score = next(scores)
+            scored.append(row[:9] + (score, breach_status_for(score)))
+    return scored
+
+def import_stream(conn, stream, job_id, source='', batch_size=DEFAULT_BATCH_SIZE,
+                  fmt='auto', resume=True, progress_callback=None, encode=None,
+                  shard_conns=None):
+    """
+    Import a binary dump stream into users
+
+    Each batch is inserted with executemany and committed together with the
+    checkpoint, so an interrupted import resumes at the last committed line.
+    Re-running a batch is harmless: rows whose email already exists are ignored.
+    Rows carrying a plaintext are scored (see score_rows); plaintext is never stored.
+    `encode` converts hex digests to the storage representation (see hash_storage).
+    `shard_conns` (one connection per shard, shard_conns[0] being `conn`) routes
+    rows to their owning shard; shard 0 is committed last, so a batch replayed
+    after a crash only meets rows that are ignored by email.
+
+    Returns:
+        dict: progress counters for the job
+    """
+    ensure_checkpoint_table(conn)
+    conn.commit()
+
+    checkpoint = load_checkpoint(conn, job_id) if resume else None
+    if checkpoint and checkpoint['completed']:
+        checkpoint['resumed'] = True
+        return checkpoint
+
+    progress = {'byte_offset': 0, 'lines_read': 0, 'rows_imported': 0, 'rows_skipped': 0}
+    if checkpoint:
+        progress.update({k: checkpoint[k] for k in progress})
+
+    started = time.time()
+    batch = []
+    skipped_in_batch = 0
+    offset = progress['byte_offset']
+
+    def flush():
+        if shard_conns and len(shard_conns) > 1:
+            inserted = insert_sharded(shard_conns, INSERT_WITH_ID_SQL, score_rows(batch))
+        else:
+            cursor = conn.cursor()
+            cursor.executemany(INSERT_SQL, score_rows(batch))
+            # rowcount, unlike total_changes, ignores rows written by the FTS triggers
+            inserted = max(cursor.rowcount, 0)
+        progress['rows_imported'] += inserted
+        progress['rows_skipped'] += skipped_in_batch + (len(batch) - inserted)
+        progress['byte_offset'] = offset
+        save_checkpoint(conn, job_id, source, progress)
+        conn.commit()
+        if progress_callback:
+            progress_callback(dict(progress, elapsed=time.time() - started))
+
+    for offset, row in iter_dump_rows(stream, progress['byte_offset'], fmt):
+        progress['lines_read'] += 1
+        if row is None:
+            skipped_in_batch += 1
+        elif encode:
+            batch.append(row[:4] + tuple(encode(v) for v in row[4:9]) + row[9:])
+        else:
+            batch.append(row)
+        if len(batch) + skipped_in_batch >= batch_size:
+            flush()
+            batch = []
+            skipped_in_batch = 0
+
+    flush()
+    save_checkpoint(conn, job_id, source, progress, completed=True)
+    conn.commit()
+
+    progress['completed'] = True
+    progress['resumed'] = checkpoint is not None
+    progress['elapsed'] = round(time.time() - started, 3)
+    return progress
+
+def import_file(db_path, path, job_id=None, batch_size=DEFAULT_BATCH_SIZE,
+                fmt='auto', resume=True, progress_callback=None):
+    """Import a dump file from disk (see import_stream)"""
+    job_id = job_id or default_job_id(path)
+    conn = sqlite3.connect(db_path)
+    shard_conns = [conn] + [sqlite3.connect(p, timeout=30)
+                            for p in shard_paths(db_path, read_shard_count(conn))[1:]]
+    try:
+        encode = pack_hex if read_storage_mode(conn) == 'blob' else None
+        with open(path, 'rb') as stream:
+            result = import_stream(conn, stream, job_id, os.path.abspath(path),
+                                   batch_size, fmt, resume, progress_callback, encode,
+                                   shard_conns)
+    finally:
+        for shard_conn in shard_conns:
+            shard_conn.close()
+    result['jobId'] = job_id
+    return result
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python hash_importer.py dump.txt [--db database.db] [--batch-size 5000]      ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import legacy hash dumps into the users table')
+    parser.add_argument('dump', help='Path to a user:hash or CSV dump')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database path')
+    parser.add_argument('--job-id', help='Checkpoint key (defaults to a hash of path and size)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--format', choices=['auto', 'colon', 'csv'], default='auto')
+    parser.add_argument('--restart', action='store_true', help='Ignore any stored checkpoint')
+    args = parser.parse_args(argv)
+
+    def report(progress):
+        rate = progress['lines_read'] / progress['elapsed'] if progress['elapsed'] else 0
+        print(f"📥 {progress['lines_read']:,} lines | {progress['rows_imported']:,} imported | "
+              f"{progress['rows_skipped']:,} skipped | {rate:,.0f} lines/s", file=sys.stderr)
+
+    result = import_file(args.db, args.dump, args.job_id, args.batch_size,
+                         args.format, not args.restart, report)
+    print(f"✅ Import {result['jobId']} complete: {result['rows_imported']:,} users imported, "
+          f"{result['rows_skipped']:,} skipped")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
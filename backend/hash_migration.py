@@ -0,0 +1,427 @@
+"""
+Checkpointed Hash Migration Runs
+Convert every user matching a filter (e.g. algorithm MD5) to a new algorithm,
+walking users in id order, one committed chunk (plus checkpoint) at a time
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import hashlib
+import itertools
+import json
+import sqlite3
+import threading
+import time
+
+from hash_importer import RAW_DIGEST_LABELS
+from hash_storage import unpack_hex
+from row_versioning import update_with_retry, ContentionCounter, UPDATED, SKIPPED, CONFLICT
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 10000
+
+# Columns each chunk reads (the filter columns are re-checked after a CAS conflict)
+ROW_COLUMNS = ('algorithm', 'password_hash', 'hash_md5', 'breach_status', 'security_score')
+
+# Filter keys accepted by a run (same meaning as the /api/users/search filters)
+FILTER_KEYS = ('algorithm', 'breach_status', 'min_score', 'max_score')
+
+# pending → running → completed | paused | failed; a run found 'running' at
+# start-up lost its thread in a restart and is marked 'interrupted'
+RESUMABLE_STATES = ('pending', 'paused', 'interrupted', 'failed')
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           RUN STORAGE                                          ║
+# ║  migration_runs holds each run's definition and checkpoint; the checkpoint   ║
+# ║  is committed in the same transaction as the chunk it describes              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def ensure_runs_table(conn):
+    """Create the migration run table if needed"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS migration_runs (
+            run_id TEXT PRIMARY KEY,
+            target_algorithm TEXT NOT NULL,
+            salt_length INTEGER NOT NULL,
+            chunk_size INTEGER NOT NULL,
+            filters TEXT NOT NULL,
+            last_id INTEGER DEFAULT 0,
+            converted INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            skipped INTEGER DEFAULT 0,
+            total INTEGER DEFAULT 0,
+            elapsed REAL DEFAULT 0,
+            state TEXT DEFAULT 'pending',
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    # Tables created before skipped rows were counted get the column added
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(migration_runs)')]
+    if 'skipped' not in columns:
+        conn.execute('ALTER TABLE migration_runs ADD COLUMN skipped INTEGER DEFAULT 0')
+
+def mark_interrupted(conn):
+    """Flag runs left 'running' by a previous process; returns how many (caller commits)"""
+    ensure_runs_table(conn)
+    return conn.execute('''
+        UPDATE migration_runs SET state = 'interrupted', updated_at = CURRENT_TIMESTAMP
+        WHERE state = 'running'
+    ''').rowcount
+
+RUN_COLUMNS = ('run_id', 'target_algorithm', 'salt_length', 'chunk_size', 'filters', 'last_id',
+               'converted', 'failed', 'skipped', 'total', 'elapsed', 'state', 'last_error', 'created_at', 'updated_at')
+
+def load_run(conn, run_id):
+    """Stored run as a dict (filters decoded), or None"""
+    row = conn.execute(f"SELECT {', '.join(RUN_COLUMNS)} FROM migration_runs WHERE run_id = ?",
+                       (run_id,)).fetchone()
+    if not row:
+        return None
+    run = dict(zip(RUN_COLUMNS, tuple(row)))
+    run['filters'] = json.loads(run['filters'])
+    return run
+
+def list_runs(conn, limit=20):
+    """Most recently updated runs first"""
+    ids = conn.execute('SELECT run_id FROM migration_runs ORDER BY updated_at DESC, rowid DESC LIMIT ?',
+                       (limit,)).fetchall()
+    return [load_run(conn, row[0]) for row in ids]
+
+def normalize_filters(filters):
+    """
+    Validate a filter dict; list values are kept as sorted lists
+
+    Raises:
+        ValueError: on unknown keys, an empty filter or non-integer scores
+    """
+    filters = filters or {}
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown filter keys: {', '.join(sorted(unknown))} (use {', '.join(FILTER_KEYS)})")
+    normalized = {}
+    for key in ('algorithm', 'breach_status'):
+        values = filters.get(key)
+        if values:
+            values = [values] if isinstance(values, str) else list(values)
+            normalized[key] = sorted(str(v) for v in values)
+    for key in ('min_score', 'max_score'):
+        if filters.get(key) is not None:
+            try:
+                normalized[key] = int(filters[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be an integer")
+    if not normalized:
+        raise ValueError('A migration run needs at least one filter (e.g. {"algorithm": ["MD5"]})')
+    return normalized
+
+def default_run_id(target_algorithm, salt_length, filters):
+    """Stable id for a migration definition, so re-submitting it resumes the same run"""
+    key = json.dumps([target_algorithm.upper(), salt_length, filters], sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+def create_run(conn, run_id, target_algorithm, salt_length, chunk_size, filters):
+    """Insert a new pending run (caller commits) and return its stored record"""
+    conn.execute('''
+        INSERT INTO migration_runs (run_id, target_algorithm, salt_length, chunk_size, filters)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (run_id, target_algorithm, salt_length, chunk_size, json.dumps(filters, sort_keys=True)))
+    return load_run(conn, run_id)
+
+def base_hash(row):
+    """
+    Hash a migration re-salts: the MD5 digest when stored (as /api/hash-migration/convert does)
+
+    None for imported raw SHA digests without one: wrapping the SHA digest would
+    leave a hash no password verifies against.
+    """
+    if row['hash_md5']:
+        return unpack_hex(row['hash_md5'])
+    if row['algorithm'] in RAW_DIGEST_LABELS:
+        return None
+    return unpack_hex(row['password_hash'])
+
+def filter_sql(filters, target_label):
+    """
+    WHERE clause (without the id cursor) selecting rows still to convert
+
+    Rows already labelled with the target algorithm never match, so replaying
+    a chunk (or the whole run) cannot convert anyone twice; neither do rows
+    with no base hash.
+    """
+    where, params = ['algorithm IS NOT ?'], [target_label]
+    # Imported raw digests without an MD5 cannot be converted (see base_hash)
+    where.append(f"NOT (algorithm IN ({', '.join('?' * len(RAW_DIGEST_LABELS))}) AND hash_md5 IS NULL)")
+    params.extend(RAW_DIGEST_LABELS)
+    for key, column in (('algorithm', 'algorithm'), ('breach_status', 'breach_status')):
+        if key in filters:
+            where.append(f"{column} IN ({', '.join('?' * len(filters[key]))})")
+            params.extend(filters[key])
+    if 'min_score' in filters:
+        where.append('security_score >= ?')
+        params.append(filters['min_score'])
+    if 'max_score' in filters:
+        where.append('security_score <= ?')
+        params.append(filters['max_score'])
+    return ' AND '.join(where), params
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           MIGRATION RUN                                        ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class MigrationRun:
+    """One migration run; status() is safe to call from other threads"""
+
+    def __init__(self, db_path, record, convert, encode=None, counter=None, pool=None):
+        """
+        Args:
+            record: stored run (see load_run / create_run)
+            convert: (base_hash, salt_length, target_algorithm) → (new_hash, new_salt)
+            encode: hex → storage representation for the new hash and salt
+            counter: ContentionCounter shared with the other row writers
+            pool: optional executor that hashes each chunk in parallel (convert
+                  must then be picklable, i.e. a module-level function)
+        """
+        self.db_path = db_path
+        self.record = record
+        self.convert = convert
+        self.encode = encode or (lambda value: value)
+        self.counter = counter or ContentionCounter()
+        self.pool = pool
+        self.target_label = record['target_algorithm'].upper()
+        self.pause_event = threading.Event()
+        self.state = record['state']
+        self.session_started = None
+        self.session_rows = 0
+        self._lock = threading.Lock()
+
+    def pause(self):
+        """Stop after the chunk in progress has been committed"""
+        self.pause_event.set()
+
+    def _save(self, conn, **fields):
+        """Update the stored record and the in-memory copy (caller commits)"""
+        with self._lock:
+            self.record.update(fields, updated_at=time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()))
+        assignments = ', '.join(f"{key} = ?" for key in fields)
+        conn.execute(f'''
+            UPDATE migration_runs SET {assignments}, updated_at = CURRENT_TIMESTAMP
+            WHERE run_id = ?
+        ''', (*fields.values(), self.record['run_id']))
+
+    def _matches(self, row):
+        """Whether a (re-read) row still belongs to this run"""
+        filters = self.record['filters']
+        score = row['security_score']
+        return (row['algorithm'] != self.target_label
+                and base_hash(row) is not None
+                and row['algorithm'] in filters.get('algorithm', [row['algorithm']])
+                and row['breach_status'] in filters.get('breach_status', [row['breach_status']])
+                and ('min_score' not in filters or (score is not None and score >= filters['min_score']))
+                and ('max_score' not in filters or (score is not None and score <= filters['max_score'])))
+
+    def _precompute(self, rows, salt_length, target):
+        """Hash the chunk's matching rows on the pool → {id: (row_version, (new_hash, new_salt))}"""
+        pending = [row for row in rows if self._matches(row)]
+        if not pending:
+            return {}
+        results = self.pool.map(self.convert, [base_hash(row) for row in pending],
+                                itertools.repeat(salt_length), itertools.repeat(target),
+                                chunksize=max(1, len(pending) // 32))
+        return {row['id']: (row['row_version'], result) for row, result in zip(pending, results)}
+
+    def _convert_chunk(self, conn, rows):
+        """
+        Convert one chunk; returns (converted, failed, skipped, last_error)
+
+        Rows a concurrent writer took out of the filter (or deleted) are skipped.
+        """
+        converted, failed, skipped, last_error = 0, 0, 0, None
+        salt_length = self.record['salt_length']
+        target = self.record['target_algorithm']
+        precomputed = self._precompute(rows, salt_length, target) if self.pool else {}
+
+        def converted_values(row, row_id):
+            if not self._matches(row):
+                return None
+            # A hash computed on the pool is only valid for the row version it was read at;
+            # rows re-read after a conflict are converted again here
+            version, result = precomputed.get(row_id, (None, None))
+            if version != row['row_version']:
+                result = self.convert(base_hash(row), salt_length, target)
+            new_hash, new_salt = result
+            return {'algorithm': self.target_label, 'password_hash': self.encode(new_hash),
+                    'salt': self.encode(new_salt)}
+
+        for row in rows:
+            try:
+                # Compare-and-swap on row_version; a concurrent resalt makes the
+                # row re-read (and re-checked against the filter) before retrying
+                status, _ = update_with_retry(conn, row['id'], ROW_COLUMNS,
+                                              lambda current, row_id=row['id']: converted_values(current, row_id),
+                                              self.counter, 'migration-run', row=row)
+                if status == UPDATED:
+                    converted += 1
+                elif status == CONFLICT:
+                    failed += 1
+                    last_error = f"user {row['id']}: concurrent updates (retries exhausted)"
+                elif status == SKIPPED:
+                    skipped += 1
+            except Exception as e:
+                failed += 1
+                last_error = f"user {row['id']}: {e}"
+        return converted, failed, skipped, last_error
+
+    def _total(self, conn):
+        """Rows already done plus the rows still matching after the checkpoint"""
+        where, params = filter_sql(self.record['filters'], self.target_label)
+        remaining = conn.execute(f'SELECT COUNT(*) FROM users WHERE id > ? AND {where}',
+                                 (self.record['last_id'], *params)).fetchone()[0]
+        return self.record['converted'] + self.record['failed'] + self.record['skipped'] + remaining
+
+    def count_total(self):
+        """Store the run total without converting anything (see ShardedMigrationRun)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            self._save(conn, total=self._total(conn))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def run(self, progress_callback=None):
+        """Convert from the checkpoint until no matching rows remain or pause()"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            where, params = filter_sql(self.record['filters'], self.target_label)
+            self.session_started = time.time()
+            elapsed_before = self.record['elapsed']
+            self.state = 'running'
+            self._save(conn, state='running', total=self._total(conn))
+            conn.commit()
+
+            while not self.pause_event.is_set():
+                rows = conn.execute(f'''
+                    SELECT id, {', '.join(ROW_COLUMNS)}, row_version FROM users
+                    WHERE id > ? AND {where}
+                    ORDER BY id LIMIT ?
+                ''', (self.record['last_id'], *params, self.record['chunk_size'])).fetchall()
+                if not rows:
+                    break
+                converted, failed, skipped, last_error = self._convert_chunk(conn, rows)
+                self.session_rows += len(rows)
+                # Chunk and checkpoint commit together: a crash replays at most this chunk
+                self._save(conn, last_id=rows[-1]['id'],
+                           converted=self.record['converted'] + converted,
+                           failed=self.record['failed'] + failed,
+                           skipped=self.record['skipped'] + skipped,
+                           last_error=last_error or self.record['last_error'],
+                           elapsed=elapsed_before + time.time() - self.session_started)
+                conn.commit()
+                if progress_callback:
+                    progress_callback(self.status())
+
+            self.state = 'paused' if self.pause_event.is_set() else 'completed'
+            self._save(conn, state=self.state, elapsed=elapsed_before + time.time() - self.session_started)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            self.state = 'failed'
+            self._save(conn, state='failed', last_error=str(e))
+            conn.commit()
+        finally:
+            conn.close()
+        return self.status()
+
+    def status(self):
+        """Progress, throughput over this session and ETA"""
+        with self._lock:
+            record = dict(self.record)
+        done = record['converted'] + record['failed'] + record['skipped']
+        remaining = max(record['total'] - done, 0)
+        running = self.state == 'running' and self.session_started
+        rate = self.session_rows / (time.time() - self.session_started) if running else 0
+        return {
+            'runId': record['run_id'],
+            'state': self.state,
+            'targetAlgorithm': record['target_algorithm'],
+            'saltLength': record['salt_length'],
+            'chunkSize': record['chunk_size'],
+            'filters': record['filters'],
+            'checkpoint': record['last_id'],
+            'converted': record['converted'],
+            'failed': record['failed'],
+            'skipped': record['skipped'],
+            'total': record['total'],
+            'remaining': remaining,
+            'percent': round(done / record['total'] * 100, 2) if record['total'] else 0,
+            'rowsPerSec': round(rate, 2),
+            'etaSeconds': round(remaining / rate, 1) if rate else None,
+            'elapsed': round(record['elapsed'], 3),
+            'lastError': record['last_error'],
+            'updatedAt': record['updated_at']
+        }
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SHARDED RUNS                                         ║
+# ║  Each user shard keeps its own record and checkpoint for a run id; the      ║
+# ║  shards are converted one after the other and reported as one run           ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def combined_state(states):
+    """One state for a run's shards: the first unfinished shard's, failed and running first"""
+    for state in ('running', 'failed'):
+        if state in states:
+            return state
+    return next((state for state in states if state != 'completed'), 'completed')
+
+class ShardedMigrationRun:
+    """A MigrationRun per user shard, run in shard order under one run id"""
+
+    def __init__(self, runs):
+        self.runs = runs
+        self.record = runs[0].record
+        self.state = combined_state([run.state for run in runs])
+
+    def pause(self):
+        """Stop after the current shard's chunk in progress has been committed"""
+        for run in self.runs:
+            run.pause()
+
+    def run(self, progress_callback=None):
+        """Run every unfinished shard from its checkpoint; stops at a pause or a failed shard"""
+        self.state = 'running'
+        # Totals up front, so the combined percent does not jump as later shards start
+        pending = [run for run in self.runs if run.state != 'completed']
+        for run in pending:
+            try:
+                run.count_total()
+            except sqlite3.Error:
+                pass  # run() counts again and records the error if it persists
+        for run in pending:
+            run.run(progress_callback=progress_callback and (lambda status: progress_callback(self.status())))
+            if run.state != 'completed':
+                break
+        self.state = combined_state([run.state for run in self.runs])
+        return self.status()
+
+    def status(self):
+        """MigrationRun.status summed over the shards (per-shard detail under `shards`)"""
+        shards = [run.status() for run in self.runs]
+        if len(shards) == 1:
+            return dict(shards[0], state=self.state)
+        current = next((s for s in shards if s['state'] != 'completed'), shards[-1])
+        status = dict(current, state=self.state)
+        for key in ('converted', 'failed', 'skipped', 'total', 'remaining', 'rowsPerSec', 'elapsed'):
+            status[key] = round(sum(s[key] for s in shards), 3)
+        done = status['converted'] + status['failed'] + status['skipped']
+        status['percent'] = round(done / status['total'] * 100, 2) if status['total'] else 0
+        status['etaSeconds'] = (round(status['remaining'] / status['rowsPerSec'], 1)
+                                if status['rowsPerSec'] else None)
+        status['lastError'] = next((s['lastError'] for s in shards if s['lastError']), None)
+        status['updatedAt'] = max(s['updatedAt'] or '' for s in shards) or None
+        status['shards'] = shards
+        return status
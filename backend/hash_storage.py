@@ -0,0 +1,216 @@
+"""
+Binary Hash Storage
+Optional storage mode that keeps fixed-length digests and salts as raw BLOBs
+(half the size of hex TEXT) while API code keeps seeing hex strings
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+
+STORAGE_MODES = ('text', 'blob')
+HASH_COLUMNS = ('salt', 'password_hash', 'hash_md5', 'hash_sha1', 'hash_sha256', 'hash_sha512')
+HASH_TABLES = ('users', 'demo_users')
+MIGRATION_CHUNK = 5000
+
+# Only lowercase hex round-trips exactly (bytes.hex() is lowercase)
+LOWER_HEX_RE = re.compile(r'^(?:[0-9a-f]{2})+$')
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           VALUE CONVERSION                                     ║
+# ║  bcrypt/Argon2 strings and empty salts always stay TEXT                       ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def pack_hex(value):
+    """Lowercase hex digest/salt → raw bytes (anything else is returned unchanged)"""
+    if isinstance(value, str) and LOWER_HEX_RE.match(value):
+        return bytes.fromhex(value)
+    return value
+
+def unpack_hex(value):
+    """Raw bytes → lowercase hex (anything else is returned unchanged)"""
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+def hex_row_factory(cursor, row):
+    """sqlite3.Row factory that presents BLOB digests as hex strings"""
+    return sqlite3.Row(cursor, tuple(v.hex() if isinstance(v, bytes) else v for v in row))
+
+def hex_sql(column):
+    """SQL expression yielding the hex form of a (possibly BLOB) column"""
+    return f"(CASE WHEN typeof({column}) = 'blob' THEN lower(hex({column})) ELSE {column} END)"
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           STORAGE MODE SETTING                                 ║
+# ║  Persisted per database in app_settings so every process agrees              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def ensure_settings_table(conn):
+    """Create the key/value settings table if needed"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS app_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+def read_storage_mode(conn, default='text'):
+    """Return the hash storage mode recorded in the database"""
+    ensure_settings_table(conn)
+    row = conn.execute("SELECT value FROM app_settings WHERE key = 'hash_storage'").fetchone()
+    return row[0] if row else default
+
+def write_storage_mode(conn, mode):
+    """Record the hash storage mode (caller commits)"""
+    ensure_settings_table(conn)
+    conn.execute('''
+        INSERT INTO app_settings (key, value) VALUES ('hash_storage', ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    ''', (mode,))
+
+def create_hex_views(conn):
+    """Views exposing every hash column as hex TEXT regardless of storage mode"""
+    for table in HASH_TABLES:
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        select = ', '.join(f"{hex_sql(c)} AS {c}" if c in HASH_COLUMNS else c for c in columns)
+        conn.execute(f'DROP VIEW IF EXISTS {table}_hex')
+        conn.execute(f'CREATE VIEW {table}_hex AS SELECT {select} FROM {table}')
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           MIGRATION                                            ║
+# ║  Rewrites hash columns in id-ordered chunks, one transaction per chunk        ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def migrate_table(conn, table, mode, chunk=MIGRATION_CHUNK):
+    """Convert one table's hash columns to `mode`; returns rows rewritten"""
+    convert = pack_hex if mode == 'blob' else unpack_hex
+    columns = ', '.join(HASH_COLUMNS)
+    assignments = ', '.join(f"{c} = ?" for c in HASH_COLUMNS)
+    last_id = 0
+    rewritten = 0
+    while True:
+        rows = conn.execute(f'''
+            SELECT id, {columns} FROM {table}
+            WHERE id > ? ORDER BY id LIMIT ?
+        ''', (last_id, chunk)).fetchall()
+        if not rows:
+            break
+        updates = []
+        for row in rows:
+            converted = [convert(v) for v in row[1:]]
+            if converted != list(row[1:]):
+                updates.append((*converted, row[0]))
+        conn.executemany(f'UPDATE {table} SET {assignments} WHERE id = ?', updates)
+        conn.commit()
+        rewritten += len(updates)
+        last_id = rows[-1][0]
+    return rewritten
+
+def migrate_database(db_path, mode, vacuum=True):
+    """
+    Convert an existing database to the given storage mode
+
+    Returns:
+        dict: rows rewritten per table and file size before/after
+    """
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"mode must be one of {STORAGE_MODES}")
+    size_before = os.path.getsize(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        # Record the mode first: rows already converted are readable either way
+        write_storage_mode(conn, mode)
+        conn.commit()
+        result = {table: migrate_table(conn, table, mode) for table in HASH_TABLES}
+        create_hex_views(conn)
+        conn.commit()
+        if vacuum:
+            conn.execute('VACUUM')
+    finally:
+        conn.close()
+    result['sizeBefore'] = size_before
+    result['sizeAfter'] = os.path.getsize(db_path)
+    return result
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           MEASUREMENT                                          ║
+# ║  Compare file size and full-scan speed of TEXT vs BLOB copies                 ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def time_scans(db_path, repeat=5):
+    """Time full scans that compare and group digests (ms per scan)"""
+    conn = sqlite3.connect(db_path)
+    probe = conn.execute('SELECT hash_sha512 FROM users WHERE hash_sha512 IS NOT NULL LIMIT 1').fetchone()
+    probe = probe[0] if probe else None
+    queries = {
+        'lookup_sha512': ('SELECT COUNT(*) FROM users WHERE hash_sha512 = ?', (probe,)),
+        'group_password_hash': ('SELECT COUNT(*) FROM (SELECT password_hash FROM users GROUP BY password_hash)', ()),
+        'read_all_hashes': (f"SELECT {', '.join(HASH_COLUMNS)} FROM users", ()),
+    }
+    timings = {}
+    for name, (sql, params) in queries.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql, params).fetchall()
+        timings[name] = round((time.perf_counter() - start) * 1000 / repeat, 2)
+    conn.close()
+    return timings
+
+def measure(db_path, repeat=5):
+    """Copy the database, migrate the copies to text and blob and compare"""
+    workdir = tempfile.mkdtemp()
+    report = {}
+    for mode in STORAGE_MODES:
+        copy = os.path.join(workdir, f'{mode}.db')
+        shutil.copyfile(db_path, copy)
+        migrate_database(copy, mode)
+        report[mode] = {'bytes': os.path.getsize(copy), 'scanMs': time_scans(copy, repeat)}
+    shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python hash_storage.py migrate --to blob | measure                           ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hash column storage mode tools')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database path')
+    sub = parser.add_subparsers(dest='command', required=True)
+    migrate_cmd = sub.add_parser('migrate', help='Convert hash columns to TEXT or BLOB')
+    migrate_cmd.add_argument('--to', choices=STORAGE_MODES, required=True)
+    migrate_cmd.add_argument('--no-vacuum', action='store_true')
+    measure_cmd = sub.add_parser('measure', help='Compare size and scan speed of both modes')
+    measure_cmd.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == 'migrate':
+        result = migrate_database(args.db, args.to, vacuum=not args.no_vacuum)
+        print(f"✅ Migrated to {args.to}: users={result['users']:,} demo_users={result['demo_users']:,} rows rewritten")
+        print(f"   Size: {result['sizeBefore']:,} → {result['sizeAfter']:,} bytes")
+        return 0
+
+    report = measure(args.db, args.repeat)
+    text, blob = report['text'], report['blob']
+    print(f"{'':<22}{'text':>12}{'blob':>12}{'saving':>9}")
+    print(f"{'file bytes':<22}{text['bytes']:>12,}{blob['bytes']:>12,}{1 - blob['bytes'] / text['bytes']:>9.0%}")
+    for name, text_ms in text['scanMs'].items():
+        blob_ms = blob['scanMs'][name]
+        saving = 1 - blob_ms / text_ms if text_ms else 0
+        print(f"{name + ' (ms)':<22}{text_ms:>12.2f}{blob_ms:>12.2f}{saving:>9.0%}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
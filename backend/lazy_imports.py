@@ -0,0 +1,52 @@
+"""
+Lazy Imports
+Heavy optional dependencies (numpy, requests, bcrypt, argon2) are located at
+import time but loaded on first use, so CLI tools, tests and worker forks that
+never hash or score anything skip their import cost
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import importlib
+import importlib.util
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           AVAILABILITY & DEFERRED MODULES                      ║
+# ║  available() only searches sys.path (no module code runs); LazyModule        ║
+# ║  imports on the first attribute access, under Python's per-module import    ║
+# ║  lock, so concurrent first uses from request threads load it once            ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def available(name):
+    """True when the top-level package `name` is installed (without importing it)"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+class LazyModule:
+    """Stand-in for a module that imports it the first time an attribute is read"""
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            self.__dict__['_module'] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
@@ -0,0 +1,342 @@
+"""
+Closed-Loop Load Generator
+Simulated clients (one thread and keep-alive connection each) send a weighted
+request mix to the backend on localhost and wait for every response before the
+next request. Reports p50/p95/p99/max latency, error rate and throughput per
+route, per-second timelines, and the saturation knee over a concurrency ramp
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import random
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_URL = 'http://127.0.0.1:5000'
+DEFAULT_DURATION = 10           # seconds per stage
+DEFAULT_CONCURRENCY = '10'
+REQUEST_TIMEOUT = 30
+
+# Knee: the first stage whose throughput gain over the previous stage is below
+# KNEE_MIN_GAIN while p95 grows by KNEE_LATENCY_GROWTH or more (or errors exceed
+# KNEE_MAX_ERROR_RATE); the previous stage is the last efficient concurrency
+KNEE_MIN_GAIN = 0.10
+KNEE_LATENCY_GROWTH = 1.5
+KNEE_MAX_ERROR_RATE = 0.01
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           REQUESTS & SCENARIOS                                 ║
+# ║  A request builder returns (method, path, JSON body or None); a scenario is  ║
+# ║  a weighted mix of route names                                               ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+LOAD_PASSWORDS = ('Welcome2024!', 'Company123', 'password', 'Tr0ub4dor&3Xtr4!', 'Summer2024!', 'qwerty')
+
+def _register(client):
+    client.counter += 1
+    return 'POST', '/api/register', {
+        'name': f"Load Client {client.index}",
+        'email': f"load-{client.run_id}-{client.index}-{client.counter}@loadtest.local",
+        'password': random.choice(LOAD_PASSWORDS)
+    }
+
+def _verify(client):
+    # No login route: a salted Argon2id hash costs the same as verifying a login
+    return 'POST', '/api/hash', {'password': random.choice(LOAD_PASSWORDS), 'salt': client.salt}
+
+ROUTES = {
+    'register': _register,
+    'verify': _verify,
+    'users': lambda client: ('GET', '/api/users', None),
+    'demo-users': lambda client: ('GET', '/api/demo-users', None),
+    'stats': lambda client: ('GET', '/api/stats', None),
+    'audit-duplicates': lambda client: ('GET', '/api/audit/duplicate-passwords', None),
+    'audit-weak': lambda client: ('GET', '/api/audit/weak-passwords', None),
+    'audit-breached': lambda client: ('GET', '/api/audit/breached-passwords', None),
+    'audit-distribution': lambda client: ('GET', '/api/audit/hash-distribution', None),
+    'health': lambda client: ('GET', '/api/health', None),
+}
+
+SCENARIOS = {
+    'browse': {'users': 4, 'stats': 2, 'audit-duplicates': 1, 'audit-weak': 1,
+               'audit-breached': 1, 'audit-distribution': 1},
+    'signup': {'register': 1},
+    'login': {'verify': 1},
+    'audit': {'audit-duplicates': 1, 'audit-weak': 1, 'audit-breached': 1, 'audit-distribution': 1},
+    'mixed': {'users': 4, 'verify': 3, 'register': 1, 'stats': 1, 'audit-duplicates': 1,
+              'audit-weak': 1, 'audit-breached': 1},
+}
+
+def parse_mix(text):
+    """'users=5,register=1' → {'users': 5.0, 'register': 1.0} (raises ValueError)"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in ROUTES:
+            raise ValueError(f"Unknown route {name!r} (choose from {', '.join(ROUTES)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError('Request mix is empty')
+    return mix
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           STATISTICS                                           ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def summarize(latencies, errors, elapsed):
+    """Latency percentiles (ms), error rate and throughput for one route or stage"""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        'requests': count,
+        'errors': errors,
+        'errorRate': round(errors / count, 4) if count else 0,
+        'throughput': round(count / elapsed, 2) if elapsed else 0,
+        'p50': round(percentile(ordered, 0.50), 2),
+        'p95': round(percentile(ordered, 0.95), 2),
+        'p99': round(percentile(ordered, 0.99), 2),
+        'max': round(ordered[-1], 2) if ordered else 0
+    }
+
+class Recorder:
+    """Thread-safe samples: (route, second since stage start, latency ms, error)"""
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def add(self, route, second, latency_ms, error):
+        with self._lock:
+            self.samples.append((route, second, latency_ms, error))
+
+    def report(self, elapsed):
+        """Per-route summaries, an overall summary and a per-second timeline"""
+        by_route, by_second = {}, {}
+        for route, second, latency, error in self.samples:
+            entry = by_route.setdefault(route, ([], [0]))
+            entry[0].append(latency)
+            entry[1][0] += error
+            bucket = by_second.setdefault(second, {}).setdefault(route, ([], [0]))
+            bucket[0].append(latency)
+            bucket[1][0] += error
+        routes = {route: summarize(lat, err[0], elapsed) for route, (lat, err) in sorted(by_route.items())}
+        overall = summarize([s[2] for s in self.samples], sum(s[3] for s in self.samples), elapsed)
+        timeline = [{
+            'second': second,
+            'routes': {route: summarize(lat, err[0], 1) for route, (lat, err) in sorted(routes_.items())}
+        } for second, routes_ in sorted(by_second.items())]
+        return {'overall': overall, 'routes': routes, 'timeline': timeline}
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           CLOSED-LOOP CLIENTS                                  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class Client(threading.Thread):
+    """One simulated user: send, wait for the response, think, repeat"""
+
+    def __init__(self, index, run_id, url, mix, recorder, started, deadline, think_time):
+        super().__init__(daemon=True)
+        self.index = index
+        self.run_id = run_id
+        self.counter = 0
+        self.salt = secrets.token_hex(16)
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.routes, self.weights = zip(*mix.items())
+        self.recorder = recorder
+        self.started = started
+        self.deadline = deadline
+        self.think_time = think_time
+        self.conn = None
+
+    def _send(self, method, path, body):
+        """Status code of one request (reconnects once on a dropped keep-alive connection)"""
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+        for attempt in (1, 2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+            try:
+                self.conn.request(method, path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                response.read()
+                return response.status
+            except (http.client.HTTPException, ConnectionError):
+                self.conn.close()
+                self.conn = None
+                if attempt == 2:
+                    raise
+
+    def run(self):
+        while True:
+            now = time.perf_counter()
+            if now >= self.deadline:
+                break
+            route = random.choices(self.routes, self.weights)[0]
+            method, path, body = ROUTES[route](self)
+            sent = time.perf_counter()
+            try:
+                error = self._send(method, path, body) >= 400
+            except OSError:
+                error = True
+            done = time.perf_counter()
+            self.recorder.add(route, int(sent - self.started), (done - sent) * 1000, int(error))
+            if self.think_time:
+                time.sleep(random.uniform(0, 2 * self.think_time))
+        if self.conn:
+            self.conn.close()
+
+def run_stage(url, mix, concurrency, duration, think_time=0.0):
+    """Run `concurrency` closed-loop clients for `duration` seconds"""
+    recorder = Recorder()
+    run_id = secrets.token_hex(3)
+    started = time.perf_counter()
+    deadline = started + duration
+    clients = [Client(i, run_id, url, mix, recorder, started, deadline, think_time) for i in range(concurrency)]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - started
+    result = recorder.report(elapsed)
+    result['concurrency'] = concurrency
+    result['elapsed'] = round(elapsed, 2)
+    return result
+
+def find_knee(stages, min_gain=KNEE_MIN_GAIN, latency_growth=KNEE_LATENCY_GROWTH,
+              max_error_rate=KNEE_MAX_ERROR_RATE):
+    """
+    Saturation knee of a concurrency ramp
+
+    Returns:
+        dict: the last efficient concurrency and why the next stage was not, or None
+    """
+    for previous, stage in zip(stages, stages[1:]):
+        before, after = previous['overall'], stage['overall']
+        gain = (after['throughput'] - before['throughput']) / before['throughput'] if before['throughput'] else 0
+        growth = after['p95'] / before['p95'] if before['p95'] else 0
+        if after['errorRate'] > max_error_rate:
+            reason = f"error rate {after['errorRate']:.1%} at {stage['concurrency']} clients"
+        elif gain < min_gain and growth >= latency_growth:
+            reason = (f"throughput +{gain:.0%} while p95 ×{growth:.1f} "
+                      f"going from {previous['concurrency']} to {stage['concurrency']} clients")
+        else:
+            continue
+        return {'concurrency': previous['concurrency'], 'throughput': before['throughput'],
+                'p95': before['p95'], 'reason': reason}
+    return None
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IN-PROCESS SERVER (--serve)                          ║
+# ║  Threaded WSGI server on an ephemeral port with a temporary database; the   ║
+# ║  clients share its GIL, so absolute numbers are lower than a separate server ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def serve_backend(seed_users=0, hibp=False):
+    """Start the app on 127.0.0.1:<free port>; returns (url, server)"""
+    from werkzeug.serving import make_server
+    import app as backend
+    from demo_data_generator import generate_users
+
+    backend.DB_PATH = os.path.join(tempfile.mkdtemp(), 'loadtest.db')
+    backend.init_db()
+    if not hibp:
+        # Load runs must not hammer the HIBP API; (None, 0) is the app's own "check skipped"
+        backend.check_password_pwned = lambda password: (None, 0)
+    if seed_users:
+        import sqlite3
+        conn = sqlite3.connect(backend.DB_PATH)
+        try:
+            generate_users(conn, seed_users, cheap=True)
+        finally:
+            conn.close()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)     # no per-request access log
+    server = make_server('127.0.0.1', 0, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python load_test.py --scenario mixed --concurrency 10,50,100,200,400        ║
+# ║  python load_test.py --serve --seed-users 10000 --mix users=5,verify=1       ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def print_stage(stage):
+    overall = stage['overall']
+    print(f"\n👥 {stage['concurrency']} clients, {stage['elapsed']}s: {overall['requests']:,} requests, "
+          f"{overall['throughput']:,.1f} req/s, {overall['errorRate']:.2%} errors")
+    print(f"   {'route':<20} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for route, summary in stage['routes'].items():
+        print(f"   {route:<20} {summary['throughput']:>8,.1f} {summary['errorRate']:>7.1%} {summary['p50']:>8.1f} "
+              f"{summary['p95']:>8.1f} {summary['p99']:>8.1f} {summary['max']:>8.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Closed-loop load test against the backend')
+    parser.add_argument('--url', default=DEFAULT_URL, help='Backend base URL')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='mixed')
+    parser.add_argument('--mix', default=None, help="Route weights, e.g. 'users=5,verify=2,register=1'")
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY,
+                        help='Clients, or a comma-separated ramp (one stage each), e.g. 10,50,100,200')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION, help='Seconds per stage')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between requests (s)')
+    parser.add_argument('--serve', action='store_true', help='Start the app in-process on a temporary database')
+    parser.add_argument('--seed-users', type=int, default=0, help='Synthetic users to create with --serve')
+    parser.add_argument('--hibp', action='store_true', help='Keep the live HIBP check with --serve')
+    parser.add_argument('--json', default=None, help='Write the full report (with timelines) here')
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix) if args.mix else SCENARIOS[args.scenario]
+        ramp = [int(n) for n in args.concurrency.split(',')]
+    except ValueError as e:
+        parser.error(str(e))
+    if any(n < 1 for n in ramp):
+        parser.error('concurrency must be positive')
+
+    url = args.url
+    if args.serve:
+        url, _ = serve_backend(args.seed_users, args.hibp)
+    print(f"🎯 {url} | mix {', '.join(f'{k}={v:g}' for k, v in mix.items())} | "
+          f"stages {ramp} × {args.duration}s")
+
+    stages = []
+    for concurrency in ramp:
+        stage = run_stage(url, mix, concurrency, args.duration, args.think_time)
+        stages.append(stage)
+        print_stage(stage)
+
+    knee = find_knee(stages) if len(stages) > 1 else None
+    if len(stages) > 1:
+        print("\n📈 Ramp: " + " → ".join(f"{s['concurrency']}: {s['overall']['throughput']:,.0f} req/s "
+                                       f"(p95 {s['overall']['p95']:.0f} ms)" for s in stages))
+        if knee:
+            print(f"🔺 Saturation knee at {knee['concurrency']} clients: {knee['reason']}")
+        else:
+            print("✅ No saturation knee within the ramp")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as handle:
+            json.dump({'url': url, 'mix': mix, 'stages': stages, 'knee': knee}, handle, indent=2)
+        print(f"💾 Report written to {args.json}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
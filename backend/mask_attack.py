@@ -0,0 +1,322 @@
+"""
+Mask Attack Simulator
+Bounded hashcat-style mask attack (?l?l?l?l?d?d ...) against the unsalted MD5
+hashes in demo_users, with the keyspace split across a process pool
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import concurrent.futures
+import hashlib
+import itertools
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+
+# hashcat built-in charsets
+MASK_CHARSETS = {
+    'l': b'abcdefghijklmnopqrstuvwxyz',
+    'u': b'ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+    'd': b'0123456789',
+    's': b' !"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~',
+}
+MASK_CHARSETS['a'] = MASK_CHARSETS['l'] + MASK_CHARSETS['u'] + MASK_CHARSETS['d'] + MASK_CHARSETS['s']
+
+# load_targets only finds unsalted MD5 digests (demo_users stores no SHA columns)
+ATTACK_ALGORITHMS = ('md5',)
+
+# The last mask positions are expanded into a precomputed suffix list of at most this many entries
+TAIL_MAX = 65536
+
+# Candidates per pool job (~0.5 s on one core): small enough to stop promptly on budget/cancel
+JOB_CANDIDATES = 500000
+
+DEFAULT_TIME_BUDGET = 30
+MAX_WORKERS = os.cpu_count() or 1
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           MASK PARSING & KEYSPACE                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def parse_mask(mask):
+    """
+    Mask → list of per-position alphabets (each a list of byte strings)
+
+    ?l ?u ?d ?s ?a are charsets, ?? is a literal '?', anything else is literal.
+    Raises ValueError for unknown placeholders.
+    """
+    positions = []
+    i = 0
+    while i < len(mask):
+        ch = mask[i]
+        if ch == '?':
+            if i + 1 >= len(mask):
+                raise ValueError("Mask ends with a bare '?'")
+            key = mask[i + 1]
+            if key == '?':
+                positions.append([b'?'])
+            elif key in MASK_CHARSETS:
+                positions.append([bytes([b]) for b in MASK_CHARSETS[key]])
+            else:
+                raise ValueError(f"Unknown mask charset ?{key}")
+            i += 2
+        else:
+            positions.append([ch.encode('utf-8')])
+            i += 1
+    if not positions:
+        raise ValueError('Mask is empty')
+    return positions
+
+def keyspace(positions):
+    """Number of candidates a mask produces"""
+    total = 1
+    for alphabet in positions:
+        total *= len(alphabet)
+    return total
+
+def split_positions(positions):
+    """(head, tail) split: tail = longest suffix whose expansion stays ≤ TAIL_MAX"""
+    tail_size = 1
+    split = len(positions)
+    while split > 0 and tail_size * len(positions[split - 1]) <= TAIL_MAX:
+        split -= 1
+        tail_size *= len(positions[split])
+    return positions[:split], positions[split:]
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           WORKER                                               ║
+# ║  Each job covers a range of head indices; for each head every precomputed    ║
+# ║  tail is appended, hashed and looked up in the target set                     ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+_worker = {}
+
+def _init_worker(positions, targets, algorithm):
+    """Pool initializer: per-process state shipped once instead of per job"""
+    head, tail = split_positions(positions)
+    _worker['head'] = head
+    _worker['tails'] = [b''.join(parts) for parts in itertools.product(*tail)]
+    _worker['targets'] = frozenset(targets)
+    _worker['hash'] = getattr(hashlib, algorithm)
+
+def _head_bytes(index, head):
+    """Mixed-radix decode of a head index (last head position varies fastest)"""
+    parts = []
+    for alphabet in reversed(head):
+        index, digit = divmod(index, len(alphabet))
+        parts.append(alphabet[digit])
+    return b''.join(reversed(parts))
+
+def _crack_range(job):
+    """Worker entry point: job = (first_head, last_head_exclusive)"""
+    start, end = job
+    head, tails, targets, hash_fn = _worker['head'], _worker['tails'], _worker['targets'], _worker['hash']
+    hits = []
+    for index in range(start, end):
+        prefix = _head_bytes(index, head)
+        for tail in tails:
+            candidate = prefix + tail
+            if hash_fn(candidate).digest() in targets:
+                hits.append(candidate)
+    return (end - start) * len(tails), hits
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           ATTACK CONTROLLER                                    ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class MaskAttack:
+    """One bounded attack run; status() is safe to call from other threads"""
+
+    def __init__(self, mask, targets, algorithm='md5', time_budget=DEFAULT_TIME_BUDGET, workers=None):
+        """
+        Args:
+            mask: hashcat-style mask
+            targets: dict of raw digest (bytes) → list of labels (e.g. emails)
+            time_budget: seconds before the run stops
+            workers: processes (defaults to every core)
+        """
+        if algorithm not in ATTACK_ALGORITHMS:
+            raise ValueError(f"algorithm must be one of {', '.join(ATTACK_ALGORITHMS)}")
+        self.mask = mask
+        self.positions = parse_mask(mask)
+        self.algorithm = algorithm
+        self.targets = targets
+        self.time_budget = time_budget
+        self.workers = max(1, min(workers or MAX_WORKERS, MAX_WORKERS))
+        self.keyspace = keyspace(self.positions)
+        head, tail = split_positions(self.positions)
+        self.head_count = keyspace(head)
+        self.tail_count = keyspace(tail)
+        self.cancel_event = threading.Event()
+        self.state = 'pending'
+        self.tested = 0
+        self.found = {}
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _jobs(self):
+        heads_per_job = max(1, JOB_CANDIDATES // self.tail_count)
+        for start in range(0, self.head_count, heads_per_job):
+            yield start, min(start + heads_per_job, self.head_count)
+
+    def _record(self, tested, hits):
+        digest_of = getattr(hashlib, self.algorithm)
+        with self._lock:
+            self.tested += tested
+            for candidate in hits:
+                self.found[digest_of(candidate).digest()] = candidate.decode('utf-8', errors='replace')
+
+    def _stop_reason(self):
+        if self.cancel_event.is_set():
+            return 'cancelled'
+        if len(self.found) >= len(self.targets):
+            return 'complete'
+        if time.time() - self.started >= self.time_budget:
+            return 'timeout'
+        return None
+
+    def run(self, progress_callback=None):
+        """Run until the keyspace is exhausted, every target is cracked, the budget runs out or cancel()"""
+        self.started = time.time()
+        self.state = 'running'
+        jobs = self._jobs()
+        reason = None
+        if not self.targets:
+            reason = 'complete'
+        elif self.workers == 1 or self.keyspace <= JOB_CANDIDATES:
+            # Inline: no process start-up cost for small demos or single-core hosts
+            _init_worker(self.positions, self.targets.keys(), self.algorithm)
+            for job in jobs:
+                self._record(*_crack_range(job))
+                if progress_callback:
+                    progress_callback(self.status())
+                reason = self._stop_reason()
+                if reason:
+                    break
+        else:
+            pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self.positions, list(self.targets), self.algorithm))
+            try:
+                pending = set()
+                exhausted = False
+                while True:
+                    # Keep two jobs per worker in flight
+                    while not exhausted and not reason and len(pending) < self.workers * 2:
+                        job = next(jobs, None)
+                        if job is None:
+                            exhausted = True
+                        else:
+                            pending.add(pool.submit(_crack_range, job))
+                    if not pending:
+                        break
+                    done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._record(*future.result())
+                    if done and progress_callback:
+                        progress_callback(self.status())
+                    reason = reason or self._stop_reason()
+                    if reason:
+                        for future in pending:
+                            future.cancel()
+                        break
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self.finished = time.time()
+        self.state = reason or 'exhausted'
+        return self.status()
+
+    def status(self):
+        """Progress snapshot (JSON-serialisable)"""
+        with self._lock:
+            tested = self.tested
+            found = dict(self.found)
+        elapsed = ((self.finished or time.time()) - self.started) if self.started else 0
+        return {
+            'mask': self.mask,
+            'algorithm': self.algorithm,
+            'state': self.state,
+            'workers': self.workers,
+            'keyspace': self.keyspace,
+            'tested': tested,
+            'progress': round(tested / self.keyspace, 6),
+            'hashesPerSec': round(tested / elapsed) if elapsed else 0,
+            'elapsed': round(elapsed, 2),
+            'timeBudget': self.time_budget,
+            'targets': len(self.targets),
+            'cracked': [{'users': self.targets[digest], 'password': password}
+                        for digest, password in found.items()]
+        }
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           TARGETS                                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def load_targets(conn):
+    """Unsalted MD5 password_hash values of demo_users: raw digest → [emails]"""
+    targets = {}
+    rows = conn.execute('''
+        SELECT email, password_hash FROM demo_users
+        WHERE algorithm = 'MD5' AND (salt IS NULL OR salt = '')
+    ''')
+    for email, value in rows:
+        if isinstance(value, str):
+            try:
+                value = bytes.fromhex(value)
+            except ValueError:
+                continue
+        if isinstance(value, bytes) and len(value) == 16:
+            targets.setdefault(value, []).append(email)
+    return targets
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python mask_attack.py 'password?d?d' [--budget 30] [--workers 4]             ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mask attack demo against demo_users MD5 hashes')
+    parser.add_argument('mask', help="hashcat-style mask, e.g. 'password?d?d' or '?l?l?l?l?d?d'")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database path')
+    parser.add_argument('--budget', type=float, default=DEFAULT_TIME_BUDGET, help='Time budget in seconds')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        targets = load_targets(conn)
+    finally:
+        conn.close()
+    attack = MaskAttack(args.mask, targets, time_budget=args.budget, workers=args.workers)
+    print(f"🎯 {len(targets)} unsalted MD5 targets, keyspace {attack.keyspace:,}, {attack.workers} worker(s)")
+
+    def report(status):
+        print(f"\r⚡ {status['progress']:7.2%} | {status['hashesPerSec']:>12,} H/s | "
+              f"{len(status['cracked'])}/{status['targets']} cracked", end='', file=sys.stderr)
+
+    try:
+        status = attack.run(report)
+    except KeyboardInterrupt:
+        attack.cancel()
+        status = attack.status()
+    print(file=sys.stderr)
+    for hit in status['cracked']:
+        print(f"🔓 {hit['password']:<20} {', '.join(hit['users'])}")
+    print(f"✅ {status['state']}: {status['tested']:,} candidates in {status['elapsed']}s "
+          f"({status['hashesPerSec']:,} H/s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
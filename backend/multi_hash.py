@@ -0,0 +1,96 @@
+"""
+Multi-Hash Engine
+Computes several hashlib digests of each input in a single pass over its bytes,
+fanning large batches out to a thread pool (hashlib releases the GIL on big buffers)
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_ALGORITHMS = ('md5', 'sha1', 'sha256', 'sha512')
+SUPPORTED_ALGORITHMS = ('md5', 'sha1', 'sha224', 'sha256', 'sha384', 'sha512',
+                        'sha3_256', 'sha3_512', 'blake2b', 'blake2s')
+
+# Inputs are fed to every hasher in chunks of this size, so each chunk is
+# still in cache when the next hasher reads it
+CHUNK_SIZE = 256 * 1024
+
+# hashlib only drops the GIL for buffers above ~2 KB; below this many bytes
+# in total a thread pool costs more than it saves
+PARALLEL_MIN_BYTES = 1024 * 1024
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+_executor = None
+
+def get_executor():
+    """Shared thread pool for large batches (created on first use)"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='multi-hash')
+    return _executor
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SINGLE-PASS DIGESTS                                  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def normalize_algorithms(algorithms):
+    """Validate and de-duplicate algorithm names (raises ValueError)"""
+    if not algorithms:
+        return DEFAULT_ALGORITHMS
+    names = []
+    for name in algorithms:
+        key = str(name).lower().replace('-', '')
+        key = {'sha3256': 'sha3_256', 'sha3512': 'sha3_512'}.get(key, key)
+        if key not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported algorithm: {name}")
+        if key not in names:
+            names.append(key)
+    return tuple(names)
+
+def compute_digests(data, algorithms=DEFAULT_ALGORITHMS):
+    """
+    Hash one input with every requested algorithm
+
+    Args:
+        data: str (encoded once as UTF-8) or bytes
+        algorithms: iterable of hashlib names (already normalized)
+
+    Returns:
+        dict: algorithm → hex digest
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    hashers = [(name, hashlib.new(name)) for name in algorithms]
+    view = memoryview(data)
+    for offset in range(0, len(view), CHUNK_SIZE):
+        chunk = view[offset:offset + CHUNK_SIZE]
+        for _, hasher in hashers:
+            hasher.update(chunk)
+    return {name: hasher.hexdigest() for name, hasher in hashers}
+
+def compute_batch(inputs, algorithms=DEFAULT_ALGORITHMS):
+    """
+    Hash a list of inputs, in order
+
+    Large batches (by total bytes) are split across the thread pool; small
+    ones run inline because thread hand-off would dominate.
+    """
+    encoded = [item.encode('utf-8') if isinstance(item, str) else item for item in inputs]
+    total_bytes = sum(len(item) for item in encoded)
+    if total_bytes < PARALLEL_MIN_BYTES or len(encoded) < 2 or MAX_WORKERS < 2:
+        return [compute_digests(item, algorithms) for item in encoded]
+
+    # Contiguous slices keep per-task overhead low and preserve order on join
+    slice_size = max(1, len(encoded) // (MAX_WORKERS * 4))
+    slices = [encoded[i:i + slice_size] for i in range(0, len(encoded), slice_size)]
+    futures = [get_executor().submit(lambda part: [compute_digests(item, algorithms) for item in part], part)
+               for part in slices]
+    results = []
+    for future in futures:
+        results.extend(future.result())
+    return results
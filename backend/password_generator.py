@@ -0,0 +1,206 @@
+"""
+Bulk CSPRNG Password Generator
+Draws large secrets.token_bytes buffers and maps them onto the charset with
+rejection sampling (bytes.translate drops out-of-range bytes in C, so there is
+no modulo bias and no per-character Python loop)
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import math
+import os
+import secrets
+from array import array
+
+# Same character sets as js/password-generator.js
+UPPERCASE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+LOWERCASE = 'abcdefghijklmnopqrstuvwxyz'
+NUMBERS = '0123456789'
+SYMBOLS = '!@#$%^&*()_+-=[]{}|;:,.<>?'
+SIMILAR = '0O1lI'
+AMBIGUOUS = '{}[]()/\\\'"`~,;:.<>'
+CONSONANTS = 'bcdfghjklmnpqrstvwxyz'
+VOWELS = 'aeiou'
+CLEAN_SYMBOLS = '!@#$%&*'
+
+MODES = ('random', 'pronounceable', 'passphrase')
+MIN_LENGTH, MAX_LENGTH = 4, 128
+MIN_WORDS, MAX_WORDS = 3, 12
+
+# Passwords generated per buffer draw when streaming
+GENERATE_CHUNK = 1024
+
+# Optional wordlist for passphrases (one word per line; EFF "12345<TAB>word" lines work too)
+PASSPHRASE_WORDLIST = os.environ.get('PASSPHRASE_WORDLIST', '')
+
+# Built-in list: 256 short common words = exactly 8 bits per word
+DEFAULT_WORDS = '''
+able acid aged also area army away baby back ball band bank base bath bear beat
+bell belt best bird blow blue boat body bone book boot born boss both bowl bulk
+burn bush busy cake call calm camp card care cart case cash cast cell chef chip
+city clay club coal coat code cold cook cool cope copy core corn cost crew crop
+dark data date dawn deal dear deep deer desk dial diet dish disk dock door dose
+down draw drop drum duck dust duty each earn ease east easy edge else even ever
+exit face fact fair fall farm fast fear feel fern file film find fine fire firm
+fish five flag flat flow folk food foot fork form fort four free frog fuel full
+fund gain game gate gear gift girl glad glow goal goat gold golf good grab gray
+grid grow gulf hair half hall hand hard harp hawk head heat held help herb hero
+high hill hold hole home hook hope horn host hour huge hunt idea inch iron item
+jazz join joke jump jury keen keep kind king kite knee knot lake lamp land lane
+last lava lawn lead leaf lean left lens life lift like lime line link lion list
+live load loan lock loft long look loop lord loud love luck lung made mail main
+make mall many mark mask mass meal meat mild milk mill mind mint miss mode moon
+more moss most move much mule myth nail name navy near neck nest news next nice
+'''.split()
+
+def load_wordlist(path):
+    """Read a passphrase wordlist, de-duplicated in file order"""
+    words = []
+    seen = set()
+    with open(path, encoding='utf-8') as handle:
+        for line in handle:
+            parts = line.split()
+            if not parts:
+                continue
+            word = parts[-1].strip()
+            if word and word not in seen:
+                seen.add(word)
+                words.append(word)
+    return words
+
+_wordlist = None
+
+def get_wordlist():
+    """Passphrase words (PASSPHRASE_WORDLIST if set, else the built-in list)"""
+    global _wordlist
+    if _wordlist is None:
+        words = load_wordlist(PASSPHRASE_WORDLIST) if PASSPHRASE_WORDLIST else list(DEFAULT_WORDS)
+        _wordlist = words[:65536]   # sample_indices draws 16-bit values
+    return _wordlist
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           UNBIASED SAMPLING                                    ║
+# ║  Bytes ≥ 256 - (256 mod n) are rejected so every symbol is equally likely    ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+_tables = {}
+
+def _byte_table(alphabet):
+    """(translate table, rejected bytes, acceptance rate) for a bytes alphabet of ≤ 256 symbols"""
+    if alphabet not in _tables:
+        n = len(alphabet)
+        limit = 256 - (256 % n)
+        table = bytes(alphabet[b % n] if b < limit else 0 for b in range(256))
+        _tables[alphabet] = (table, bytes(range(limit, 256)), limit / 256)
+    return _tables[alphabet]
+
+def sample_bytes(alphabet, count):
+    """`count` uniformly random symbols from a bytes alphabet"""
+    table, rejected, acceptance = _byte_table(alphabet)
+    out = b''
+    while len(out) < count:
+        need = count - len(out)
+        # Over-draw slightly so a second round is rare
+        buf = secrets.token_bytes(int(need / acceptance * 1.05) + 16)
+        out += buf.translate(table, rejected)
+    return out[:count]
+
+def sample_chars(alphabet, count):
+    """`count` uniformly random characters from an ASCII alphabet"""
+    return sample_bytes(alphabet.encode('ascii'), count).decode('ascii')
+
+def sample_indices(n, count):
+    """`count` uniformly random integers in [0, n) for n up to 65536"""
+    if n <= 256:
+        return list(sample_bytes(bytes(range(n)), count))
+    limit = 65536 - (65536 % n)
+    values = []
+    while len(values) < count:
+        draw = array('H', secrets.token_bytes(2 * (int((count - len(values)) * 65536 / limit) + 8)))
+        values.extend(v % n for v in draw if v < limit)
+    return values[:count]
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           PASSWORD MODES                                       ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def build_charset(uppercase=True, lowercase=True, numbers=True, symbols=True,
+                  exclude_similar=False, exclude_ambiguous=False):
+    """Character set for random mode (raises ValueError if empty)"""
+    charset = ((UPPERCASE if uppercase else '') + (LOWERCASE if lowercase else '')
+               + (NUMBERS if numbers else '') + (SYMBOLS if symbols else ''))
+    if exclude_similar:
+        charset = ''.join(c for c in charset if c not in SIMILAR)
+    if exclude_ambiguous:
+        charset = ''.join(c for c in charset if c not in AMBIGUOUS)
+    if not charset:
+        raise ValueError('Select at least one character type')
+    return charset
+
+def random_passwords(count, length, charset):
+    """`count` passwords of `length` characters drawn uniformly from charset"""
+    chars = sample_chars(charset, count * length)
+    return [chars[i:i + length] for i in range(0, count * length, length)]
+
+def pronounceable_passwords(count, length, numbers=True, symbols=True):
+    """Consonant/vowel alternation, capitalised, with optional 2 digits and a symbol (as the UI does)"""
+    n_cons, n_vowels = (length + 1) // 2, length // 2
+    cons = sample_chars(CONSONANTS, count * n_cons)
+    vowels = sample_chars(VOWELS, count * n_vowels)
+    digits = sample_chars(NUMBERS, count * 2) if numbers else ''
+    marks = sample_chars(CLEAN_SYMBOLS, count) if symbols else ''
+    passwords = []
+    for i in range(count):
+        c = cons[i * n_cons:(i + 1) * n_cons]
+        v = vowels[i * n_vowels:(i + 1) * n_vowels]
+        word = ''.join(a + b for a, b in zip(c, v)) + c[n_vowels:]
+        password = word[:1].upper() + word[1:]
+        if numbers:
+            password += digits[i * 2:i * 2 + 2]
+        if symbols:
+            password += marks[i]
+        passwords.append(password)
+    return passwords
+
+def passphrases(count, words=5, separator='-', capitalize=False):
+    """`count` passphrases of `words` words from the wordlist"""
+    wordlist = get_wordlist()
+    indices = sample_indices(len(wordlist), count * words)
+    phrases = []
+    for i in range(count):
+        chosen = [wordlist[j] for j in indices[i * words:(i + 1) * words]]
+        if capitalize:
+            chosen = [w.capitalize() for w in chosen]
+        phrases.append(separator.join(chosen))
+    return phrases
+
+def entropy_bits(mode, length=16, charset='', numbers=True, symbols=True, words=5):
+    """Entropy of one generated password (bits), from the generator's choices"""
+    if mode == 'random':
+        return length * math.log2(len(charset))
+    if mode == 'pronounceable':
+        bits = (length + 1) // 2 * math.log2(len(CONSONANTS)) + length // 2 * math.log2(len(VOWELS))
+        return bits + (2 * math.log2(10) if numbers else 0) + (math.log2(len(CLEAN_SYMBOLS)) if symbols else 0)
+    return words * math.log2(len(get_wordlist()))
+
+def generate(count, mode='random', length=16, charset=None, numbers=True, symbols=True,
+             words=5, separator='-', capitalize=False, chunk=GENERATE_CHUNK):
+    """
+    Yield lists of generated passwords, `chunk` at a time
+
+    Chunking keeps memory flat for very large counts and lets callers stream.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {', '.join(MODES)}")
+    remaining = count
+    while remaining > 0:
+        n = min(chunk, remaining)
+        if mode == 'random':
+            yield random_passwords(n, length, charset)
+        elif mode == 'pronounceable':
+            yield pronounceable_passwords(n, length, numbers, symbols)
+        else:
+            yield passphrases(n, words, separator, capitalize)
+        remaining -= n
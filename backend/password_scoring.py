@@ -0,0 +1,281 @@
+"""
+Server-Side Password Scoring Engine
+Batch port of calculateSecurityScore (index.html) and analyzePasswordStrength
+(js/password-strength.js) using vectorized character-class tables
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ║  NumPy is optional - without it the same rules run per password in Python    ║
+# ║  It is loaded by the first batch large enough to be vectorized               ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import sys
+
+from lazy_imports import LazyModule, available
+from user_shards import read_shard_count, shard_paths, sum_counts
+
+NUMPY_AVAILABLE = available('numpy')
+np = LazyModule('numpy')
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+
+# Passwords per vectorized chunk (chunk matrix is n × longest password × 4 bytes)
+SCORE_CHUNK = 8192
+RESCORE_CHUNK = 5000
+
+# Smaller batches (single registrations, short /api/score calls) are faster in
+# plain Python than building the arrays, and never pay NumPy's import
+NUMPY_MIN_BATCH = 24
+
+CLASS_LOWER, CLASS_UPPER, CLASS_DIGIT, CLASS_SYMBOL = 1, 2, 4, 8
+CHARSET_SIZES = {CLASS_LOWER: 26, CLASS_UPPER: 26, CLASS_DIGIT: 10, CLASS_SYMBOL: 32}
+COMMON_PREFIX_RE = re.compile(r'^(password|123456|qwerty)', re.IGNORECASE)
+REPEAT_RE = re.compile(r'(.)\1{2,}')
+
+def char_class(code):
+    """Character class bit for a code point (ASCII letters/digits, everything else is a symbol)"""
+    if 97 <= code <= 122:
+        return CLASS_LOWER
+    if 65 <= code <= 90:
+        return CLASS_UPPER
+    if 48 <= code <= 57:
+        return CLASS_DIGIT
+    return CLASS_SYMBOL
+
+_class_table = None
+
+def class_table():
+    """Lookup table for code points 0-127; index 128 stands for any non-ASCII code point"""
+    global _class_table
+    if _class_table is None:
+        _class_table = np.array([char_class(c) for c in range(128)] + [CLASS_SYMBOL], dtype=np.uint8)
+    return _class_table
+
+PAD = 0xFFFFFFFF    # above the Unicode range, never a real character
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SCORING RULES                                        ║
+# ║  Length 0-40, variety 0-40, unique-character bonus 0-20, then penalties      ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def _analyze_python(passwords):
+    """Reference implementation, one password at a time"""
+    scores, lengths, charsets, entropies = [], [], [], []
+    for password in passwords:
+        length = len(password)
+        flags = 0
+        for ch in password:
+            flags |= char_class(ord(ch))
+        charset = sum(size for bit, size in CHARSET_SIZES.items() if flags & bit)
+
+        score = 20 * (length >= 8) + 10 * (length >= 12) + 10 * (length >= 16)
+        score += 10 * sum(1 for bit in CHARSET_SIZES if flags & bit)
+        score += min(20, len(set(password)) * 2)
+        if REPEAT_RE.search(password):
+            score -= 10
+        if length and flags == CLASS_DIGIT:
+            score -= 20
+        if COMMON_PREFIX_RE.match(password):
+            score -= 30
+
+        scores.append(max(0, min(100, score)))
+        lengths.append(length)
+        charsets.append(charset)
+        entropies.append(length * math.log2(charset or 1))
+    return scores, lengths, charsets, entropies
+
+def _analyze_numpy(passwords):
+    """Vectorized implementation over a padded code-point matrix"""
+    n = len(passwords)
+    lengths = np.fromiter((len(p) for p in passwords), dtype=np.int64, count=n)
+    width = max(int(lengths.max()), 1)
+
+    # One UTF-32 encode for the whole chunk, padded to the longest password
+    padded = ''.join(p.ljust(width, '\0') for p in passwords).encode('utf-32-le')
+    codes = np.frombuffer(padded, dtype='<u4').reshape(n, width)
+    valid = np.arange(width) < lengths[:, None]
+
+    classes = class_table()[np.minimum(codes, 128)]
+    classes[~valid] = 0
+    flags = np.bitwise_or.reduce(classes, axis=1)
+    has = {bit: (flags & bit) != 0 for bit in CHARSET_SIZES}
+    charsets = sum(has[bit] * size for bit, size in CHARSET_SIZES.items())
+
+    # Distinct characters: sort each row, count value changes (padding sorts last)
+    pad = np.uint32(PAD)
+    ordered = np.sort(np.where(valid, codes, pad), axis=1)
+    changes = (ordered[:, 1:] != ordered[:, :-1]) & (ordered[:, 1:] != pad)
+    unique = (lengths > 0) + changes.sum(axis=1)
+
+    # Three identical characters in a row
+    if width >= 3:
+        repeated = ((codes[:, 2:] == codes[:, 1:-1]) & (codes[:, 1:-1] == codes[:, :-2])
+                    & valid[:, 2:]).any(axis=1)
+    else:
+        repeated = np.zeros(n, dtype=bool)
+    only_digits = (lengths > 0) & (flags == CLASS_DIGIT)
+    common = np.fromiter((COMMON_PREFIX_RE.match(p) is not None for p in passwords), dtype=bool, count=n)
+
+    scores = (20 * (lengths >= 8) + 10 * (lengths >= 12) + 10 * (lengths >= 16)
+              + 10 * sum(has.values())
+              + np.minimum(20, unique * 2)
+              - 10 * repeated - 20 * only_digits - 30 * common)
+    scores = np.clip(scores, 0, 100)
+    entropies = lengths * np.log2(np.maximum(charsets, 1))
+    return scores.tolist(), lengths.tolist(), charsets.tolist(), entropies.tolist()
+
+def analyze_batch(passwords):
+    """
+    Score a batch of passwords
+
+    Returns:
+        list of dict: score (0-100), length, charsetSize, entropy (bits)
+    """
+    results = []
+    for start in range(0, len(passwords), SCORE_CHUNK):
+        chunk = passwords[start:start + SCORE_CHUNK]
+        analyze = _analyze_numpy if NUMPY_AVAILABLE and len(chunk) >= NUMPY_MIN_BATCH else _analyze_python
+        for score, length, charset, entropy in zip(*analyze(chunk)):
+            results.append({
+                'score': int(score),
+                'length': int(length),
+                'charsetSize': int(charset),
+                'entropy': round(float(entropy), 2)
+            })
+    return results
+
+def score_batch(passwords):
+    """Scores only (0-100) for a batch of passwords"""
+    return [result['score'] for result in analyze_batch(passwords)]
+
+def score_password(password):
+    """Score a single password"""
+    return analyze_batch([password])[0]
+
+def breach_status_for(score, current_status=None):
+    """WEAK/SECURE from a score; BREACHED is never downgraded"""
+    if current_status == 'BREACHED':
+        return current_status
+    return 'WEAK' if score < 50 else 'SECURE'
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           RESCORING JOB                                        ║
+# ║  Stored rows have no plaintext; candidates (e.g. a cracked list) are matched  ║
+# ║  through the unsalted hash_md5/hash_sha1/hash_sha256 columns                  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def build_candidate_index(passwords):
+    """digest → password for the unsalted digest columns"""
+    index = {}
+    for password in passwords:
+        data = password.encode('utf-8')
+        index[hashlib.md5(data).hexdigest()] = password
+        index[hashlib.sha1(data).hexdigest()] = password
+        index[hashlib.sha256(data).hexdigest()] = password
+    return index
+
+def _hex(value):
+    return value.hex() if isinstance(value, bytes) else value
+
+def rescore_users(conn, candidates, chunk=RESCORE_CHUNK, dry_run=False):
+    """
+    Recompute security_score for users whose password is among `candidates`
+
+    Walks users in id order (keyset pagination) and commits one UPDATE batch per chunk.
+
+    Returns:
+        dict: scanned, matched and changed row counts
+    """
+    index = build_candidate_index(candidates)
+    last_id = 0
+    stats = {'scanned': 0, 'matched': 0, 'changed': 0}
+    while True:
+        rows = conn.execute('''
+            SELECT id, hash_md5, hash_sha1, hash_sha256, password_hash, algorithm,
+                   security_score, breach_status
+            FROM users WHERE id > ? ORDER BY id LIMIT ?
+        ''', (last_id, chunk)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        stats['scanned'] += len(rows)
+
+        matched = []
+        for row in rows:
+            digests = [_hex(row[1]), _hex(row[2]), _hex(row[3])]
+            if row[5] == 'MD5':
+                digests.append(_hex(row[4]))
+            password = next((index[d] for d in digests if d and d in index), None)
+            if password is not None:
+                matched.append((row, password))
+        stats['matched'] += len(matched)
+
+        scores = score_batch([password for _, password in matched])
+        updates = []
+        for (row, _), score in zip(matched, scores):
+            status = breach_status_for(score, row[7])
+            if score != row[6] or status != row[7]:
+                updates.append((score, status, row[0]))
+        stats['changed'] += len(updates)
+        if updates and not dry_run:
+            conn.executemany('UPDATE users SET security_score = ?, breach_status = ? WHERE id = ?', updates)
+            conn.commit()
+    return stats
+
+def read_candidates(path):
+    """Plaintext candidates from a file (one password per line, or user:password)"""
+    with open(path, encoding='utf-8', errors='replace') as handle:
+        for line in handle:
+            line = line.rstrip('\r\n')
+            if line:
+                yield line
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python password_scoring.py score <pw>... | rescore --passwords file          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Server-side password scoring')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database path')
+    sub = parser.add_subparsers(dest='command', required=True)
+    score_cmd = sub.add_parser('score', help='Score passwords given on the command line')
+    score_cmd.add_argument('passwords', nargs='+')
+    rescore_cmd = sub.add_parser('rescore', help='Rescore stored users from a plaintext candidate list')
+    rescore_cmd.add_argument('--passwords', required=True, help='File with one candidate password per line')
+    rescore_cmd.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.command == 'score':
+        for password, result in zip(args.passwords, analyze_batch(args.passwords)):
+            print(f"{result['score']:>3}/100  {result['entropy']:>6.1f} bits  {password}")
+        return 0
+
+    candidates = list(read_candidates(args.passwords))
+    conn = sqlite3.connect(args.db)
+    try:
+        paths = shard_paths(args.db, read_shard_count(conn))
+    finally:
+        conn.close()
+    # Every user shard is rescored (database.shard<i>.db next to --db)
+    results = []
+    for path in paths:
+        conn = sqlite3.connect(path)
+        try:
+            results.append(rescore_users(conn, candidates, dry_run=args.dry_run))
+        finally:
+            conn.close()
+    stats = sum_counts(results)
+    print(f"✅ Rescored: {stats['scanned']:,} scanned, {stats['matched']:,} matched, "
+          f"{stats['changed']:,} {'would change' if args.dry_run else 'updated'}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
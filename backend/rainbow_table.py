@@ -0,0 +1,385 @@
+"""
+Rainbow Table Engine
+Time-memory tradeoff demo for unsalted MD5: chains of hash/reduce steps over a
+mask-defined keyspace, stored as sorted (start, end) uint64 arrays on disk
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import secrets
+import sqlite3
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+
+from mask_attack import parse_mask, keyspace, load_targets
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+
+DEFAULT_CHAIN_LENGTH = 200
+MAX_WORKERS = os.cpu_count() or 1
+
+# Chains per pool job when generating in parallel
+GENERATE_JOB_CHAINS = 5000
+
+TABLE_MAGIC = b'RTBL1'
+MASK64 = (1 << 64) - 1
+GOLDEN64 = 0x9E3779B97F4A7C15
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           KEYSPACE & REDUCTION FUNCTIONS                       ║
+# ║  A reduction maps a digest and the chain position to a keyspace index; the    ║
+# ║  position term keeps chains that collide at different steps from merging      ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def _reduce_modulo(digest, step, n):
+    return (int.from_bytes(digest[:8], 'little') + step) % n
+
+def _reduce_xor(digest, step, n):
+    return (int.from_bytes(digest[-8:], 'little') ^ ((step * GOLDEN64) & MASK64)) % n
+
+REDUCTIONS = {'modulo': _reduce_modulo, 'xor': _reduce_xor}
+
+def parse_table_mask(mask, charset=None):
+    """
+    parse_mask plus hashcat's custom charset placeholder: ?1 expands to `charset`
+
+    e.g. mask '?1?1?1?1?1?1' with charset 'abc123' → length 6 over a 6-symbol charset
+    """
+    positions = []
+    segment = ''
+    i = 0
+    while i < len(mask):
+        if mask.startswith('??', i):
+            segment += '??'
+            i += 2
+        elif mask.startswith('?1', i):
+            if not charset:
+                raise ValueError('Mask uses ?1 but no custom charset was given')
+            if segment:
+                positions.extend(parse_mask(segment))
+                segment = ''
+            positions.append([bytes([b]) for b in dict.fromkeys(charset.encode('utf-8'))])
+            i += 2
+        else:
+            segment += mask[i]
+            i += 1
+    if segment:
+        positions.extend(parse_mask(segment))
+    if not positions:
+        raise ValueError('Mask is empty')
+    return positions
+
+class Keyspace:
+    """Mixed-radix index ↔ candidate mapping for a mask (last position varies fastest)"""
+
+    def __init__(self, mask, charset=None):
+        self.mask = mask
+        self.charset = charset
+        self.positions = parse_table_mask(mask, charset)
+        self.size = keyspace(self.positions)
+        self._reversed = list(reversed(self.positions))
+
+    def candidate(self, index):
+        parts = []
+        for alphabet in self._reversed:
+            index, digit = divmod(index, len(alphabet))
+            parts.append(alphabet[digit])
+        return b''.join(reversed(parts))
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           CHAIN GENERATION                                     ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def _chain_end(space, reduce, start, chain_length):
+    """Walk one chain: index → hash(candidate) → reduce, chain_length times"""
+    md5 = hashlib.md5
+    n = space.size
+    index = start
+    for step in range(chain_length):
+        index = reduce(md5(space.candidate(index)).digest(), step, n)
+    return index
+
+def _generate_job(job):
+    """Worker entry point: job = (mask, charset, chain_length, reduction, seed, first_chain, last_chain)"""
+    mask, charset, chain_length, reduction, seed, first, last = job
+    space = Keyspace(mask, charset)
+    reduce = REDUCTIONS[reduction]
+    starts, ends = array('Q'), array('Q')
+    for j in range(first, last):
+        # Spread start points over the keyspace deterministically
+        start = (seed + j * GOLDEN64) % space.size
+        starts.append(start)
+        ends.append(_chain_end(space, reduce, start, chain_length))
+    return starts.tobytes(), ends.tobytes()
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           TABLE                                                ║
+# ║  On disk: magic, header length, JSON header, then starts and ends as          ║
+# ║  little-endian uint64 arrays sorted by end (16 bytes per chain)               ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class RainbowTable:
+    """Sorted chain endpoints plus the parameters needed to walk them"""
+
+    def __init__(self, mask, charset, chain_length, reduction, starts, ends, meta=None):
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"reduction must be one of {', '.join(REDUCTIONS)}")
+        self.space = Keyspace(mask, charset)
+        self.chain_length = chain_length
+        self.reduction = reduction
+        self.reduce = REDUCTIONS[reduction]
+        self.starts = starts
+        self.ends = ends
+        self.meta = meta or {}
+
+    @classmethod
+    def generate(cls, mask, chains, chain_length=DEFAULT_CHAIN_LENGTH, reduction='modulo',
+                 charset=None, workers=None, seed=None):
+        """
+        Build a table of `chains` chains (merged chains are dropped)
+
+        Chains are split into jobs across a process pool; one worker runs inline.
+        """
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"reduction must be one of {', '.join(REDUCTIONS)}")
+        if chains < 1 or chain_length < 1:
+            raise ValueError('chains and chain_length must be positive')
+        Keyspace(mask, charset)     # validate before starting workers
+        seed = secrets.randbits(63) if seed is None else seed
+        workers = max(1, min(workers or MAX_WORKERS, MAX_WORKERS))
+        jobs = [(mask, charset, chain_length, reduction, seed, first, min(first + GENERATE_JOB_CHAINS, chains))
+                for first in range(0, chains, GENERATE_JOB_CHAINS)]
+
+        started = time.perf_counter()
+        if workers == 1 or len(jobs) == 1:
+            results = [_generate_job(job) for job in jobs]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_generate_job, jobs))
+
+        # Keep one chain per end point, sorted by end for binary search
+        by_end = {}
+        for start_bytes, end_bytes in results:
+            starts, ends = array('Q'), array('Q')
+            starts.frombytes(start_bytes)
+            ends.frombytes(end_bytes)
+            for start, end in zip(starts, ends):
+                by_end.setdefault(end, start)
+        ordered = sorted(by_end)
+        meta = {
+            'chainsRequested': chains,
+            'chains': len(ordered),
+            'generationSeconds': round(time.perf_counter() - started, 3),
+            'workers': workers,
+            'seed': seed
+        }
+        return cls(mask, charset, chain_length, reduction,
+                   array('Q', (by_end[end] for end in ordered)), array('Q', ordered), meta)
+
+    @property
+    def size_bytes(self):
+        return (len(self.starts) + len(self.ends)) * 8
+
+    def coverage(self):
+        """Upper bound on the fraction of the keyspace the chains touch"""
+        return min(1.0, len(self.ends) * self.chain_length / self.space.size)
+
+    def _header(self):
+        return dict(self.meta, mask=self.space.mask, charset=self.space.charset, chainLength=self.chain_length,
+                    reduction=self.reduction, chains=len(self.ends))
+
+    def save(self, path):
+        header = json.dumps(self._header()).encode('utf-8')
+        starts, ends = array('Q', self.starts), array('Q', self.ends)
+        if sys.byteorder != 'little':
+            starts.byteswap()
+            ends.byteswap()
+        with open(path, 'wb') as handle:
+            handle.write(TABLE_MAGIC + struct.pack('<I', len(header)) + header)
+            handle.write(starts.tobytes())
+            handle.write(ends.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as handle:
+            if handle.read(len(TABLE_MAGIC)) != TABLE_MAGIC:
+                raise ValueError(f"{path} is not a rainbow table")
+            (header_len,) = struct.unpack('<I', handle.read(4))
+            header = json.loads(handle.read(header_len))
+            starts, ends = array('Q'), array('Q')
+            starts.fromfile(handle, header['chains'])
+            ends.fromfile(handle, header['chains'])
+        if sys.byteorder != 'little':
+            starts.byteswap()
+            ends.byteswap()
+        return cls(header['mask'], header.get('charset'), header['chainLength'], header['reduction'], starts, ends, header)
+
+    # ╔═══════════════════════════════════════════════════════════════════════════╗
+    # ║                       LOOKUP                                              ║
+    # ║  Assume the target sits at position p (last → first), walk to the chain  ║
+    # ║  end, and on an end-point hit rebuild that chain from its start          ║
+    # ╚═══════════════════════════════════════════════════════════════════════════╝
+
+    def _find_end(self, end):
+        i = bisect_left(self.ends, end)
+        if i < len(self.ends) and self.ends[i] == end:
+            return self.starts[i]
+        return None
+
+    def lookup(self, digest):
+        """Password for a raw MD5 digest, or None"""
+        md5 = hashlib.md5
+        space, reduce, n, t = self.space, self.reduce, self.space.size, self.chain_length
+        for position in range(t - 1, -1, -1):
+            index = reduce(digest, position, n)
+            for step in range(position + 1, t):
+                index = reduce(md5(space.candidate(index)).digest(), step, n)
+            start = self._find_end(index)
+            if start is None:
+                continue
+            # Rebuild the chain up to the assumed position (may be a false alarm)
+            index = start
+            for step in range(position):
+                index = reduce(md5(space.candidate(index)).digest(), step, n)
+            candidate = space.candidate(index)
+            if md5(candidate).digest() == digest:
+                return candidate.decode('utf-8', errors='replace')
+        return None
+
+    def evaluate(self, targets):
+        """
+        Look up every target digest
+
+        Args:
+            targets: dict of raw digest → list of labels
+
+        Returns:
+            dict: cracked entries, success rate and lookup latency
+        """
+        cracked = []
+        latencies = []
+        for digest, labels in targets.items():
+            started = time.perf_counter()
+            password = self.lookup(digest)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if password is not None:
+                cracked.append({'users': labels, 'password': password})
+        total_users = sum(len(labels) for labels in targets.values())
+        cracked_users = sum(len(hit['users']) for hit in cracked)
+        return {
+            'targets': total_users,
+            'cracked': cracked_users,
+            'successRate': round(cracked_users / total_users, 4) if total_users else 0,
+            'avgLookupMs': round(sum(latencies) / len(latencies), 3) if latencies else 0,
+            'maxLookupMs': round(max(latencies), 3) if latencies else 0,
+            'passwords': cracked
+        }
+
+    def summary(self):
+        return {
+            'mask': self.space.mask,
+            'charset': self.space.charset,
+            'keyspace': self.space.size,
+            'chains': len(self.ends),
+            'chainLength': self.chain_length,
+            'reduction': self.reduction,
+            'sizeBytes': self.size_bytes,
+            'coverage': round(self.coverage(), 4),
+            'generationSeconds': self.meta.get('generationSeconds'),
+            'workers': self.meta.get('workers')
+        }
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           BEFORE / AFTER RESALTING                             ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def resalt_targets(targets):
+    """
+    Apply resalt_single_user's transform in memory: sha256(md5_hex + random salt)
+
+    Returns:
+        tuple: (salted targets in the same shape, number of distinct salts)
+    """
+    salted = {}
+    for digest, labels in targets.items():
+        for label in labels:
+            salt = secrets.token_hex(16)
+            salted[hashlib.sha256((digest.hex() + salt).encode()).digest()] = [label]
+    return salted, len(salted)
+
+def demo_report(table, targets):
+    """Success rate and latency against the targets as stored and after resalting"""
+    before = table.evaluate(targets)
+    salted, salts = resalt_targets(targets)
+    after = table.evaluate(salted)
+    generation = table.meta.get('generationSeconds') or 0
+    after['tablesNeeded'] = salts
+    after['estimatedGenerationSeconds'] = round(generation * salts, 1)
+    return {'table': table.summary(), 'before': before, 'after': after}
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  build --mask '?1?1?1?1' --charset abc123 --out t.rt                          ║
+# ║  lookup t.rt <md5hex> | demo t.rt                                             ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rainbow tables for unsalted MD5 demonstrations')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database path')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build_cmd = sub.add_parser('build', help='Generate a table')
+    build_cmd.add_argument('--mask', required=True, help="Keyspace as a mask, e.g. '?l?l?l?l?l' or 'password?d?d'")
+    build_cmd.add_argument('--charset', default=None, help='Custom charset for ?1 positions')
+    build_cmd.add_argument('--chains', type=int, default=10000)
+    build_cmd.add_argument('--chain-length', type=int, default=DEFAULT_CHAIN_LENGTH)
+    build_cmd.add_argument('--reduction', choices=sorted(REDUCTIONS), default='modulo')
+    build_cmd.add_argument('--workers', type=int, default=None)
+    build_cmd.add_argument('--out', required=True)
+    lookup_cmd = sub.add_parser('lookup', help='Invert one MD5 hex digest')
+    lookup_cmd.add_argument('table')
+    lookup_cmd.add_argument('digest')
+    demo_cmd = sub.add_parser('demo', help='Success rate against demo_users before and after resalting')
+    demo_cmd.add_argument('table')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        table = RainbowTable.generate(args.mask, args.chains, args.chain_length, args.reduction,
+                                      args.charset, args.workers)
+        table.save(args.out)
+        info = table.summary()
+        print(f"✅ {info['chains']:,} chains × {info['chainLength']} over {info['keyspace']:,} candidates "
+              f"({info['coverage']:.0%} coverage) in {info['generationSeconds']}s → {args.out} "
+              f"({info['sizeBytes']:,} bytes)")
+        return 0
+
+    table = RainbowTable.load(args.table)
+    if args.command == 'lookup':
+        password = table.lookup(bytes.fromhex(args.digest))
+        print(password if password is not None else '❌ Not in table')
+        return 0 if password is not None else 1
+
+    conn = sqlite3.connect(args.db)
+    try:
+        targets = load_targets(conn)
+    finally:
+        conn.close()
+    report = demo_report(table, targets)
+    for label, result in (('before resalt', report['before']), ('after resalt', report['after'])):
+        print(f"{label:<14} {result['cracked']}/{result['targets']} cracked ({result['successRate']:.0%}), "
+              f"{result['avgLookupMs']:.2f} ms/lookup")
+    print(f"   After resalting every user needs its own table: {report['after']['tablesNeeded']} tables, "
+          f"~{report['after']['estimatedGenerationSeconds']}s to generate")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Conditional-GET Response Caching
+Data-version counter, strong ETags and cached JSON bodies for polled endpoints
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & DEPENDENCIES                               ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, make_response
+
+# Suffixes appended to the ETag of compressed representations (response_encoding)
+ENCODING_ETAG_SUFFIXES = ('', '-gzip', '-br')
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           DATA VERSION COUNTER                                 ║
+# ║  local writes bump a counter; PRAGMA data_version on a dedicated watcher      ║
+# ║  connection per database file picks up commits from every other connection    ║
+# ║  and process (every user shard file is watched)                               ║
+# ║  A per-process epoch keeps versions from repeating across restarts            ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class DataVersion:
+    """Monotonic version of the database contents"""
+
+    def __init__(self, db_paths_getter):
+        """
+        Args:
+            db_paths_getter: () → the database files to watch (a list, or one path)
+        """
+        self._db_paths_getter = db_paths_getter
+        self._lock = threading.Lock()
+        # Both counters restart with the process; without the epoch a restarted
+        # server could reissue an old version and answer 304 with stale data
+        self._epoch = os.urandom(4).hex()
+        self._local = 0
+        self._conns = {}
+
+    def bump(self):
+        """Record a write made through this process"""
+        with self._lock:
+            self._local += 1
+
+    def _watchers(self):
+        paths = self._db_paths_getter()
+        paths = [paths] if isinstance(paths, str) else list(paths)
+        if list(self._conns) != paths:
+            for conn in self._conns.values():
+                conn.close()
+            self._conns = {path: sqlite3.connect(path, check_same_thread=False) for path in paths}
+            # New watchers restart data_version, so the version moves on instead
+            self._local += 1
+        return self._conns.values()
+
+    def current(self):
+        """
+        Current data version string
+
+        PRAGMA data_version only changes when *another* connection commits,
+        which is every writer since the watcher connection never writes.
+        """
+        with self._lock:
+            pragmas = []
+            for conn in self._watchers():
+                try:
+                    pragmas.append(str(conn.execute('PRAGMA data_version').fetchone()[0]))
+                except sqlite3.Error:
+                    pragmas.append('0')
+            return f"{self._epoch}.{self._local}.{'-'.join(pragmas)}"
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           ETAG RESPONSE CACHE                                  ║
+# ║  Serialized bodies keyed by (route, query, version); If-None-Match → 304      ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class ResponseCache:
+    """Small LRU of serialized JSON responses"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'notModified': self.not_modified
+            }
+
+def make_etag(key):
+    """Strong ETag derived from the cache key (route, query, version, vary)"""
+    return hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+
+def etag_cached(data_version, cache, vary=None):
+    """
+    Decorator for read-only JSON GET endpoints
+
+    The version is read before the view runs, so a write racing with the
+    query always yields a newer version (and a fresh body) on the next poll.
+
+    Args:
+        data_version: DataVersion instance
+        cache: ResponseCache instance
+        vary: optional callable returning extra key material (e.g. today's date)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (
+                request.path,
+                request.query_string,
+                data_version.current(),
+                vary() if vary else None
+            )
+            etag = make_etag(key)
+
+            # Unchanged poll: answer from the version alone, no SQLite access
+            matched = next((etag + suffix for suffix in ENCODING_ETAG_SUFFIXES
+                            if etag + suffix in request.if_none_match), None)
+            if matched:
+                cache.not_modified += 1
+                response = make_response('', 304)
+                response.set_etag(matched)
+                response.headers['Cache-Control'] = 'no-cache'
+                return response
+
+            entry = cache.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = (response.get_data(), response.mimetype)
+                cache.put(key, entry)
+
+            body, mimetype = entry
+            response = make_response(body)
+            response.mimetype = mimetype
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,137 @@
+"""
+Response Encoding
+Negotiated gzip/brotli compression and an optional orjson-backed JSON provider
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & DEPENDENCIES                               ║
+# ║  brotli and orjson are optional - gzip and the stdlib encoder always work     ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           FAST JSON PROVIDER                                   ║
+# ║  orjson serializes the large user lists several times faster than json       ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that serializes with orjson (falls back to json)"""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, option=option).decode('utf-8')
+        except TypeError:
+            # Types orjson does not know (e.g. Decimal) go through the default provider
+            return super().dumps(obj, **kwargs)
+
+def install_json_provider(app, enabled=True):
+    """Use orjson for jsonify when available and enabled"""
+    if enabled and ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+        return 'orjson'
+    app.json = DefaultJSONProvider(app)
+    return 'json'
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           RESPONSE COMPRESSION                                 ║
+# ║  Accept-Encoding negotiation (br > gzip) above a size threshold               ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/css', 'application/javascript',
+                          'text/javascript', 'text/plain', 'application/x-ndjson')
+
+class ResponseCompressor:
+    """after_request hook that compresses large responses"""
+
+    def __init__(self, min_size=1024, gzip_level=1, brotli_quality=4, cache_entries=128):
+        # Hex digests barely compress better at higher levels, so default to the cheap ones
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        # Compressed bodies of ETag-tagged responses, keyed by (etag, encoding)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        app.after_request(self.compress_response)
+
+    def choose_encoding(self):
+        """Pick the best encoding the client accepts"""
+        accepted = request.accept_encodings
+        if BROTLI_AVAILABLE and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level)
+
+    def _cached_compress(self, etag, data, encoding):
+        if not etag:
+            return self.compress(data, encoding)
+        key = (etag, encoding)
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                return body
+        body = self.compress(data, encoding)
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return body
+
+    def compress_response(self, response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding()
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        etag, _ = response.get_etag()
+        body = self._cached_compress(etag, data, encoding)
+        response.set_data(body)
+        if etag:
+            # Each encoding is a distinct representation, so it gets its own strong ETag
+            response.set_etag(f"{etag}-{encoding}")
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(body))
+        return response
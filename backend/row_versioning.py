@@ -0,0 +1,113 @@
+"""
+Optimistic Row Versioning
+Compare-and-swap UPDATEs on users.row_version so concurrent resalt and
+migration writers can never pair a salt with another writer's hash, plus a
+per-writer contention counter
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import threading
+
+# Attempts (first try included) a batch writer makes per row before giving up
+MAX_CAS_ATTEMPTS = 5
+
+# update_with_retry outcomes
+UPDATED, SKIPPED, CONFLICT = 'updated', 'skipped', 'conflict'
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SCHEMA                                               ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def ensure_row_version(conn, table='users'):
+    """Add the row_version column to an existing table (caller commits)"""
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+    if 'row_version' not in columns:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0')
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           CONTENTION COUNTER                                   ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class ContentionCounter:
+    """Thread-safe per-writer counts of CAS updates, conflicts and abandoned rows"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._writers = {}
+
+    def record(self, writer, updated=0, conflicts=0, abandoned=0):
+        with self._lock:
+            counts = self._writers.setdefault(writer, {'updates': 0, 'conflicts': 0, 'abandoned': 0})
+            counts['updates'] += updated
+            counts['conflicts'] += conflicts
+            counts['abandoned'] += abandoned
+
+    def snapshot(self):
+        """Counts per writer plus totals and the conflict rate (conflicts per update attempt)"""
+        with self._lock:
+            writers = {name: dict(counts) for name, counts in self._writers.items()}
+        totals = {key: sum(c[key] for c in writers.values()) for key in ('updates', 'conflicts', 'abandoned')}
+        attempts = totals['updates'] + totals['conflicts']
+        totals['conflictRate'] = round(totals['conflicts'] / attempts, 4) if attempts else 0.0
+        return {'writers': writers, 'totals': totals}
+
+    def reset(self):
+        with self._lock:
+            self._writers.clear()
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMPARE-AND-SWAP UPDATES                             ║
+# ║  Every writer reads row_version with the row and updates WHERE row_version  ║
+# ║  still equals it; 0 rows changed means someone else wrote in between         ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def cas_update(conn, row_id, version, values, table='users'):
+    """
+    UPDATE the row only if its row_version is still `version` (bumping it)
+
+    Returns:
+        bool: True when the row was updated
+    """
+    assignments = ''.join(f"{column} = ?, " for column in values)
+    cursor = conn.execute(f'''
+        UPDATE {table} SET {assignments}row_version = row_version + 1
+        WHERE id = ? AND row_version = ?
+    ''', (*values.values(), row_id, version))
+    return cursor.rowcount == 1
+
+def update_with_retry(conn, row_id, columns, build, counter, writer, row=None,
+                      attempts=MAX_CAS_ATTEMPTS, table='users'):
+    """
+    Read → build → CAS, re-reading the row after each conflict
+
+    Args:
+        columns: columns `build` needs (row_version is always read as well)
+        build: row → dict of column values to write, or None to leave the row alone
+        row: an already-read row (with row_version) to use for the first attempt
+
+    Returns:
+        tuple: (UPDATED | SKIPPED | CONFLICT, values written or None)
+    """
+    conflicts = 0
+    for _ in range(attempts):
+        if row is None:
+            row = conn.execute(f"SELECT {', '.join(columns)}, row_version FROM {table} WHERE id = ?",
+                               (row_id,)).fetchone()
+            if row is None:
+                # Deleted (e.g. by retention) since it was selected
+                counter.record(writer, conflicts=conflicts)
+                return SKIPPED, None
+        values = build(row)
+        if values is None:
+            counter.record(writer, conflicts=conflicts)
+            return SKIPPED, None
+        if cas_update(conn, row_id, row['row_version'], values, table):
+            counter.record(writer, updated=1, conflicts=conflicts)
+            return UPDATED, values
+        conflicts += 1
+        row = None
+    counter.record(writer, conflicts=conflicts, abandoned=1)
+    return CONFLICT, None
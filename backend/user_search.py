@@ -0,0 +1,255 @@
+"""
+User Search
+FTS5 index over users.name/email (kept in sync by triggers) plus filter
+indexes, queried newest-first with keyset pagination
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+
+DEFAULT_SEARCH_LIMIT = 25
+MAX_SEARCH_LIMIT = 100
+
+SEARCH_MODES = ('prefix', 'token')
+SEARCH_FIELDS = ('any', 'name', 'email')
+
+# unicode61 splits on everything but letters and digits: "j.smith@example.com"
+# is indexed as j / smith / example / com, and queries are split the same way
+TOKEN_RE = re.compile(r'[^\W_]+')
+
+# Prefix queries of exactly these lengths read a prefix index; other lengths
+# merge the doclists of every matching term (fast unless the terms are common)
+FTS_PREFIXES = '2 3 4 5 6'
+
+try:
+    sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE probe USING fts5(x)')
+    FTS5_AVAILABLE = True
+except sqlite3.OperationalError:
+    FTS5_AVAILABLE = False
+
+RESULT_COLUMNS = 'u.id, u.name, u.email, u.algorithm, u.security_score, u.breach_status, u.created_at'
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           INDEX MAINTENANCE                                    ║
+# ║  users_fts is an external-content table: it stores only the index, rows     ║
+# ║  are read from users, and the triggers mirror every insert/update/delete    ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+TRIGGERS = {
+    'users_fts_insert': '''
+        CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+            INSERT INTO users_fts (rowid, name, email) VALUES (new.id, new.name, new.email);
+        END
+    ''',
+    'users_fts_delete': '''
+        CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+            INSERT INTO users_fts (users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email);
+        END
+    ''',
+    'users_fts_update': '''
+        CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name, email ON users BEGIN
+            INSERT INTO users_fts (users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email);
+            INSERT INTO users_fts (rowid, name, email) VALUES (new.id, new.name, new.email);
+        END
+    ''',
+}
+
+def create_search_index(conn):
+    """
+    Create the filter indexes and (with FTS5) the users_fts table and triggers
+
+    A database created before the index existed is indexed once here.
+    Returns True when full-text search is available (caller commits).
+    """
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_users_algorithm ON users(algorithm)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_users_breach_status ON users(breach_status)')
+    if not FTS5_AVAILABLE:
+        return False
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'").fetchone()
+    if not exists:
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE users_fts USING fts5(
+                name, email, content='users', content_rowid='id', prefix='{FTS_PREFIXES}'
+            )
+        ''')
+        conn.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+    for sql in TRIGGERS.values():
+        conn.execute(sql)
+    return True
+
+def rebuild_search_index(conn):
+    """Re-index every user (after bulk edits made with the triggers dropped)"""
+    conn.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO users_fts (users_fts) VALUES ('optimize')")
+    conn.commit()
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           QUERY BUILDING                                       ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def build_match(text, mode='prefix', field='any'):
+    """
+    User text → FTS5 MATCH expression (None when it has no letters or digits)
+
+    Each whitespace-separated term becomes a quoted phrase of its tokens, so
+    "j.smi" matches the adjacent tokens j, smi; terms are ANDed. In prefix
+    mode the final token is a prefix (search-as-you-type: "emma sm" finds
+    "Emma Smith"). No FTS5 syntax from the user is ever interpreted.
+    """
+    phrases = ['"' + ' '.join(tokens) + '"' for tokens in map(TOKEN_RE.findall, text.split()) if tokens]
+    if not phrases:
+        return None
+    if mode == 'prefix':
+        phrases[-1] += '*'
+    expression = ' AND '.join(phrases)
+    return expression if field == 'any' else f"{field} : ({expression})"
+
+def search_users(conn, text=None, mode='prefix', field='any', algorithm=None, breach_status=None,
+                 min_score=None, max_score=None, after=None, limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Search users newest-first
+
+    Args:
+        text: name/email query (optional; filters alone list matching users)
+        algorithm, breach_status: lists of accepted values (empty = any)
+        min_score, max_score: inclusive security_score range
+        after: keyset cursor, the last id of the previous page
+
+    Returns:
+        dict: users (dict rows), nextCursor (None on the last page), matchExpression
+    """
+    where, params = [], []
+    match = None
+    if text:
+        match = build_match(text, mode, field)
+        if match is None:
+            raise ValueError('q must contain letters or digits')
+    for column, values in (('algorithm', algorithm), ('breach_status', breach_status)):
+        if values:
+            where.append(f"u.{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if min_score is not None:
+        where.append('u.security_score >= ?')
+        params.append(min_score)
+    if max_score is not None:
+        where.append('u.security_score <= ?')
+        params.append(max_score)
+
+    if match and FTS5_AVAILABLE:
+        # CROSS JOIN keeps users_fts as the outer loop: the rowid cursor and
+        # ORDER BY rowid DESC are answered by the index, so a page stops early
+        where = ['users_fts MATCH ?'] + where
+        params.insert(0, match)
+        if after is not None:
+            where.append('users_fts.rowid < ?')
+            params.append(after)
+        sql = f'''
+            SELECT {RESULT_COLUMNS}
+            FROM users_fts CROSS JOIN users u ON u.id = users_fts.rowid
+            WHERE {' AND '.join(where)}
+            ORDER BY users_fts.rowid DESC
+            LIMIT ?
+        '''
+    else:
+        if match:
+            # Without FTS5: case-insensitive substring scan of every row (not indexed)
+            for term in text.split():
+                for token in TOKEN_RE.findall(term):
+                    columns = ('name', 'email') if field == 'any' else (field,)
+                    where.append('(' + ' OR '.join(f"instr(lower(u.{c}), ?) > 0" for c in columns) + ')')
+                    params.extend([token.lower()] * len(columns))
+        if after is not None:
+            where.append('u.id < ?')
+            params.append(after)
+        sql = f'''
+            SELECT {RESULT_COLUMNS}
+            FROM users u
+            {('WHERE ' + ' AND '.join(where)) if where else ''}
+            ORDER BY u.id DESC
+            LIMIT ?
+        '''
+    # One extra row tells whether another page exists
+    params.append(limit + 1)
+
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    rows = cursor.execute(sql, params).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    users = [{
+        'id': row[0],
+        'name': row[1],
+        'email': row[2],
+        'algorithm': row[3],
+        'securityScore': row[4] or 0,
+        'breachStatus': row[5] or 'UNKNOWN',
+        'createdAt': row[6]
+    } for row in rows]
+    return {
+        'users': users,
+        'nextCursor': rows[-1][0] if has_more else None,
+        'matchExpression': match
+    }
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python user_search.py search "john sm" [--field email] [--algorithm MD5]    ║
+# ║  python user_search.py rebuild                                                ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Search users by name/email')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database path')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    search = sub.add_parser('search', help='Run one query and time it')
+    search.add_argument('q', nargs='?', default=None)
+    search.add_argument('--mode', choices=SEARCH_MODES, default='prefix')
+    search.add_argument('--field', choices=SEARCH_FIELDS, default='any')
+    search.add_argument('--algorithm', nargs='+', default=None)
+    search.add_argument('--breach-status', nargs='+', default=None)
+    search.add_argument('--min-score', type=int, default=None)
+    search.add_argument('--max-score', type=int, default=None)
+    search.add_argument('--after', type=int, default=None)
+    search.add_argument('--limit', type=int, default=DEFAULT_SEARCH_LIMIT)
+
+    sub.add_parser('rebuild', help='Create the index if missing, then re-index every user')
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if args.command == 'rebuild':
+            started = time.perf_counter()
+            if not create_search_index(conn):
+                print('❌ FTS5 is not available in this SQLite build')
+                return 1
+            rebuild_search_index(conn)
+            print(f"✅ Indexed users in {time.perf_counter() - started:.2f}s")
+            return 0
+
+        started = time.perf_counter()
+        result = search_users(conn, args.q, args.mode, args.field, args.algorithm, args.breach_status,
+                              args.min_score, args.max_score, args.after, min(args.limit, MAX_SEARCH_LIMIT))
+        elapsed = (time.perf_counter() - started) * 1000
+        for user in result['users']:
+            print(f"{user['id']:>8}  {user['name']:<28} {user['email']:<36} {user['algorithm']:<10} "
+                  f"{user['securityScore']:>3} {user['breachStatus']}")
+        print(f"🔎 {len(result['users'])} result(s) in {elapsed:.3f} ms"
+              + (f", next page: --after {result['nextCursor']}" if result['nextCursor'] else ''))
+        return 0
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,316 @@
+"""
+Sharded User Storage
+Routes users to N SQLite files by a hash of their email so registrations on
+different shards never wait for the same writer lock; point reads go to the
+owning shard and list/audit reads fan out across shards in parallel
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import hashlib
+import heapq
+import itertools
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hash_storage import ensure_settings_table
+
+MAX_SHARDS = 64
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           ROUTING                                              ║
+# ║  Shard 0 is the main database file; shard i > 0 is database.shard<i>.db.    ║
+# ║  Ids are global: shard i only hands out ids ≡ i (mod N), so the owning      ║
+# ║  shard of an id is id % N without any lookup                                 ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def shard_paths(main_path, count):
+    """Database file of every shard (shard 0 is main_path itself)"""
+    root, ext = os.path.splitext(main_path)
+    return [main_path] + [f"{root}.shard{i}{ext}" for i in range(1, count)]
+
+def shard_for_email(email, count):
+    """Owning shard of an email (case-insensitive, stable across processes)"""
+    digest = hashlib.blake2b(email.strip().lower().encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+def shard_for_id(user_id, count):
+    """Owning shard of a global user id"""
+    return int(user_id) % count
+
+def allocate_id(conn, shard, count):
+    """
+    Next global id for a shard: the smallest id ≡ shard (mod count) above any
+    id the shard has ever used (sqlite_sequence, so deleted ids are not reused)
+
+    Call inside the shard's write transaction (BEGIN IMMEDIATE) so two
+    registrations cannot take the same id.
+    """
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'users'").fetchone()
+    candidate = (row[0] if row else 0) + 1
+    return candidate + (shard - candidate) % count
+
+def insert_sharded(shard_conns, sql, rows, email_index=1):
+    """
+    Insert rows into their owning shards (shard_for_email) with global ids
+
+    `sql` takes the id as its first parameter, followed by the row. Each shard
+    takes its write lock before allocating ids, like /api/register (a shard
+    already in a write transaction, e.g. after a DELETE, keeps it). Shards
+    other than 0 are committed here; shard 0 (shard_conns[0]) is left in its
+    transaction for the caller to commit.
+
+    Returns:
+        int: rows inserted
+    """
+    count = len(shard_conns)
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(shard_for_email(row[email_index], count), []).append(row)
+
+    inserted = 0
+    for shard in sorted(grouped, reverse=True):
+        conn = shard_conns[shard]
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        first_id = allocate_id(conn, shard, count)
+        cursor = conn.cursor()
+        cursor.executemany(sql, [(first_id + n * count,) + tuple(row) for n, row in enumerate(grouped[shard])])
+        inserted += max(cursor.rowcount, 0)
+        if shard:
+            conn.commit()
+    return inserted
+
+def read_shard_count(conn, default=1):
+    """Shard count recorded in the main database's app_settings"""
+    ensure_settings_table(conn)
+    row = conn.execute("SELECT value FROM app_settings WHERE key = 'user_shards'").fetchone()
+    return int(row[0]) if row else default
+
+def write_shard_count(conn, count):
+    """Record the shard count (caller commits)"""
+    ensure_settings_table(conn)
+    conn.execute('''
+        INSERT INTO app_settings (key, value) VALUES ('user_shards', ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+    ''', (str(count),))
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           SHARD SET                                            ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+class UserShards:
+    """The shard files of one database plus a thread pool for fan-out reads"""
+
+    def __init__(self, main_path, count, connect):
+        """
+        Args:
+            main_path: the main database (shard 0)
+            count: number of shards (1 = everything in main_path, no routing)
+            connect: path → sqlite3 connection (row factory etc. as the caller wants)
+        """
+        if not 1 <= count <= MAX_SHARDS:
+            raise ValueError(f"shard count must be between 1 and {MAX_SHARDS}")
+        self.count = count
+        self.paths = shard_paths(main_path, count)
+        self.connect = connect
+        self._pool = ThreadPoolExecutor(max_workers=count) if count > 1 else None
+
+    @property
+    def sharded(self):
+        return self.count > 1
+
+    def index_for_email(self, email):
+        return shard_for_email(email, self.count)
+
+    def index_for_id(self, user_id):
+        return shard_for_id(user_id, self.count)
+
+    def connect_for_email(self, email):
+        return self.connect(self.paths[self.index_for_email(email)])
+
+    def connect_for_id(self, user_id):
+        return self.connect(self.paths[self.index_for_id(user_id)])
+
+    def map(self, fn, connect=None):
+        """
+        Run fn(conn, shard_index) on every shard in parallel, each on its own
+        connection (opened with `connect`, default self.connect, and closed after)
+
+        Returns:
+            list: results in shard order
+        """
+        connect = connect or self.connect
+
+        def run(index):
+            conn = connect(self.paths[index])
+            try:
+                return fn(conn, index)
+            finally:
+                conn.close()
+
+        if not self._pool:
+            return [run(0)]
+        return list(self._pool.map(run, range(self.count)))
+
+    def close(self):
+        """Stop the fan-out threads"""
+        if self._pool:
+            self._pool.shutdown(wait=False)
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           MERGING FAN-OUT RESULTS                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def merge_sorted(lists, key, limit=None, reverse=False):
+    """Merge per-shard lists already sorted by `key` (optionally keeping the first `limit`)"""
+    merged = heapq.merge(*lists, key=key, reverse=reverse)
+    return list(itertools.islice(merged, limit) if limit is not None else merged)
+
+def sum_counts(dicts):
+    """Add up per-shard {key: count} dicts (nested dicts are summed recursively)"""
+    total = {}
+    for counts in dicts:
+        for key, value in counts.items():
+            if isinstance(value, dict):
+                total[key] = sum_counts([total.get(key, {}), value])
+            else:
+                total[key] = total.get(key, 0) + value
+    return total
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           REGISTRATION BENCHMARK                               ║
+# ║  Writer threads insert users through the routing layer, one commit per      ║
+# ║  registration as /api/register does; --hold-ms keeps each write             ║
+# ║  transaction open longer to model slow fsync / busier transactions          ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+BENCH_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+def bench_registrations(count, threads=8, duration=3.0, hold_ms=0.0, synchronous='FULL', directory=None):
+    """
+    Registrations/sec with `count` shards and `threads` concurrent writers
+
+    Returns:
+        dict: shards, threads, registrations, perSec and the per-shard split
+    """
+    directory = tempfile.mkdtemp(dir=directory)
+    try:
+        paths = shard_paths(os.path.join(directory, 'bench.db'), count)
+        for path in paths:
+            conn = sqlite3.connect(path)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(BENCH_SCHEMA)
+            conn.commit()
+            conn.close()
+
+        counts = [0] * threads
+        per_shard = [0] * count
+        lock = threading.Lock()
+        start_gate = threading.Barrier(threads + 1)
+
+        def writer(worker):
+            conns = [sqlite3.connect(path, timeout=60, isolation_level=None) for path in paths]
+            for conn in conns:
+                conn.execute(f'PRAGMA synchronous={synchronous}')
+            local = [0] * count
+            start_gate.wait()
+            deadline = time.perf_counter() + duration
+            n = 0
+            while time.perf_counter() < deadline:
+                email = f"bench{worker}-{n}@example.com"
+                shard = shard_for_email(email, count)
+                conn = conns[shard]
+                conn.execute('BEGIN IMMEDIATE')
+                user_id = allocate_id(conn, shard, count)
+                conn.execute('INSERT INTO users (id, name, email, password_hash) VALUES (?, ?, ?, ?)',
+                             (user_id, f"Bench {n}", email, '0' * 32))
+                if hold_ms:
+                    time.sleep(hold_ms / 1000)
+                conn.execute('COMMIT')
+                local[shard] += 1
+                n += 1
+            counts[worker] = n
+            with lock:
+                for shard, value in enumerate(local):
+                    per_shard[shard] += value
+            for conn in conns:
+                conn.close()
+
+        workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        start_gate.wait()
+        for thread in workers:
+            thread.join()
+        total = sum(counts)
+        return {
+            'shards': count,
+            'threads': threads,
+            'holdMs': hold_ms,
+            'registrations': total,
+            'perSec': round(total / duration, 1),
+            'perShard': per_shard
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python user_shards.py bench [--shards 1 2 4 8] [--threads 8] [--hold-ms 2]  ║
+# ║  python user_shards.py route alice@example.com --shards 4                    ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sharded user storage tools')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    bench = sub.add_parser('bench', help='Concurrent registration throughput per shard count')
+    bench.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, 8])
+    bench.add_argument('--threads', type=int, default=8)
+    bench.add_argument('--duration', type=float, default=3.0, help='Seconds per shard count')
+    bench.add_argument('--hold-ms', type=float, default=0.0,
+                       help='Extra time each write transaction holds the shard lock')
+    bench.add_argument('--synchronous', choices=['OFF', 'NORMAL', 'FULL'], default='FULL')
+    bench.add_argument('--dir', default=None, help='Directory for the temporary shard files')
+
+    route = sub.add_parser('route', help='Show the owning shard of emails or ids')
+    route.add_argument('keys', nargs='+')
+    route.add_argument('--shards', type=int, required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == 'route':
+        for key in args.keys:
+            shard = shard_for_id(key, args.shards) if key.isdigit() else shard_for_email(key, args.shards)
+            print(f"{key} → shard {shard}")
+        return 0
+
+    print(f"⏱️  {args.threads} writer threads, {args.duration}s per run, hold {args.hold_ms} ms, "
+          f"synchronous={args.synchronous}")
+    baseline = None
+    for count in args.shards:
+        result = bench_registrations(count, args.threads, args.duration, args.hold_ms, args.synchronous, args.dir)
+        baseline = baseline or result['perSec']
+        print(f"{count:>3} shard(s): {result['perSec']:>10,.1f} registrations/s "
+              f"({result['perSec'] / baseline:.2f}x)  per shard {result['perShard']}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
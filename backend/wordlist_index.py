@@ -0,0 +1,378 @@
+"""
+Wordlist Digest Index
+Streams a wordlist into sorted, memory-mapped MD5/SHA-1/SHA-256 digest files and
+audits every stored unsalted digest against them in one galloping merge pass
+"""
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           IMPORTS & CONFIGURATION                              ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+import argparse
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), 'database.db')
+DEFAULT_INDEX_DIR = os.environ.get('WORDLIST_INDEX_DIR',
+                                   os.path.join(os.path.dirname(__file__), 'wordlist_index'))
+
+INDEX_ALGORITHMS = ('md5', 'sha1', 'sha256')
+DIGEST_SIZES = {'md5': 16, 'sha1': 20, 'sha256': 32}
+OFFSET_SIZE = 8                 # big-endian offset of the word in words.dat
+
+# Records held in memory per algorithm before a sorted run is spilled to disk
+DEFAULT_RUN_SIZE = 500000
+
+# Unsalted digest columns audited in each table (algorithm → columns);
+# password_hash only counts for unsalted MD5 rows
+AUDIT_TABLES = ('users', 'demo_users')
+AUDIT_COLUMNS = {'md5': ('hash_md5', 'password_hash'), 'sha1': ('hash_sha1',), 'sha256': ('hash_sha256',)}
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           INDEX BUILDER                                        ║
+# ║  Fixed-size records (digest + word offset), external sort: sorted runs of    ║
+# ║  run_size records merged with heapq.merge, so memory is bounded               ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def _read_records(path, record_size):
+    """Yield fixed-size records from a run file"""
+    with open(path, 'rb') as handle:
+        while True:
+            record = handle.read(record_size)
+            if len(record) < record_size:
+                return
+            yield record
+
+def _spill(records, workdir, algorithm, runs):
+    """Sort an in-memory buffer and write it as a run file"""
+    records.sort()
+    path = os.path.join(workdir, f'{algorithm}.run{len(runs[algorithm])}')
+    with open(path, 'wb') as handle:
+        handle.write(b''.join(records))
+    runs[algorithm].append(path)
+    records.clear()
+
+def build_index(wordlist_path, out_dir=DEFAULT_INDEX_DIR, algorithms=INDEX_ALGORITHMS,
+                run_size=DEFAULT_RUN_SIZE, progress_callback=None):
+    """
+    Build the digest index for a wordlist (one candidate per line)
+
+    Files are written under a temporary name and swapped in at the end, so a
+    running server keeps auditing against the old index until the new one is complete.
+
+    Returns:
+        dict: index metadata (also written to index.json)
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workdir = tempfile.mkdtemp(dir=out_dir, prefix='.build-')
+    try:
+        started = time.time()
+        buffers = {name: [] for name in algorithms}
+        runs = {name: [] for name in algorithms}
+        words = 0
+
+        words_tmp = os.path.join(workdir, 'words.dat')
+        with open(wordlist_path, 'rb') as source, open(words_tmp, 'wb') as words_out:
+            for line in source:
+                word = line.rstrip(b'\r\n')
+                if not word:
+                    continue
+                offset = words_out.tell().to_bytes(OFFSET_SIZE, 'big')
+                words_out.write(word + b'\n')
+                for name in algorithms:
+                    buffers[name].append(hashlib.new(name, word).digest() + offset)
+                words += 1
+                if len(buffers[algorithms[0]]) >= run_size:
+                    for name in algorithms:
+                        _spill(buffers[name], workdir, name, runs)
+                    if progress_callback:
+                        progress_callback(words)
+        for name in algorithms:
+            if buffers[name] or not runs[name]:
+                _spill(buffers[name], workdir, name, runs)
+
+        # Merge runs; duplicate words keep their first offset
+        counts = {}
+        for name in algorithms:
+            size = DIGEST_SIZES[name]
+            record_size = size + OFFSET_SIZE
+            previous = None
+            count = 0
+            with open(os.path.join(workdir, f'{name}.idx'), 'wb') as out:
+                merged = heapq.merge(*[_read_records(path, record_size) for path in runs[name]])
+                for record in merged:
+                    if record[:size] != previous:
+                        out.write(record)
+                        previous = record[:size]
+                        count += 1
+            for path in runs[name]:
+                os.remove(path)
+            counts[name] = count
+
+        meta = {
+            'source': os.path.abspath(wordlist_path),
+            'words': words,
+            'digests': counts,
+            'algorithms': list(algorithms),
+            'buildId': f"{time.time_ns():x}",
+            'builtAt': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'buildSeconds': round(time.time() - started, 2)
+        }
+        for name in algorithms:
+            os.replace(os.path.join(workdir, f'{name}.idx'), os.path.join(out_dir, f'{name}.idx'))
+        os.replace(words_tmp, os.path.join(out_dir, 'words.dat'))
+        with open(os.path.join(workdir, 'index.json'), 'w') as handle:
+            json.dump(meta, handle, indent=2)
+        os.replace(os.path.join(workdir, 'index.json'), os.path.join(out_dir, 'index.json'))
+        os.rmdir(workdir)
+    except BaseException:
+        shutil.rmtree(workdir, ignore_errors=True)
+        raise
+    return meta
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           MEMORY-MAPPED LOOKUP                                 ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def _mmap(path):
+    """Read-only map of a file (None for empty files, which mmap rejects)"""
+    with open(path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+class DigestFile:
+    """Sorted digest records of one algorithm"""
+
+    def __init__(self, path, digest_size):
+        self.digest_size = digest_size
+        self.record_size = digest_size + OFFSET_SIZE
+        self.map = _mmap(path)
+        self.count = len(self.map) // self.record_size if self.map else 0
+
+    def key(self, i):
+        start = i * self.record_size
+        return self.map[start:start + self.digest_size]
+
+    def offset(self, i):
+        start = i * self.record_size + self.digest_size
+        return int.from_bytes(self.map[start:start + OFFSET_SIZE], 'big')
+
+    def lower_bound(self, target, lo, hi):
+        """First position in [lo, hi) whose key is ≥ target"""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def match_sorted(self, targets):
+        """
+        Merge-join sorted, distinct targets against the file
+
+        Gallops forward from the previous hit (1, 2, 4, ... records) before the
+        binary search, so the cost is O(targets × log(wordlist / targets)) and the
+        pages touched are only those around the targets.
+
+        Yields:
+            tuple: (digest, word_offset) for every target present
+        """
+        pos = 0
+        for target in targets:
+            if pos >= self.count:
+                return
+            step = 1
+            hi = pos
+            while hi < self.count and self.key(hi) < target:
+                pos = hi + 1
+                hi = pos + step
+                step *= 2
+            pos = self.lower_bound(target, pos, min(hi, self.count))
+            if pos < self.count and self.key(pos) == target:
+                yield target, self.offset(pos)
+
+    def close(self):
+        if self.map:
+            self.map.close()
+
+class WordlistIndex:
+    """Opened index directory (digest files + words.dat)"""
+
+    def __init__(self, directory=DEFAULT_INDEX_DIR):
+        with open(os.path.join(directory, 'index.json')) as handle:
+            self.meta = json.load(handle)
+        self.directory = directory
+        self.files = {name: DigestFile(os.path.join(directory, f'{name}.idx'), DIGEST_SIZES[name])
+                      for name in self.meta['algorithms']}
+        self.words = _mmap(os.path.join(directory, 'words.dat'))
+
+    @property
+    def stamp(self):
+        """Identifies this build (used as a cache vary key)"""
+        return self.meta['buildId']
+
+    def word_at(self, offset):
+        end = self.words.find(b'\n', offset)
+        return self.words[offset:end].decode('utf-8', errors='replace')
+
+    def lookup(self, algorithm, hex_digest):
+        """Word for a single hex digest (or None)"""
+        target = bytes.fromhex(hex_digest)
+        for _, offset in self.files[algorithm].match_sorted([target]):
+            return self.word_at(offset)
+        return None
+
+    def close(self):
+        for digest_file in self.files.values():
+            digest_file.close()
+        if self.words:
+            self.words.close()
+
+_open_index = None
+_open_key = None
+
+def get_index(directory=DEFAULT_INDEX_DIR):
+    """Shared index for the directory, reopened when index.json changes (None if not built)"""
+    global _open_index, _open_key
+    meta_path = os.path.join(directory, 'index.json')
+    try:
+        key = (directory, os.stat(meta_path).st_mtime_ns)
+    except FileNotFoundError:
+        return None
+    if key != _open_key:
+        # The previous maps are left to the garbage collector: a request may still be reading them
+        _open_index = WordlistIndex(directory)
+        _open_key = key
+    return _open_index
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           DICTIONARY AUDIT                                     ║
+# ║  Collect stored digests, sort them once, merge-join against each index file  ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def _digest_bytes(value, size):
+    """Stored digest (hex TEXT or BLOB) → raw bytes, or None if not a digest of that size"""
+    if isinstance(value, bytes):
+        return value if len(value) == size else None
+    if isinstance(value, str) and len(value) == size * 2:
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            return None
+    return None
+
+def mask_word(word):
+    """First three characters, the rest starred"""
+    return word[:3] + '*' * max(len(word) - 3, 3)
+
+def audit_database(conn, index, reveal=False, tables=AUDIT_TABLES):
+    """
+    Find stored unsalted digests whose password is in the wordlist
+
+    `tables` narrows the scan (extra user shards hold only `users`).
+
+    Returns:
+        dict: matches (one per user), rows scanned and digests checked
+    """
+    targets = {name: {} for name in index.files}
+    scanned = 0
+    for table in tables:
+        rows = conn.execute(f'''
+            SELECT id, name, email, algorithm, salt, password_hash, hash_md5, hash_sha1, hash_sha256
+            FROM {table}
+        ''')
+        for row in rows:
+            scanned += 1
+            user = (table, row[0], row[1], row[2], row[3])
+            columns = {'hash_md5': row[6], 'hash_sha1': row[7], 'hash_sha256': row[8]}
+            # Unsalted MD5 registrations keep the digest in password_hash as well
+            if row[3] == 'MD5' and not row[4]:
+                columns['password_hash'] = row[5]
+            for name in targets:
+                for column in AUDIT_COLUMNS[name]:
+                    digest = _digest_bytes(columns.get(column), DIGEST_SIZES[name])
+                    if digest is not None:
+                        targets[name].setdefault(digest, []).append((user, column))
+
+    matches = {}
+    checked = 0
+    for name, digests in targets.items():
+        checked += len(digests)
+        for digest, offset in index.files[name].match_sorted(sorted(digests)):
+            word = index.word_at(offset)
+            for (table, user_id, user_name, email, algorithm), column in digests[digest]:
+                entry = matches.setdefault((table, user_id), {
+                    'table': table,
+                    'id': user_id,
+                    'name': user_name,
+                    'email': email,
+                    'algorithm': algorithm,
+                    'password': word if reveal else mask_word(word),
+                    'columns': []
+                })
+                if column not in entry['columns']:
+                    entry['columns'].append(column)
+
+    return {
+        'matches': sorted(matches.values(), key=lambda m: (m['table'], m['id'])),
+        'rowsScanned': scanned,
+        'digestsChecked': checked
+    }
+
+# ╔═══════════════════════════════════════════════════════════════════════════════╗
+# ║                           COMMAND LINE INTERFACE                               ║
+# ║  python wordlist_index.py build rockyou.txt | audit | lookup <hex>            ║
+# ╚═══════════════════════════════════════════════════════════════════════════════╝
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Wordlist digest index for dictionary audits')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='SQLite database path')
+    parser.add_argument('--index', default=DEFAULT_INDEX_DIR, help='Index directory')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build_cmd = sub.add_parser('build', help='Build the index from a wordlist')
+    build_cmd.add_argument('wordlist')
+    build_cmd.add_argument('--run-size', type=int, default=DEFAULT_RUN_SIZE)
+    audit_cmd = sub.add_parser('audit', help='Audit stored unsalted digests')
+    audit_cmd.add_argument('--reveal', action='store_true', help='Print full passwords')
+    lookup_cmd = sub.add_parser('lookup', help='Look up one hex digest')
+    lookup_cmd.add_argument('digest')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        meta = build_index(args.wordlist, args.index, run_size=args.run_size,
+                           progress_callback=lambda n: print(f"📖 {n:,} words", file=sys.stderr))
+        print(f"✅ Indexed {meta['words']:,} words in {meta['buildSeconds']}s → {args.index}")
+        return 0
+
+    index = WordlistIndex(args.index)
+    if args.command == 'lookup':
+        algorithm = {32: 'md5', 40: 'sha1', 64: 'sha256'}.get(len(args.digest))
+        word = index.lookup(algorithm, args.digest.lower()) if algorithm else None
+        print(word if word is not None else '❌ Not in wordlist')
+        return 0 if word is not None else 1
+
+    conn = sqlite3.connect(args.db)
+    start = time.perf_counter()
+    try:
+        result = audit_database(conn, index, reveal=args.reveal)
+    finally:
+        conn.close()
+    for match in result['matches']:
+        print(f"🔴 {match['table']}#{match['id']} {match['email']:<32} {match['password']:<20} "
+              f"({', '.join(match['columns'])})")
+    print(f"✅ {len(result['matches']):,} of {result['rowsScanned']:,} users in wordlist "
+          f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())